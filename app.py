@@ -2,10 +2,13 @@ import os
 import sys
 import logging
 import time
+import struct
 import zipfile
 import shutil
+import threading
 from datetime import datetime
-from flask import Flask, request, jsonify, send_from_directory, render_template_string
+import numpy as np
+from flask import Flask, Response, request, jsonify, send_from_directory, render_template_string, stream_with_context
 from werkzeug.utils import secure_filename
 from typing import List, Dict, Any, Optional
 import tempfile
@@ -22,20 +25,59 @@ from src.tts_synthesizer import TTSSynthesizer
 from src.modules.noise_mixer import NoiseMixer, NoiseLibrary
 from src.modules.model_manager import ModelManager
 from src.modules.text_loader import TextLoader
+from src.modules.corpus_cache import CorpusCache
+from src.modules.voice_library import get_voice_library
+from src.modules.job_queue import TTSJobQueue
 
 # 创建Flask应用
 app = Flask(__name__)
 
-# 初始化模型管理器、噪声混合器
-model_manager = ModelManager()
-noise_library = NoiseLibrary()
-noise_mixer = NoiseMixer(noise_library)
+# 已加载模型的总内存预算（MB），超出时按最近使用时间淘汰空闲模型；None为不限制
+MODEL_MEMORY_BUDGET_MB = None
 
-# 初始化TTS合成器
-tts_synthesizer = TTSSynthesizer(model_manager=model_manager)
+# 初始化模型管理器
+model_manager = ModelManager(memory_budget_mb=MODEL_MEMORY_BUDGET_MB)
+
+# 噪声混合器在首次混合噪声时创建，启动时不扫描噪声目录
+_noise_mixer = None
+_noise_mixer_lock = threading.Lock()
+
+def get_noise_mixer() -> NoiseMixer:
+    global _noise_mixer
+    with _noise_mixer_lock:
+        if _noise_mixer is None:
+            _noise_mixer = NoiseMixer(NoiseLibrary())
+        return _noise_mixer
+
+# 预处理后语料的缓存，/api/parse-file解析的结果在随后的/api/tts中复用，同一文件再次合成时跳过文本处理
+corpus_cache = CorpusCache(cache_dir=os.path.join('cache', 'corpus'))
+
+# TTS合成器在首次使用时创建（加载模型），启动时不等待模型加载，
+# 文件解析、噪声混合等不需要模型的接口可以立即使用
+_tts_synthesizer = None
+_tts_synthesizer_lock = threading.Lock()
+
+def get_tts_synthesizer() -> TTSSynthesizer:
+    global _tts_synthesizer
+    with _tts_synthesizer_lock:
+        if _tts_synthesizer is None:
+            _tts_synthesizer = TTSSynthesizer(model_manager=model_manager, corpus_cache=corpus_cache)
+        return _tts_synthesizer
+
+# 后台合成任务队列，模型只由队列的工作线程使用；流式任务优先执行，整文件任务在条目之间让出工作线程
+job_queue = TTSJobQueue(max_workers=1)
+
+# 启动后首先在任务队列中加载并预热模型，之后提交的合成任务排在预热之后执行
+WARMUP_LANGUAGES = ['zh-cn']
+
+def warmup(job):
+    synthesizer = get_tts_synthesizer()
+    return model_manager.warmup_model(synthesizer.model_name, synthesizer.precision, languages=WARMUP_LANGUAGES)
+
+warmup_job = job_queue.submit(warmup, output_dir='', total=len(WARMUP_LANGUAGES))
 
 # 配置上传文件的允许扩展名
-ALLOWED_EXTENSIONS = {'txt', 'csv', 'json'}
+ALLOWED_EXTENSIONS = {'txt', 'csv', 'json', 'jsonl'}
 
 # 获取当前时间戳用于输出目录
 def get_timestamp():
@@ -85,128 +127,298 @@ def serve_audio_files(filename):
     filename = os.path.basename(audio_path)
     return send_from_directory(directory, filename)
 
-# 处理文本转语音请求
-@app.route('/api/tts', methods=['POST'])
-def tts_api():
-    start_time = time.time()
+# 解析合成请求，保存输入文件并创建独立的输出目录
+# 返回(任务参数, None)，请求无效时返回(None, 错误响应)
+def prepare_tts_request():
+    # 解析请求参数
+    data = request.form.to_dict()
+    files = request.files
     
-    try:
-        # 解析请求参数
-        data = request.form.to_dict()
-        files = request.files
-        
-        # 处理文本输入
-        text = data.get('text', '').strip()
-        
-        # 处理文件上传
-        if 'file' in files and files['file'].filename:
-            file = files['file']
-            if allowed_file(file.filename):
-                temp_dir = create_temp_dir()
-                filename = secure_filename(file.filename)
-                file_path = os.path.join(temp_dir, filename)
-                file.save(file_path)
-                is_file_input = True
-            else:
-                return jsonify({'success': False, 'error': '不支持的文件格式，请上传txt、csv或json文件'})
-        elif text:
-            # 创建临时文本文件
+    # 处理文本输入
+    text = data.get('text', '').strip()
+    
+    # 处理文件上传
+    if 'file' in files and files['file'].filename:
+        file = files['file']
+        if allowed_file(file.filename):
             temp_dir = create_temp_dir()
-            file_path = os.path.join(temp_dir, f"input_{get_timestamp()}.txt")
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(text)
-            is_file_input = True
+            filename = secure_filename(file.filename)
+            file_path = os.path.join(temp_dir, filename)
+            file.save(file_path)
         else:
-            return jsonify({'success': False, 'error': '请输入文本或上传文件'})
-        
-        # 创建输出目录
-        output_dir = os.path.join(
-            'output', 
-            'tts_webui',
-            f'{get_timestamp()}'
-        )
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # 设置参数
-        emotion = data.get('emotion', 'neutral')
-        selected_speaker_wav = data.get('speaker_wav', None)
-        
-        # 处理音色选择
-        if selected_speaker_wav == 'random':
-            selected_speaker_wav = None  # 设置为None，让后端使用随机选择
-        elif selected_speaker_wav:
-            # 构建完整的音色文件路径
-            speakers_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data_voice', 'selected_voice')
-            speaker_file_path = os.path.join(speakers_dir, f"{selected_speaker_wav}.wav")
-            if os.path.exists(speaker_file_path):
-                selected_speaker_wav = speaker_file_path
-            else:
-                logger.warning(f"音色文件不存在: {speaker_file_path}，将使用随机选择")
-                selected_speaker_wav = None
-        
-        # 如果情绪为neutral，则传入None，表示不使用情绪
-        if emotion == 'neutral':
-            emotion = None
-        
-        # 使用已初始化的TTS合成器
-        tts_synthesizer.output_dir = output_dir
-        
-        # 先加载文本内容，用于返回给前端
-        text_loader = TextLoader()
-        texts = text_loader.load_text_file(file_path)
-        text_list = [item['text'] for item in texts]
-        
-        # 执行TTS合成
-        results = tts_synthesizer.process_text_file(
-            file_path,
-            emotion=emotion,
-            selected_speaker_wav=selected_speaker_wav
-        )
-        
-        # 检查结果
-        if not isinstance(results, list):
-            return jsonify({'success': False, 'error': '语音合成返回了非列表结果'})
-        
-        # 过滤成功的结果
-        success_results = [r for r in results if r.success and hasattr(r, 'output_file') and r.output_file]
-        if not success_results:
-            error_messages = []
-            for r in results:
-                if not r.success and hasattr(r, 'error_message'):
-                    error_messages.append(r.error_message)
-            return jsonify({
-                'success': False, 
-                'error': '没有成功的语音合成结果',
-                'error_details': error_messages
-            })
-        
-        # 提取音频文件路径
-        audio_files = []
-        for result in success_results:
-            # 获取相对路径，用于前端访问
-            rel_path = os.path.relpath(result.output_file, os.path.dirname(os.path.abspath(__file__)))
-            audio_files.append({
-                'path': rel_path,
+            return None, jsonify({'success': False, 'error': '不支持的文件格式，请上传txt、csv、json或jsonl文件'})
+    elif text:
+        # 创建临时文本文件
+        temp_dir = create_temp_dir()
+        file_path = os.path.join(temp_dir, f"input_{get_timestamp()}.txt")
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        return None, jsonify({'success': False, 'error': '请输入文本或上传文件'})
+    
+    # 创建输出目录，同一秒内的多个请求也使用各自独立的目录
+    webui_output_root = os.path.join('output', 'tts_webui')
+    os.makedirs(webui_output_root, exist_ok=True)
+    output_dir = tempfile.mkdtemp(prefix=f'{get_timestamp()}_', dir=webui_output_root)
+    
+    # 设置参数
+    emotion = data.get('emotion', 'neutral')
+    
+    # 如果情绪为neutral，则传入None，表示不使用情绪
+    if emotion == 'neutral':
+        emotion = None
+    
+    # 请求线程中只检查文件能否解析出第一条文本，完整的读取在后台任务中流式进行
+    try:
+        first_text = next(iter(TextLoader().iter_texts(file_path)), None)
+    except Exception as e:
+        return None, jsonify({'success': False, 'error': f'文件解析失败: {str(e)}'})
+    if first_text is None:
+        return None, jsonify({'success': False, 'error': '文件中没有可合成的文本'})
+    
+    return {
+        'file_path': file_path,
+        'output_dir': output_dir,
+        'emotion': emotion,
+        # 处理音色选择，'random'时设置为None，让后端使用随机选择
+        'selected_speaker_wav': resolve_speaker_wav(data.get('speaker_wav', None)),
+    }, None
+
+# 在后台任务中执行合成，返回与/api/tts相同格式的结果
+def run_tts_job(job, file_path, output_dir, emotion, selected_speaker_wav):
+    start_time = time.time()
+    project_root = os.path.dirname(os.path.abspath(__file__))
+    
+    # 流式读取一遍输入得到条目总数，规范化结果写入语料缓存，合成时直接复用，不会把整个文件读入内存
+    job.total = sum(1 for _ in corpus_cache.iter_corpus(TextLoader(), file_path))
+    
+    # 每完成一条就更新任务进度，任务结果也由这些条目信息生成，不保留完整的合成结果
+    def on_result(index, result):
+        item = {'text': result.input_data.text, 'error_message': result.error_message}
+        if result.success and result.output_file:
+            item.update({
+                'path': os.path.relpath(result.output_file, project_root),
                 'filename': os.path.basename(result.output_file),
-                'processing_time': getattr(result, 'processing_time', 0)
+                'processing_time': result.processing_time or 0,
+                'audio_duration': result.audio_duration,
+                'rtf': result.rtf,
+                'stage_timings': result.stage_timings
             })
+        job.add_item(index, item, result.success)
+        # 条目之间让等待中的流式请求先执行，流式请求不必等整个文件合成完
+        job_queue.run_pending_streams()
+    
+    # 执行TTS合成，输出目录通过参数传入，不修改共享的合成器状态
+    meta_file = os.path.join(output_dir, 'meta.csv')
+    get_tts_synthesizer().process_text_file(
+        file_path,
+        output_meta_file=meta_file,
+        output_dir=output_dir,
+        emotion=emotion,
+        selected_speaker_wav=selected_speaker_wav,
+        on_result=on_result,
+        return_results=False
+    )
+    
+    # 结果按输入顺序回调，条目信息即按输入顺序排列
+    items = job.to_dict()['items']
+    
+    # 过滤成功的结果
+    success_items = [item for item in items if item['success'] and item.get('path')]
+    if not success_items:
+        return {
+            'success': False, 
+            'error': '没有成功的语音合成结果',
+            'error_details': [item['error_message'] for item in items if not item['success'] and item['error_message']]
+        }
+    
+    # 提取音频文件路径，相对路径用于前端访问
+    audio_files = [{
+        'path': item['path'],
+        'filename': item['filename'],
+        'processing_time': item['processing_time']
+    } for item in success_items]
+    
+    total_time = time.time() - start_time
+    
+    return {
+        'success': True,
+        'audio_files': audio_files,
+        'output_dir': os.path.relpath(output_dir),
+        'meta_file': os.path.relpath(meta_file),
+        'total_processing_time': round(total_time, 2),
+        'success_count': len(success_items),
+        'parsed_texts': [item['text'] for item in items],
+        'total_texts': len(items)
+    }
+
+# 提交合成任务到后台队列
+def submit_tts_job(params):
+    return job_queue.submit(
+        lambda job: run_tts_job(job, **params),
+        output_dir=params['output_dir']
+    )
+
+# 处理文本转语音请求（同步等待后台任务完成）
+@app.route('/api/tts', methods=['POST'])
+def tts_api():
+    try:
+        params, error_response = prepare_tts_request()
+        if error_response is not None:
+            return error_response
+        
+        job = submit_tts_job(params)
+        job.wait()
+        if job.status == 'failed':
+            return jsonify({'success': False, 'error': job.error})
+        return jsonify(job.result)
         
-        total_time = time.time() - start_time
+    except Exception as e:
+        logger.error(f"TTS API error: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)})
+
+# 提交异步文本转语音任务，立即返回任务ID
+@app.route('/api/jobs', methods=['POST'])
+def submit_job_api():
+    try:
+        params, error_response = prepare_tts_request()
+        if error_response is not None:
+            return error_response
         
+        job = submit_tts_job(params)
         return jsonify({
             'success': True,
-            'audio_files': audio_files,
-            'output_dir': os.path.relpath(output_dir),
-            'total_processing_time': round(total_time, 2),
-            'success_count': len(success_results),
-            'parsed_texts': text_list,
-            'total_texts': len(text_list)
+            'job_id': job.job_id,
+            'status_url': f'/api/jobs/{job.job_id}'
         })
         
     except Exception as e:
-        logger.error(f"TTS API error: {str(e)}")
+        logger.error(f"Submit job API error: {str(e)}")
         return jsonify({'success': False, 'error': str(e)})
 
+# 查询任务状态、进度和已完成的部分结果
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_api(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': '任务不存在或已过期'}), 404
+    
+    since = request.args.get('since', 0, type=int)
+    return jsonify({'success': True, **job.to_dict(since=since)})
+
+# 列出所有任务
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs_api():
+    return jsonify({'success': True, 'jobs': job_queue.list_jobs()})
+
+# 服务健康检查，模型预热完成前返回503
+@app.route('/api/health', methods=['GET'])
+def health_api():
+    # 合成器由预热任务创建，创建之前模型尚未开始加载
+    synthesizer = _tts_synthesizer
+    ready = (warmup_job.done and synthesizer is not None
+             and model_manager.is_ready(synthesizer.model_name, synthesizer.precision))
+    return jsonify({
+        'success': True,
+        'ready': ready,
+        'model': model_manager.get_model_stats(synthesizer.model_name, synthesizer.precision) if synthesizer else {},
+        'registry': model_manager.get_registry_stats()
+    }), 200 if ready else 503
+
+# 解析前端传入的音色名称，返回音色文件路径，'random'或不存在时返回None
+def resolve_speaker_wav(selected_speaker_wav):
+    if not selected_speaker_wav or selected_speaker_wav == 'random':
+        return None
+    # 构建完整的音色文件路径
+    speakers_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data_voice', 'selected_voice')
+    speaker_file_path = os.path.join(speakers_dir, f"{selected_speaker_wav}.wav")
+    if os.path.exists(speaker_file_path):
+        return speaker_file_path
+    logger.warning(f"音色文件不存在: {speaker_file_path}，将使用随机选择")
+    return None
+
+# 生成流式WAV文件头，数据长度未知时使用最大值
+def wav_stream_header(sample_rate, channels=1, bits_per_sample=16):
+    byte_rate = sample_rate * channels * bits_per_sample // 8
+    block_align = channels * bits_per_sample // 8
+    data_size = 0xFFFFFFFF - 36
+    return (
+        b'RIFF' + struct.pack('<I', 0xFFFFFFFF) + b'WAVE'
+        + b'fmt ' + struct.pack('<IHHIIHH', 16, 1, channels, sample_rate, byte_rate, block_align, bits_per_sample)
+        + b'data' + struct.pack('<I', data_size)
+    )
+
+# 将浮点波形转换为16位PCM字节
+def audio_to_pcm16(audio):
+    audio = np.clip(np.asarray(audio, dtype=np.float32), -1.0, 1.0)
+    return (audio * 32767).astype('<i2').tobytes()
+
+# 流式文本转语音，边解码边返回WAV/PCM音频数据
+@app.route('/api/tts/stream', methods=['POST'])
+def tts_stream_api():
+    # 模型由预热任务加载，加载完成前不在请求线程中等待，与/api/health一样返回503
+    if not warmup_job.done or _tts_synthesizer is None:
+        return jsonify({'success': False, 'error': '模型正在加载，请稍后重试'}), 503
+    
+    data = request.get_json(silent=True) or request.form.to_dict()
+    
+    text = (data.get('text') or '').strip()
+    if not text:
+        return jsonify({'success': False, 'error': '请输入文本'})
+    
+    audio_format = data.get('format', 'wav')
+    if audio_format not in ('wav', 'pcm'):
+        return jsonify({'success': False, 'error': '不支持的音频格式，请使用wav或pcm'})
+    
+    language = data.get('language', 'zh-cn')
+    speaker_wav = resolve_speaker_wav(data.get('speaker_wav')) or get_voice_library().get_random_prompt()
+    
+    # 如果有情感音频，使用情感音频和音色音频共同作为参考
+    emotion_wav = TTSSynthesizer.resolve_emotion_wav(data.get('emotion', 'neutral'))
+    if emotion_wav:
+        speaker_wav = [speaker_wav, emotion_wav]
+    
+    # 按行切分文本，与文件输入的处理方式一致
+    text_loader = TextLoader()
+    lines = [text_loader.convert_special_symbols(line.strip()) for line in text.splitlines() if line.strip()]
+    tts_synthesizer = get_tts_synthesizer()
+    sample_rate = tts_synthesizer.get_output_sample_rate()
+    
+    # 流式合成也在任务队列中执行，与其他流式请求和/api/tts任务依次使用模型；
+    # 工作线程逐块转换为PCM字节，请求线程只负责发送
+    def synthesize_chunks(job):
+        for index, line in enumerate(lines):
+            for chunk in tts_synthesizer.synthesize_stream(line, speaker_wav, language=language):
+                yield audio_to_pcm16(chunk.audio)
+            job.add_item(index, {'text': line}, True)
+    
+    job = job_queue.submit_stream(synthesize_chunks, total=len(lines))
+    
+    def generate():
+        start_time = time.time()
+        first_chunk_time = None
+        if audio_format == 'wav':
+            yield wav_stream_header(sample_rate)
+        try:
+            for pcm in job.iter_stream():
+                if first_chunk_time is None:
+                    first_chunk_time = time.time() - start_time
+                    logger.info(f"Stream TTS time to first chunk: {first_chunk_time:.3f} seconds")
+                yield pcm
+        except Exception as e:
+            logger.error(f"Stream TTS error: {str(e)}")
+        finally:
+            # 客户端断开连接时停止合成，释放任务队列
+            job.cancel()
+        logger.info(f"Stream TTS finished in {time.time() - start_time:.2f} seconds")
+    
+    mimetype = 'audio/wav' if audio_format == 'wav' else 'audio/L16'
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['X-Sample-Rate'] = str(sample_rate)
+    response.headers['X-Job-Id'] = job.job_id
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 # 处理噪音混合请求
 @app.route('/api/mix-noise', methods=['POST'])
 def mix_noise_api():
@@ -231,7 +443,7 @@ def mix_noise_api():
         
         # 执行噪音混合并捕获可能的异常
         try:
-            noise_mixed = noise_mixer.mix_noise(
+            noise_mixed = get_noise_mixer().mix_noise(
                 audio_path=full_audio_path,
                 noise_type=noise_type,
                 snr_db=snr,
@@ -282,7 +494,7 @@ def mix_random_noise_api():
         
         # 执行随机噪音混合并捕获可能的异常
         try:
-            noise_mixed_files = noise_mixer.mix_random_noise(
+            noise_mixed_files = get_noise_mixer().mix_random_noise(
                 audio_path=full_audio_path,
                 snr_db=snr,
                 output_dir=output_dir,
@@ -394,7 +606,7 @@ def parse_file_api():
             return jsonify({'success': False, 'error': '没有选择文件'}), 400
         
         # 检查文件类型
-        allowed_extensions = {'.txt', '.csv', '.json', '.xlsx', '.xls'}
+        allowed_extensions = {'.txt', '.csv', '.json', '.jsonl', '.xlsx', '.xls'}
         file_ext = os.path.splitext(file.filename)[1].lower()
         if file_ext not in allowed_extensions:
             return jsonify({
@@ -408,12 +620,9 @@ def parse_file_api():
         file.save(temp_file_path)
         
         try:
-            # 使用TextLoader解析文件
-            text_loader = TextLoader()
-            texts = text_loader.load_text_file(temp_file_path)
-            
-            # 提取文本内容
-            text_list = [item['text'] for item in texts]
+            # 使用TextLoader解析文件，结果按文件内容缓存，随后上传同一文件合成时不再解析；
+            # 前端需要全部文本填入输入框，这里只保留文本内容，不保留完整的文本字典
+            text_list = [item['text'] for item in corpus_cache.iter_corpus(TextLoader(), temp_file_path)]
             
             return jsonify({
                 'success': True,
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+比较不同推理精度（fp32 / int8 / bf16）下XTTS的合成速度和内存占用
+
+每种精度在独立的子进程中运行，分别统计模型加载耗时、实时率（RTF）和进程峰值内存（RSS）
+用法：python benchmark_precision.py --speaker-wav <参考音频> [--precisions fp32,int8,bf16] [--runs 3]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+DEFAULT_TEXTS = [
+    "今天天气很好，我们一起去公园散步吧。",
+    "语音合成技术可以将文字转换为自然流畅的语音。",
+    "请在听到提示音后留言，我们会尽快给您回复。"
+]
+
+def peak_rss_mb() -> float:
+    """当前进程的峰值内存（MB），Linux下ru_maxrss单位为KB，macOS下为字节"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+def run_worker(precision: str, speaker_wav: str, texts, runs: int, language: str) -> dict:
+    """在当前进程中加载指定精度的模型并合成测试文本"""
+    from src.modules.model_manager import ModelManager
+    from src.tts_synthesizer import TTSSynthesizer
+
+    model_manager = ModelManager()
+    start_time = time.time()
+    synthesizer = TTSSynthesizer(output_dir='output/benchmark', model_manager=model_manager, precision=precision)
+    load_time = time.time() - start_time
+    stats = model_manager.get_model_stats(synthesizer.model_name, precision)
+
+    # 第一次合成包含初始化开销，不计入统计
+    synthesizer.synthesize_to_array(texts[0], speaker_wav, language=language)
+
+    processing_time = 0.0
+    audio_duration = 0.0
+    for _ in range(runs):
+        for text in texts:
+            result = synthesizer.synthesize_to_array(text, speaker_wav, language=language)
+            if not result.success:
+                raise RuntimeError(result.error_message)
+            processing_time += result.processing_time
+            audio_duration += result.audio_duration
+
+    return {
+        'precision': precision,
+        'effective_precision': stats.get('precision', precision),
+        'load_time': load_time,
+        'rtf': processing_time / audio_duration if audio_duration else None,
+        'audio_duration': audio_duration,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark XTTS inference precisions')
+    parser.add_argument('--speaker-wav', type=str, required=True, help='Speaker reference wav file')
+    parser.add_argument('--precisions', type=str, default='fp32,int8,bf16', help='Comma-separated precisions (default: fp32,int8,bf16)')
+    parser.add_argument('--runs', type=int, default=3, help='Number of passes over the test texts (default: 3)')
+    parser.add_argument('--language', type=str, default='zh-cn', help='Language code (default: zh-cn)')
+    parser.add_argument('--texts-file', type=str, help='Text file with one sentence per line (default: built-in texts)')
+    parser.add_argument('--worker', type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    texts = DEFAULT_TEXTS
+    if args.texts_file:
+        with open(args.texts_file, 'r', encoding='utf-8') as f:
+            texts = [line.strip() for line in f if line.strip()]
+
+    if args.worker:
+        result = run_worker(args.worker, args.speaker_wav, texts, args.runs, args.language)
+        print('BENCHMARK_RESULT ' + json.dumps(result))
+        return
+
+    results = []
+    for precision in args.precisions.split(','):
+        print(f"=== Benchmarking {precision} ===")
+        cmd = [sys.executable, os.path.abspath(__file__), '--worker', precision,
+               '--speaker-wav', args.speaker_wav, '--runs', str(args.runs), '--language', args.language]
+        if args.texts_file:
+            cmd += ['--texts-file', args.texts_file]
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, text=True)
+        lines = [line for line in proc.stdout.splitlines() if line.startswith('BENCHMARK_RESULT ')]
+        if proc.returncode != 0 or not lines:
+            print(f"{precision} failed with exit code {proc.returncode}")
+            continue
+        results.append(json.loads(lines[-1][len('BENCHMARK_RESULT '):]))
+
+    print(f"\n{'precision':<12}{'load (s)':>10}{'RTF':>10}{'peak RSS (MB)':>16}")
+    for r in results:
+        name = r['precision'] if r['precision'] == r['effective_precision'] else f"{r['precision']}->{r['effective_precision']}"
+        rtf = f"{r['rtf']:.3f}" if r['rtf'] is not None else '-'
+        print(f"{name:<12}{r['load_time']:>10.1f}{rtf:>10}{r['peak_rss_mb']:>16.0f}")
+
+if __name__ == "__main__":
+    main()
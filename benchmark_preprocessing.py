@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+比较不同中文预处理方式（bert / regex）的启动耗时、吞吐量和内存占用
+
+每种预处理方式在独立的子进程中运行，分别统计创建预处理器的耗时（加载分词器或编译正则表达式）、
+每秒处理的行数和进程峰值内存（RSS）
+用法：python benchmark_preprocessing.py [--texts-file <语料文件>] [--preprocessors bert,regex] [--lines 100000]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+from benchmark_precision import peak_rss_mb
+
+DEFAULT_TEXTS = [
+    "今天天气很好，我们一起去公园散步吧。",
+    "语音合成技术可以将文字转换为自然流畅的语音。",
+    "请在听到提示音后留言，我们会尽快给您回复。",
+    "会议定于3月15日下午2点在301会议室召开，请准时参加。",
+    "他问道：“你吃饭了吗？”我回答：“还没有。”"
+]
+
+def run_worker(name: str, texts, num_lines: int) -> dict:
+    """在当前进程中创建预处理器并处理指定行数的文本"""
+    from src.modules.text_preprocessor import create_preprocessor
+
+    start_time = time.perf_counter()
+    model_manager = None
+    if name == 'bert':
+        from src.modules.model_manager import ModelManager
+        model_manager = ModelManager(snapshot_dir=None)
+    preprocessor = create_preprocessor(name, model_manager)
+    # 正则表达式在首次使用时编译，计入启动耗时
+    preprocessor.preprocess(texts[0])
+    setup_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for i in range(num_lines):
+        preprocessor.preprocess(texts[i % len(texts)])
+    elapsed = time.perf_counter() - start_time
+
+    return {
+        'preprocessor': name,
+        'setup_time': setup_time,
+        'lines_per_second': num_lines / elapsed if elapsed else None,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Chinese text preprocessors')
+    parser.add_argument('--preprocessors', type=str, default='bert,regex', help='Comma-separated preprocessors (default: bert,regex)')
+    parser.add_argument('--lines', type=int, default=100000, help='Number of lines to preprocess (default: 100000)')
+    parser.add_argument('--texts-file', type=str, help='Text file with one sentence per line (default: built-in texts)')
+    parser.add_argument('--worker', type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    texts = DEFAULT_TEXTS
+    if args.texts_file:
+        with open(args.texts_file, 'r', encoding='utf-8') as f:
+            texts = [line.strip() for line in f if line.strip()]
+
+    if args.worker:
+        result = run_worker(args.worker, texts, args.lines)
+        print('BENCHMARK_RESULT ' + json.dumps(result))
+        return
+
+    results = []
+    for name in args.preprocessors.split(','):
+        print(f"=== Benchmarking {name} ===")
+        cmd = [sys.executable, os.path.abspath(__file__), '--worker', name, '--lines', str(args.lines)]
+        if args.texts_file:
+            cmd += ['--texts-file', args.texts_file]
+        proc = subprocess.run(cmd, stdout=subprocess.PIPE, text=True)
+        lines = [line for line in proc.stdout.splitlines() if line.startswith('BENCHMARK_RESULT ')]
+        if proc.returncode != 0 or not lines:
+            print(f"{name} failed with exit code {proc.returncode}")
+            continue
+        results.append(json.loads(lines[-1][len('BENCHMARK_RESULT '):]))
+
+    print(f"\n{'preprocessor':<14}{'setup (s)':>10}{'lines/s':>12}{'peak RSS (MB)':>16}")
+    for r in results:
+        print(f"{r['preprocessor']:<14}{r['setup_time']:>10.2f}{r['lines_per_second']:>12.0f}{r['peak_rss_mb']:>16.0f}")
+
+if __name__ == "__main__":
+    main()
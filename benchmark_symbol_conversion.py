@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+比较特殊符号转换的新旧实现在大量文本上的吞吐量
+
+原实现每行逐个符号调用str.replace并做两次正则替换，新实现使用预编译的转换表和一次正则扫描
+用法：python benchmark_symbol_conversion.py [--texts-file <语料文件>] [--lines 1000000]
+"""
+
+import os
+import sys
+import time
+import argparse
+import logging
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+logging.basicConfig(level=logging.WARNING)
+
+from src.modules.text_loader import TextLoader
+from test_symbol_conversion import reference_convert
+
+DEFAULT_TEXTS = [
+    "今天天气很好，我们一起去公园散步吧。",
+    "语音合成技术可以将文字转换为自然流畅的语音。",
+    "会议定于3月15日下午2点在301会议室召开，请准时参加。",
+    "今年的销售额增长了15%，预计明年增长10-20%。",
+    "室外温度为-5℃到3℃，湿度约为60％。",
+    "当x≥0且y≤10时，x×y的最大值约为100。"
+]
+
+def measure(convert, texts, num_lines: int) -> float:
+    """返回每秒处理的行数"""
+    start_time = time.perf_counter()
+    for i in range(num_lines):
+        convert(texts[i % len(texts)])
+    return num_lines / (time.perf_counter() - start_time)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark special symbol conversion')
+    parser.add_argument('--lines', type=int, default=1000000, help='Number of lines to convert (default: 1000000)')
+    parser.add_argument('--texts-file', type=str, help='Text file with one sentence per line (default: built-in texts)')
+    args = parser.parse_args()
+
+    texts = DEFAULT_TEXTS
+    if args.texts_file:
+        with open(args.texts_file, 'r', encoding='utf-8') as f:
+            texts = [line.strip() for line in f if line.strip()]
+
+    loader = TextLoader()
+    results = [
+        ('reference', measure(reference_convert, texts, args.lines)),
+        ('compiled', measure(loader.convert_special_symbols, texts, args.lines))
+    ]
+
+    print(f"\n{'implementation':<16}{'lines/s':>12}{'speedup':>10}")
+    for name, lines_per_second in results:
+        print(f"{name:<16}{lines_per_second:>12.0f}{lines_per_second / results[0][1]:>9.1f}x")
+
+if __name__ == "__main__":
+    main()
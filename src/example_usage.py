@@ -30,16 +30,17 @@ def main():
 "Kokoro 是一系列体积虽小但功能强大的 TTS 模型。该模型是经过短期训练的结果，从专业数据集中添加了100名中文使用者。中文数据由专业数据集公司「龙猫数据」免费且无偿地提供给我们。感谢你们让这个模型成为可能。另外，一些众包合成英语数据也进入了训练组合：1小时的 Maple，美国女性。1小时的 Sol，另一位美国女性。和1小时的 Vale，一位年长的英国女性。由于该模型删除了许多声音，因此它并不是对其前身的严格升级，但它提前发布以收集有关新声音和标记化的反馈。除了中文数据集和3小时的英语之外，其余数据都留在本次训练中。目标是推动模型系列的发展，并最终恢复一些被遗留的声音。美国版权局目前的指导表明，合成数据通常不符合版权保护的资格。由于这些合成数据是众包的，因此模型训练师不受任何服务条款的约束。该 Apache 许可模式也符合 OpenAI 所宣称的广泛传播 AI 优势的使命。如果您愿意帮助进一步完成这一使命，请考虑为此贡献许可的音频数据。"
         ]
         
-        # 5. 逐个合成文本
+        # 5. 逐个合成文本，长段落按标点分段后由多个进程并行合成，再拼接为一个文件
         for i, text in enumerate(texts):
             output_file = os.path.join("./output", f"example_{i}.wav")
             logger.info(f"Synthesizing text {i+1}: {text[:30]}...")
             
-            result = synthesizer.synthesize_text(
+            result = synthesizer.synthesize_long_text(
                 text=text,
                 speaker_wav=random_prompt,
                 output_path=output_file,
-                language="zh-cn"
+                language="zh-cn",
+                num_workers=min(4, os.cpu_count() or 1)
             )
             
             if result.success:
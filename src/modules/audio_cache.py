@@ -0,0 +1,305 @@
+import os
+import json
+import time
+import shutil
+import sqlite3
+import hashlib
+import logging
+import argparse
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class AudioCache:
+    """
+    基于内容寻址的合成音频磁盘缓存
+
+    缓存键为(规范化文本, 参考音频内容哈希, XTTS参数, 模型名称)的哈希，
+    命中时通过硬链接（跨文件系统时复制）将缓存音频放到输出路径，按总大小进行LRU淘汰。
+    XTTS按temperature、top_k、top_p随机采样，相同输入每次合成的结果不同，缓存返回的是第一次合成的采样结果
+    """
+    def __init__(self, cache_dir: str = "cache/audio", max_size_bytes: int = 10 * 1024 ** 3):
+        """
+        初始化音频缓存
+
+        Args:
+            cache_dir: 缓存目录，默认为"cache/audio"
+            max_size_bytes: 缓存的最大总大小（字节），默认为10GB
+        """
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, "objects")
+        self.index_file = os.path.join(cache_dir, "index.db")
+        self.max_size_bytes = max_size_bytes
+        self._lock = threading.Lock()
+        # 参考音频内容哈希的缓存，键为(路径, 修改时间, 文件大小)
+        self._file_hashes: Dict[Tuple[str, float, int], str] = {}
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, path TEXT NOT NULL, size INTEGER NOT NULL, "
+                "text TEXT, created REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON entries(last_access)")
+
+        logger.info(f"AudioCache initialized at {cache_dir} with max size: {max_size_bytes} bytes")
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """支持传递到多进程工作池的子进程中"""
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """创建索引数据库连接，每次操作使用独立连接以支持多进程访问，退出时提交并关闭"""
+        conn = sqlite3.connect(self.index_file, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def hash_file(self, file_path: str) -> str:
+        """
+        计算文件内容的SHA-256哈希，结果按(路径, 修改时间, 大小)缓存
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            十六进制哈希字符串
+        """
+        stat = os.stat(file_path)
+        stat_key = (os.path.abspath(file_path), stat.st_mtime, stat.st_size)
+        if stat_key not in self._file_hashes:
+            digest = hashlib.sha256()
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+            self._file_hashes[stat_key] = digest.hexdigest()
+        return self._file_hashes[stat_key]
+
+    def make_key(self, text: str, speaker_wav: Union[str, List[str]], params: Dict[str, Any],
+                 model_name: Optional[str] = None, language: str = "zh-cn",
+                 split_sentences: bool = True, conditioning: Optional[Dict[str, Any]] = None) -> str:
+        """
+        生成缓存键
+
+        Args:
+            text: 要合成的文本
+            speaker_wav: 音色参考音频文件路径或路径列表（可包含情感参考音频）
+            params: XTTS参数（需为已处理'random'后的实际值）
+            model_name: 模型名称
+            language: 语言代码
+            split_sentences: 是否分割句子
+            conditioning: 影响合成结果的其他设置，如gpt_cond_len和预处理规则版本
+
+        Returns:
+            十六进制缓存键
+        """
+        wavs = [speaker_wav] if isinstance(speaker_wav, str) else list(speaker_wav)
+        payload = {
+            'text': ' '.join(text.split()),
+            'speaker_wav': [self.hash_file(wav) for wav in wavs],
+            'params': params,
+            'model_name': model_name,
+            'language': language,
+            'split_sentences': split_sentences,
+            'conditioning': conditioning
+        }
+        data = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def _object_path(self, key: str) -> str:
+        """获取缓存对象的存储路径"""
+        return os.path.join(self.objects_dir, key[:2], f"{key}.wav")
+
+    @staticmethod
+    def _link_or_copy(src: str, dst: str) -> None:
+        """优先使用硬链接，失败时（如跨文件系统）回退为复制"""
+        dst_dir = os.path.dirname(dst)
+        if dst_dir:
+            os.makedirs(dst_dir, exist_ok=True)
+        if os.path.lexists(dst):
+            os.remove(dst)
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copy2(src, dst)
+
+    def get(self, key: str, output_path: str) -> bool:
+        """
+        查询缓存，命中时将缓存音频放到输出路径；缓存文件在查询过程中被淘汰或删除时视为未命中
+
+        Args:
+            key: 缓存键
+            output_path: 输出文件路径
+
+        Returns:
+            是否命中
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT path FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return False
+
+            try:
+                self._link_or_copy(row[0], output_path)
+            except OSError as e:
+                # 缓存文件已被淘汰或外部删除，清理索引和可能复制了一部分的输出文件
+                logger.warning(f"Failed to read audio cache entry {key}: {str(e)}")
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                if os.path.lexists(output_path):
+                    os.remove(output_path)
+                return False
+
+            conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+
+        logger.info(f"Audio cache hit: {output_path}")
+        return True
+
+    def put(self, key: str, audio_path: str, text: str = '') -> None:
+        """
+        将合成的音频加入缓存
+
+        Args:
+            key: 缓存键
+            audio_path: 已合成的音频文件路径
+            text: 原始文本，仅用于查看缓存内容
+        """
+        object_path = self._object_path(key)
+        self._link_or_copy(audio_path, object_path)
+        size = os.path.getsize(object_path)
+        now = time.time()
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, path, size, text, created, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, object_path, size, text, now, now)
+            )
+
+        self.evict()
+
+    def evict(self, max_size_bytes: Optional[int] = None) -> int:
+        """
+        按最近访问时间淘汰缓存，直到总大小不超过上限
+
+        Args:
+            max_size_bytes: 大小上限（字节），默认为初始化时的上限
+
+        Returns:
+            被淘汰的条目数
+        """
+        limit = self.max_size_bytes if max_size_bytes is None else max_size_bytes
+        removed = 0
+        with self._lock, self._connect() as conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= limit:
+                return 0
+
+            for key, path, size in conn.execute(
+                "SELECT key, path, size FROM entries ORDER BY last_access ASC"
+            ).fetchall():
+                if total <= limit:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    # 可能已被其他进程删除
+                    pass
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                removed += 1
+
+        if removed:
+            logger.info(f"Evicted {removed} entries from audio cache")
+        return removed
+
+    def clear(self) -> int:
+        """
+        清空缓存
+
+        Returns:
+            被删除的条目数
+        """
+        return self.evict(max_size_bytes=0)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计信息
+
+        Returns:
+            包含条目数、总大小和大小上限的字典
+        """
+        with self._connect() as conn:
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {
+            'cache_dir': self.cache_dir,
+            'entries': count,
+            'size_bytes': total,
+            'max_size_bytes': self.max_size_bytes
+        }
+
+    def list_entries(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        列出最近访问的缓存条目
+
+        Args:
+            limit: 最多返回的条目数
+
+        Returns:
+            缓存条目列表
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT key, size, text, created, last_access FROM entries ORDER BY last_access DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [
+            {'key': key, 'size': size, 'text': text, 'created': created, 'last_access': last_access}
+            for key, size, text, created, last_access in rows
+        ]
+
+def main():
+    """缓存查看与清理命令行工具"""
+    parser = argparse.ArgumentParser(description='TTS audio cache tool')
+    parser.add_argument('--cache-dir', type=str, default='cache/audio', help='Audio cache directory')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('stats', help='Show cache statistics')
+    list_parser = subparsers.add_parser('list', help='List recently used entries')
+    list_parser.add_argument('--limit', type=int, default=20, help='Number of entries to show (default: 20)')
+    prune_parser = subparsers.add_parser('prune', help='Evict least recently used entries')
+    prune_parser.add_argument('--max-size-mb', type=float, required=True, help='Target cache size in MB')
+    subparsers.add_parser('clear', help='Remove all entries')
+
+    args = parser.parse_args()
+    cache = AudioCache(cache_dir=args.cache_dir)
+
+    if args.command == 'stats':
+        stats = cache.stats()
+        print(f"Cache directory: {stats['cache_dir']}")
+        print(f"  Entries: {stats['entries']}")
+        print(f"  Size: {stats['size_bytes'] / 1024 ** 2:.1f} MB")
+    elif args.command == 'list':
+        for entry in cache.list_entries(args.limit):
+            print(f"{entry['key'][:16]}  {entry['size'] / 1024:.0f} KB  {entry['text']}")
+    elif args.command == 'prune':
+        removed = cache.evict(int(args.max_size_mb * 1024 ** 2))
+        print(f"Removed {removed} entries")
+    elif args.command == 'clear':
+        removed = cache.clear()
+        print(f"Removed {removed} entries")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+from src.modules.stage_timer import StageTimer
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class XttsBatchDecoder:
+    """
+    XTTS批量解码器，将同一音色、相同token长度的多条文本合并为一个batch进行GPT自回归解码
+
+    只有token长度完全相同的文本才会合并，因此不需要对文本进行padding，
+    每条输出与逐条调用Xtts.inference的计算过程一致
+    """
+    def __init__(self, xtts_model, batch_size: int = 8):
+        """
+        初始化批量解码器
+
+        Args:
+            xtts_model: XTTS模型实例
+            batch_size: 每个batch的最大文本数，默认为8
+        """
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+
+        self.model = xtts_model
+        self.batch_size = batch_size
+
+    def tokenize(self, text: str, language: str) -> List[int]:
+        """
+        将文本转换为XTTS的token序列，处理方式与Xtts.inference一致
+
+        Args:
+            text: 要合成的句子
+            language: 语言代码
+
+        Returns:
+            token列表
+        """
+        language = language.split("-")[0]
+        tokens = self.model.tokenizer.encode(text.strip().lower(), lang=language)
+        if len(tokens) >= self.model.args.gpt_max_text_tokens:
+            raise ValueError(f"Text is too long for XTTS: {len(tokens)} tokens")
+        return tokens
+
+    @torch.inference_mode()
+    def decode(self, token_lists: List[List[int]], gpt_cond_latent, speaker_embedding,
+               temperature: float, length_penalty: float, repetition_penalty: float,
+               top_k: int, top_p: float, speed: float = 1.0,
+               timer: Optional[StageTimer] = None) -> List[np.ndarray]:
+        """
+        对一组相同长度的token序列进行批量解码
+
+        Args:
+            token_lists: token序列列表，所有序列长度必须相同
+            gpt_cond_latent: GPT条件向量
+            speaker_embedding: 说话人向量
+            temperature: softmax温度
+            length_penalty: 长度惩罚
+            repetition_penalty: 重复惩罚
+            top_k: top-k采样参数
+            top_p: top-p采样参数
+            speed: 语速比率
+            timer: 分阶段计时器，记录整个batch的gpt_decode和vocoder耗时，默认为None
+
+        Returns:
+            每条输入对应的波形数据列表
+        """
+        if len({len(tokens) for tokens in token_lists}) > 1:
+            raise ValueError("All token sequences in a batch must have the same length")
+
+        timer = timer or StageTimer()
+        gpt = self.model.gpt
+        device = self.model.device
+        length_scale = 1.0 / max(speed, 0.05)
+
+        text_tokens = torch.IntTensor(token_lists).to(device)
+        batch_cond_latent = gpt_cond_latent.expand(len(token_lists), -1, -1)
+
+        # GPT自回归解码，这是XTTS推理中最耗时的部分
+        timer.start('gpt_decode')
+        batch_codes = gpt.generate(
+            cond_latents=batch_cond_latent,
+            text_inputs=text_tokens,
+            input_tokens=None,
+            do_sample=True,
+            top_p=top_p,
+            top_k=top_k,
+            temperature=temperature,
+            num_return_sequences=1,
+            num_beams=1,
+            length_penalty=length_penalty,
+            repetition_penalty=repetition_penalty,
+            output_attentions=False,
+        )
+        timer.stop()
+
+        wavs = []
+        for i in range(len(token_lists)):
+            timer.start('gpt_decode')
+            gpt_codes = self._trim_codes(batch_codes[i]).unsqueeze(0)
+            item_tokens = text_tokens[i:i + 1]
+
+            expected_output_len = torch.tensor([gpt_codes.shape[-1] * gpt.code_stride_len], device=device)
+            text_len = torch.tensor([item_tokens.shape[-1]], device=device)
+            gpt_latents = gpt(
+                item_tokens,
+                text_len,
+                gpt_codes,
+                expected_output_len,
+                cond_latents=gpt_cond_latent,
+                return_attentions=False,
+                return_latent=True,
+            )
+            if length_scale != 1.0:
+                gpt_latents = F.interpolate(
+                    gpt_latents.transpose(1, 2), scale_factor=length_scale, mode="linear"
+                ).transpose(1, 2)
+            timer.stop()
+
+            with timer.stage('vocoder'):
+                wav = self.model.hifigan_decoder(gpt_latents, g=speaker_embedding)
+                wavs.append(wav.cpu().squeeze().numpy())
+
+        return wavs
+
+    def _trim_codes(self, codes):
+        """
+        去掉batch中较短序列末尾的padding，保留第一个停止符，与单条解码的输出一致
+
+        Args:
+            codes: 单条序列的音频code
+
+        Returns:
+            去掉padding后的音频code
+        """
+        stop_positions = (codes == self.model.gpt.stop_audio_token).nonzero()
+        if len(stop_positions) == 0:
+            return codes
+        return codes[:int(stop_positions[0]) + 1]
+
+    @staticmethod
+    def make_buckets(keys: List[Any], batch_size: int) -> List[List[int]]:
+        """
+        按键值对条目分桶，同一个桶中的条目可以合并为一个batch
+
+        Args:
+            keys: 每个条目的分桶键（音色、token长度、推理参数等）
+            batch_size: 每个batch的最大条目数
+
+        Returns:
+            条目索引的batch列表
+        """
+        buckets: Dict[Any, List[int]] = {}
+        for idx, key in enumerate(keys):
+            buckets.setdefault(key, []).append(idx)
+
+        batches = []
+        for indices in buckets.values():
+            for start in range(0, len(indices), batch_size):
+                batches.append(indices[start:start + batch_size])
+        return batches
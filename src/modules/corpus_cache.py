@@ -0,0 +1,222 @@
+import os
+import gzip
+import json
+import hashlib
+import logging
+import itertools
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, Optional, Tuple
+
+from src.modules.text_loader import NORMALIZATION_VERSION
+from src.modules.text_preprocessor import PREPROCESSING_VERSION
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 缓存条目的格式版本，条目内容的结构变化时递增
+CORPUS_CACHE_VERSION = 1
+
+class CorpusCache:
+    """
+    预处理后语料的磁盘缓存，同一输入文件再次处理时跳过读取、特殊符号转换和中文预处理
+
+    缓存键为(输入文件内容哈希, 读取参数, 文本规范化版本, 预处理方式及版本)的哈希。每个条目是一个gzip压缩的
+    JSON Lines文件，每行一个文本字典：id、original_text、规范化后的text、其他列，指定预处理器时还有processed_text。
+    条目在完整读取输入后才替换写入，读取中断不会留下不完整的条目；超过max_entries时删除最久未使用的条目
+    """
+    def __init__(self, cache_dir: str = "cache/corpus", max_entries: int = 64):
+        """
+        初始化语料缓存
+
+        Args:
+            cache_dir: 缓存目录，默认为"cache/corpus"
+            max_entries: 最多保留的条目数，默认为64
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # 输入文件内容哈希的缓存，键为(路径, 修改时间, 文件大小)
+        self._file_hashes: Dict[Tuple[str, float, int], str] = {}
+
+        os.makedirs(cache_dir, exist_ok=True)
+        logger.info(f"CorpusCache initialized at {cache_dir} with max entries: {max_entries}")
+
+    def hash_file(self, file_path: str) -> str:
+        """
+        计算文件内容的SHA-256哈希，结果按(路径, 修改时间, 大小)缓存
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            十六进制哈希字符串
+        """
+        stat = os.stat(file_path)
+        memo_key = (os.path.abspath(file_path), stat.st_mtime, stat.st_size)
+        with self._lock:
+            cached = self._file_hashes.get(memo_key)
+        if cached:
+            return cached
+
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        file_hash = digest.hexdigest()
+        with self._lock:
+            self._file_hashes[memo_key] = file_hash
+        return file_hash
+
+    def make_key(self, file_path: str, preprocessor_name: Optional[str] = None, **load_kwargs) -> str:
+        """
+        生成缓存键
+
+        Args:
+            file_path: 输入文件路径
+            preprocessor_name: 预处理方式，默认为None（只缓存读取和规范化的结果）
+            **load_kwargs: 读取参数，如text_column、start、stop
+
+        Returns:
+            缓存键
+        """
+        payload = {
+            'version': CORPUS_CACHE_VERSION,
+            'file': self.hash_file(file_path),
+            # 文件类型决定解析方式，内容相同、扩展名不同的文件分别缓存
+            'ext': os.path.splitext(file_path)[1].lower(),
+            'load_kwargs': load_kwargs,
+            'normalization': NORMALIZATION_VERSION,
+            'preprocessor': [preprocessor_name, PREPROCESSING_VERSION] if preprocessor_name else None
+        }
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.jsonl.gz")
+
+    def contains(self, file_path: str, preprocessor_name: Optional[str] = None, **load_kwargs) -> bool:
+        """
+        检查输入文件是否已有缓存条目
+
+        Args:
+            file_path: 输入文件路径
+            preprocessor_name: 预处理方式，默认为None（只含规范化结果的条目）
+            **load_kwargs: 读取参数
+
+        Returns:
+            是否已有条目
+        """
+        return os.path.exists(self._entry_path(self.make_key(file_path, preprocessor_name, **load_kwargs)))
+
+    def _open_entry(self, path: str) -> Optional[IO[str]]:
+        """
+        打开缓存条目并更新最近使用时间，条目不存在（包括被其他进程淘汰）时返回None
+
+        条目打开后再被删除仍可以读完
+        """
+        try:
+            f = gzip.open(path, 'rt', encoding='utf-8')
+        except FileNotFoundError:
+            return None
+        try:
+            # 更新修改时间，作为淘汰时的最近使用时间
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return f
+
+    @contextmanager
+    def _writer(self, key: str) -> Iterator[Callable[[Dict[str, Any]], None]]:
+        """
+        写入缓存条目，先写入临时文件，正常退出时替换为正式条目，异常或提前关闭时删除临时文件
+
+        Returns:
+            写入一个文本字典的函数
+        """
+        path = self._entry_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        f = gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6)
+        try:
+            yield lambda text_dict: f.write(json.dumps(text_dict, ensure_ascii=False, default=str) + '\n')
+            f.close()
+            os.replace(tmp_path, path)
+        except BaseException:
+            f.close()
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._evict()
+
+    def _evict(self) -> None:
+        """条目数超过上限时，按最近使用时间删除最旧的条目"""
+        try:
+            names = [name for name in os.listdir(self.cache_dir) if name.endswith('.jsonl.gz')]
+        except OSError as e:
+            logger.warning(f"Failed to evict corpus cache entries: {str(e)}")
+            return
+        if len(names) <= self.max_entries:
+            return
+
+        entries = []
+        for name in names:
+            path = os.path.join(self.cache_dir, name)
+            try:
+                entries.append((os.stat(path).st_mtime, path))
+            except FileNotFoundError:
+                # 可能已被其他进程删除
+                continue
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_entries)]:
+            try:
+                os.remove(path)
+                logger.info(f"Evicted corpus cache entry: {path}")
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Failed to evict corpus cache entry {path}: {str(e)}")
+
+    def iter_corpus(self, text_loader, file_path: str, preprocessor=None,
+                    normalized: Optional[Iterable[Dict[str, Any]]] = None, **load_kwargs) -> Iterator[Dict[str, Any]]:
+        """
+        读取输入文件的语料，命中缓存时直接读取缓存条目，否则读取文件并在读取完成后写入缓存
+
+        指定预处理器但没有对应条目时，先查找只含规范化结果的条目（如Web UI解析文件时写入的），
+        只对其补做预处理
+
+        Args:
+            text_loader: TextLoader实例
+            file_path: 输入文件路径
+            preprocessor: ChinesePreprocessor实例，默认为None（不做预处理，结果中没有processed_text）
+            normalized: 已读取的规范化结果（如在子进程中读取的），未命中缓存时代替读取文件，默认为None
+            **load_kwargs: 读取参数，传给TextLoader.iter_text_batches
+
+        Returns:
+            文本字典的迭代器
+        """
+        preprocessor_name = preprocessor.name if preprocessor is not None else None
+        key = self.make_key(file_path, preprocessor_name, **load_kwargs)
+        # 直接打开条目而不是先检查是否存在，检查之后条目可能被其他进程淘汰
+        f = self._open_entry(self._entry_path(key))
+        if f is not None:
+            logger.info(f"Corpus cache hit for {file_path} (preprocessor: {preprocessor_name})")
+            with f:
+                for line in f:
+                    yield json.loads(line)
+            return
+
+        logger.info(f"Corpus cache miss for {file_path} (preprocessor: {preprocessor_name})")
+        if normalized is not None:
+            texts = normalized
+        elif preprocessor is not None:
+            texts = self.iter_corpus(text_loader, file_path, **load_kwargs)
+        else:
+            texts = itertools.chain.from_iterable(text_loader.iter_text_batches(file_path, **load_kwargs))
+
+        with self._writer(key) as write:
+            for text_dict in texts:
+                if preprocessor is not None:
+                    text_dict['processed_text'] = preprocessor.preprocess(text_dict['text'])
+                write(text_dict)
+                yield text_dict
@@ -0,0 +1,197 @@
+import os
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CPUConfig:
+    """
+    推理进程的CPU线程和绑核配置
+    """
+    # torch intra-op线程数（单个算子内部并行），同时限制numpy/librosa使用的BLAS/OpenMP线程数，默认为None（不修改）
+    intra_op_threads: Optional[int] = None
+
+    # torch inter-op线程数（算子之间并行），只能在进程开始并行计算前设置一次，默认为None（不修改）
+    inter_op_threads: Optional[int] = None
+
+    # 绑定的CPU核心列表，默认为None（不绑核）
+    cpu_cores: Optional[List[int]] = None
+
+    # 绑定的NUMA节点，进程只在该节点的核心上运行，内存按首次访问分配在本节点上，默认为None
+    numa_node: Optional[int] = None
+
+    # 多进程工作池中是否将核心平均分给各工作进程并分别绑定，默认为False
+    pin_workers: bool = False
+
+    def __post_init__(self):
+        """验证配置"""
+        for name in ('intra_op_threads', 'inter_op_threads'):
+            value = getattr(self, name)
+            if value is not None and value < 1:
+                raise ValueError(f"{name} must be at least 1")
+
+def parse_cpu_list(cpu_list: str) -> List[int]:
+    """
+    解析Linux cpulist格式的核心列表
+
+    Args:
+        cpu_list: 如"0-3,8,10-11"
+
+    Returns:
+        核心编号列表
+    """
+    cores = []
+    for part in cpu_list.strip().split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-', 1)
+            cores.extend(range(int(start), int(end) + 1))
+        else:
+            cores.append(int(part))
+    return cores
+
+def available_cpus() -> List[int]:
+    """当前进程可以使用的核心列表"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def numa_node_cpus(node: int) -> List[int]:
+    """
+    获取NUMA节点的核心列表
+
+    Args:
+        node: NUMA节点编号
+
+    Returns:
+        核心编号列表
+    """
+    cpulist_file = f"/sys/devices/system/node/node{node}/cpulist"
+    if not os.path.exists(cpulist_file):
+        raise ValueError(f"NUMA node {node} not found")
+    with open(cpulist_file, 'r') as f:
+        return parse_cpu_list(f.read())
+
+def resolve_cores(config: CPUConfig) -> Optional[List[int]]:
+    """
+    根据配置计算进程应绑定的核心，同时指定cpu_cores和numa_node时取两者的交集
+
+    Args:
+        config: CPU配置
+
+    Returns:
+        核心列表，不需要绑核时返回None
+    """
+    cores = config.cpu_cores
+    if config.numa_node is not None:
+        node_cores = numa_node_cpus(config.numa_node)
+        cores = [core for core in cores if core in node_cores] if cores else node_cores
+        if not cores:
+            raise ValueError(f"No requested CPU cores on NUMA node {config.numa_node}")
+    return cores
+
+def split_cores(cores: Sequence[int], num_workers: int) -> List[List[int]]:
+    """
+    将核心列表平均分给多个工作进程，核心数少于进程数时多个进程共享核心
+
+    Args:
+        cores: 核心列表
+        num_workers: 工作进程数
+
+    Returns:
+        每个工作进程的核心列表
+    """
+    cores = list(cores)
+    if num_workers >= len(cores):
+        return [[cores[i % len(cores)]] for i in range(num_workers)]
+    per_worker = len(cores) // num_workers
+    return [cores[i * per_worker:(i + 1) * per_worker] for i in range(num_workers)]
+
+def set_torch_threads(intra_op_threads: Optional[int] = None, inter_op_threads: Optional[int] = None) -> None:
+    """
+    设置torch线程数，并将numpy/librosa使用的BLAS/OpenMP线程数限制为相同数量
+
+    Args:
+        intra_op_threads: intra-op线程数
+        inter_op_threads: inter-op线程数
+    """
+    try:
+        import torch
+    except ImportError:
+        torch = None
+
+    if intra_op_threads is not None:
+        if torch is not None:
+            torch.set_num_threads(intra_op_threads)
+        try:
+            from threadpoolctl import threadpool_limits
+            threadpool_limits(limits=intra_op_threads)
+        except ImportError:
+            pass
+
+    if inter_op_threads is not None and torch is not None:
+        try:
+            torch.set_num_interop_threads(inter_op_threads)
+        except RuntimeError as e:
+            # 进程中已经执行过并行计算时无法再修改
+            logger.warning(f"Failed to set inter-op threads: {str(e)}")
+
+def apply_cpu_config(config: CPUConfig) -> Optional[List[int]]:
+    """
+    将CPU配置应用到当前进程
+
+    Args:
+        config: CPU配置
+
+    Returns:
+        绑定的核心列表，未绑核时返回None
+    """
+    cores = resolve_cores(config)
+    if cores:
+        if hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, cores)
+        else:
+            logger.warning("CPU affinity is not supported on this platform")
+            cores = None
+
+    set_torch_threads(config.intra_op_threads, config.inter_op_threads)
+    logger.info(f"Applied CPU config: intra-op threads={config.intra_op_threads}, "
+                f"inter-op threads={config.inter_op_threads}, cores={cores}")
+    return cores
+
+def autotune_threads(measure_rtf: Callable[[], float], candidates: Optional[List[int]] = None,
+                     repeats: int = 2) -> Tuple[int, Dict[int, float]]:
+    """
+    依次使用不同的intra-op线程数运行测试合成，选择实时率最低的线程数并应用
+
+    Args:
+        measure_rtf: 执行一次测试合成并返回实时率的函数
+        candidates: 候选线程数，默认为可用核心数的1/4、1/2和全部
+        repeats: 每个候选线程数测量的次数，取最小值，默认为2
+
+    Returns:
+        (最佳线程数, {线程数: 实时率})元组
+    """
+    if candidates is None:
+        num_cpus = len(available_cpus())
+        candidates = sorted({max(1, num_cpus // 4), max(1, num_cpus // 2), num_cpus})
+
+    # 先运行一次，避免首次推理的初始化开销计入第一个候选
+    measure_rtf()
+
+    results = {}
+    for num_threads in candidates:
+        set_torch_threads(num_threads)
+        results[num_threads] = min(measure_rtf() for _ in range(repeats))
+        logger.info(f"Autotune: {num_threads} threads -> RTF {results[num_threads]:.3f}")
+
+    best = min(results, key=results.get)
+    set_torch_threads(best)
+    logger.info(f"Autotune selected {best} intra-op threads")
+    return best, results
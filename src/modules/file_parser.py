@@ -0,0 +1,125 @@
+import os
+import glob
+import logging
+import itertools
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.modules.text_loader import TextLoader, SUPPORTED_EXTENSIONS
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def expand_input_paths(inputs: Iterable[str]) -> List[str]:
+    """
+    将文件、目录和通配符展开为输入文件列表
+
+    目录展开为其中（不递归）支持格式的文件，通配符支持"**"递归匹配并只保留支持格式的文件；
+    每个输入展开后按路径排序，整体按输入顺序排列并去重，保证多次运行时条目顺序一致
+
+    Args:
+        inputs: 文件路径、目录或通配符列表
+
+    Returns:
+        输入文件路径列表
+    """
+    paths = []
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            matches = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        elif glob.has_magic(pattern):
+            matches = glob.glob(pattern, recursive=True)
+        elif os.path.exists(pattern):
+            # 直接指定的文件不按扩展名过滤，不支持的格式由TextLoader报错
+            paths.append(pattern)
+            continue
+        else:
+            raise FileNotFoundError(f"Input not found: {pattern}")
+
+        matches = sorted(path for path in matches
+                         if os.path.isfile(path) and os.path.splitext(path)[1].lower() in SUPPORTED_EXTENSIONS)
+        if not matches:
+            logger.warning(f"No supported input files matched: {pattern}")
+        paths.extend(matches)
+
+    # 同一文件被多个输入匹配时只处理一次
+    seen = set()
+    unique_paths = []
+    for path in paths:
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            unique_paths.append(path)
+    return unique_paths
+
+def output_subdirs(file_paths: List[str]) -> List[str]:
+    """
+    为每个输入文件生成输出子目录名，即不带扩展名的文件名；不同目录下的同名文件依次加"_1"、"_2"等后缀
+
+    Args:
+        file_paths: 输入文件路径列表
+
+    Returns:
+        与file_paths一一对应的子目录名列表
+    """
+    subdirs = []
+    used = set()
+    for file_path in file_paths:
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        subdir, suffix = name, 1
+        while subdir in used:
+            subdir, suffix = f"{name}_{suffix}", suffix + 1
+        used.add(subdir)
+        subdirs.append(subdir)
+    return subdirs
+
+def _parse_file(file_path: str, cache_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+    """在子进程中读取一个文件，指定缓存目录时读取或写入只含规范化结果的语料缓存"""
+    loader = TextLoader()
+    if cache_dir:
+        from src.modules.corpus_cache import CorpusCache
+        return list(CorpusCache(cache_dir=cache_dir).iter_corpus(loader, file_path))
+    return [text for batch in loader.iter_text_batches(file_path) for text in batch]
+
+def iter_parsed_files(file_paths: List[str], num_workers: int = 1,
+                      cache_dir: Optional[str] = None) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    在进程池中并行读取多个文件，按file_paths的顺序产出各文件的文本字典列表
+
+    同时进行中的文件数不超过num_workers的两倍，合成消费得慢时不会把所有文件都读入内存；
+    子进程使用spawn方式创建，不继承父进程中已加载的模型
+
+    Args:
+        file_paths: 输入文件路径列表
+        num_workers: 读取文件的进程数，默认为1（在当前进程中依次读取）
+        cache_dir: 语料缓存目录，默认为None（不使用缓存）
+
+    Returns:
+        (文件路径, 文本字典列表)元组的迭代器
+    """
+    if num_workers <= 1 or len(file_paths) <= 1:
+        for file_path in file_paths:
+            yield file_path, _parse_file(file_path, cache_dir)
+        return
+
+    num_workers = min(num_workers, len(file_paths))
+    context = multiprocessing.get_context('spawn')
+    remaining = iter(file_paths)
+    with ProcessPoolExecutor(max_workers=num_workers, mp_context=context) as executor:
+        pending = deque(
+            (file_path, executor.submit(_parse_file, file_path, cache_dir))
+            for file_path in itertools.islice(remaining, num_workers * 2)
+        )
+        try:
+            while pending:
+                file_path, future = pending.popleft()
+                texts = future.result()
+                for next_path in itertools.islice(remaining, 1):
+                    pending.append((next_path, executor.submit(_parse_file, next_path, cache_dir)))
+                yield file_path, texts
+        finally:
+            for _, future in pending:
+                future.cancel()
@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from src.modules.tts_input import TTSInput, TTSSynthesisResult
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class JobManifest:
+    """
+    批量合成任务清单，每完成一条就追加一行JSON记录，用于任务中断后续跑
+
+    续跑时只有合成成功、文本和输出路径一致且输出文件校验通过的条目才会被跳过
+    """
+    def __init__(self, manifest_file: str, resume: bool = False):
+        """
+        初始化任务清单
+
+        Args:
+            manifest_file: 清单文件路径（JSON Lines格式）
+            resume: 是否续跑，为True时加载已有记录，否则清空已有清单重新开始
+        """
+        self.manifest_file = manifest_file
+        self.records: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        manifest_dir = os.path.dirname(manifest_file)
+        if manifest_dir:
+            os.makedirs(manifest_dir, exist_ok=True)
+
+        if resume and os.path.exists(manifest_file):
+            self._load()
+        elif os.path.exists(manifest_file):
+            os.remove(manifest_file)
+
+        self._file = open(manifest_file, 'a', encoding='utf-8')
+        # 上次中断时可能留下没有换行的半行记录，先补上换行，避免与新记录粘连
+        if self._file.tell() > 0:
+            with open(manifest_file, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    self._file.write('\n')
+        logger.info(f"JobManifest initialized: {manifest_file} ({len(self.records)} recorded items)")
+
+    def _load(self) -> None:
+        """加载已有记录，同一条目以最后一条记录为准，忽略被中断写入的不完整行"""
+        with open(self.manifest_file, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                    self.records[int(record['index'])] = record
+                except (ValueError, KeyError) as e:
+                    logger.warning(f"Skipping invalid manifest line {line_no}: {str(e)}")
+
+    def get_completed(self, index: int, tts_input: TTSInput) -> Optional[TTSSynthesisResult]:
+        """
+        检查条目是否已完成，已完成时根据清单记录重建合成结果
+
+        Args:
+            index: 条目在输入中的序号
+            tts_input: 条目的TTS输入
+
+        Returns:
+            已完成条目的合成结果，未完成或校验失败时返回None
+        """
+        record = self.records.get(index)
+        if not record or not record.get('success'):
+            return None
+
+        # 输入文件被修改时不能复用旧结果
+        if record.get('text') != tts_input.text or record.get('output_path') != tts_input.output_path:
+            return None
+
+        output_file = record.get('output_file')
+        if not output_file or not os.path.exists(output_file):
+            return None
+        if record.get('size') is not None and os.path.getsize(output_file) != record['size']:
+            logger.warning(f"Output file size mismatch, will re-synthesize: {output_file}")
+            return None
+
+        return TTSSynthesisResult(
+            input_data=TTSInput(
+                text=record['text'],
+                speaker_wav=record['speaker_wav'],
+                output_path=record['output_path'],
+                language=record.get('language', tts_input.language),
+                split_sentences=record.get('split_sentences', tts_input.split_sentences),
+                additional_params=record.get('params') or {},
+                source_file=record.get('source_file', tts_input.source_file),
+                item_id=record.get('item_id', tts_input.item_id),
+                input_index=record.get('input_index', tts_input.input_index)
+            ),
+            success=True,
+            output_file=output_file,
+            processing_time=record.get('processing_time'),
+            cached=record.get('cached', False),
+            stage_timings=record.get('stage_timings') or {},
+            audio_duration=record.get('audio_duration'),
+            rtf=record.get('rtf')
+        )
+
+    def record(self, index: int, result: TTSSynthesisResult) -> None:
+        """
+        追加一条完成记录并立即落盘
+
+        Args:
+            index: 条目在输入中的序号
+            result: 合成结果
+        """
+        input_data = result.input_data
+        output_file = result.output_file if result.success else None
+        record = {
+            'index': index,
+            'text': input_data.text,
+            'speaker_wav': input_data.speaker_wav,
+            'output_path': input_data.output_path,
+            'language': input_data.language,
+            'split_sentences': input_data.split_sentences,
+            'params': input_data.additional_params,
+            'source_file': input_data.source_file,
+            'item_id': input_data.item_id,
+            'input_index': input_data.input_index,
+            'success': result.success,
+            'error_message': result.error_message,
+            'output_file': output_file,
+            'size': os.path.getsize(output_file) if output_file and os.path.exists(output_file) else None,
+            'processing_time': result.processing_time,
+            'cached': result.cached,
+            'stage_timings': result.stage_timings,
+            'audio_duration': result.audio_duration,
+            'rtf': result.rtf,
+            'finished_at': time.time()
+        }
+
+        with self._lock:
+            self.records[index] = record
+            self._file.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        """关闭清单文件"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
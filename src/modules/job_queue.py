@@ -0,0 +1,362 @@
+import time
+import uuid
+import queue
+import logging
+import itertools
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 流式任务结束的标记
+_STREAM_END = object()
+
+# 任务优先级，数值小的先执行；流式请求等待首个音频块，排在整文件任务之前
+_PRIORITY_STREAM = 0
+_PRIORITY_BATCH = 1
+
+@dataclass
+class TTSJob:
+    """
+    后台合成任务的状态
+    """
+    # 任务ID
+    job_id: str
+
+    # 任务独立的输出目录
+    output_dir: str
+
+    # 任务状态：queued、running、completed、failed
+    status: str = 'queued'
+
+    # 条目总数，流式读取输入的任务在读取完成后才设置
+    total: int = 0
+
+    # 已完成、成功和失败的条目数
+    completed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+
+    # 已完成条目的信息，按完成顺序排列
+    items: List[Dict[str, Any]] = field(default_factory=list)
+
+    # 任务完成后的结果
+    result: Optional[Dict[str, Any]] = None
+
+    # 任务失败时的错误信息
+    error: Optional[str] = None
+
+    # 时间戳
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+    _cancelled: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    # 流式任务在工作线程中产出、由请求线程读取的数据块
+    _stream: Optional[queue.Queue] = field(default=None, repr=False)
+
+    # 流式任务的缓冲区持续满这么久（秒）时视为读取方已离开，取消任务
+    _stall_timeout: float = field(default=60.0, repr=False)
+
+    def add_item(self, index: int, item: Dict[str, Any], success: bool) -> None:
+        """
+        记录一个已完成的条目
+
+        Args:
+            index: 条目在输入中的序号
+            item: 条目信息（输出文件、处理时间等）
+            success: 是否合成成功
+        """
+        with self._lock:
+            self.items.append({'index': index, 'success': success, **item})
+            self.completed += 1
+            if success:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+
+    def cancel(self) -> None:
+        """取消任务，流式任务在产出下一个数据块时停止，尚未开始的流式任务不再执行"""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """任务是否已取消"""
+        return self._cancelled.is_set()
+
+    def _put_chunk(self, chunk: Any) -> bool:
+        """在工作线程中放入一个数据块，缓冲区满时等待读取，任务取消或读取方长时间不读取时返回False"""
+        deadline = time.time() + self._stall_timeout
+        while not self._cancelled.is_set():
+            try:
+                self._stream.put(chunk, timeout=0.1)
+                return True
+            except queue.Full:
+                if time.time() > deadline:
+                    logger.warning(f"Streaming job {self.job_id} not read for {self._stall_timeout:.1f} seconds, cancelling")
+                    self.cancel()
+        return False
+
+    def iter_stream(self) -> Iterator[Any]:
+        """
+        在请求线程中按顺序读取流式任务产出的数据块，提前停止读取（如客户端断开连接）时取消任务
+
+        Returns:
+            数据块的迭代器，任务失败时在产出已有数据块后抛出RuntimeError
+        """
+        if self._stream is None:
+            raise ValueError(f"Job {self.job_id} is not a streaming job")
+        try:
+            while True:
+                try:
+                    chunk = self._stream.get(timeout=0.1)
+                except queue.Empty:
+                    # 因长时间未读取被取消的任务可能没有放入结束标记
+                    if self.done and self._stream.empty():
+                        break
+                    continue
+                if chunk is _STREAM_END:
+                    break
+                yield chunk
+        finally:
+            self.cancel()
+        self.wait()
+        if self.status == 'failed':
+            raise RuntimeError(self.error)
+
+    @property
+    def done(self) -> bool:
+        """任务是否已结束"""
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待任务结束
+
+        Args:
+            timeout: 超时时间（秒），默认为None（一直等待）
+
+        Returns:
+            任务是否已结束
+        """
+        return self._done.wait(timeout)
+
+    def to_dict(self, since: int = 0) -> Dict[str, Any]:
+        """
+        转换为可JSON序列化的字典
+
+        Args:
+            since: 只返回完成顺序在此之后的条目，用于增量轮询
+
+        Returns:
+            任务状态字典
+        """
+        with self._lock:
+            return {
+                'job_id': self.job_id,
+                'status': self.status,
+                'output_dir': self.output_dir,
+                'progress': {
+                    'total': self.total,
+                    'completed': self.completed,
+                    'succeeded': self.succeeded,
+                    'failed': self.failed
+                },
+                'items': self.items[since:],
+                'result': self.result,
+                'error': self.error,
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at
+            }
+
+class TTSJobQueue:
+    """
+    后台合成任务队列，由固定数量的工作线程依次执行任务
+
+    默认只有一个工作线程，模型只被队列使用，避免多个请求同时占用同一个模型。
+    流式任务优先于普通任务执行；正在执行的普通任务在条目之间调用run_pending_streams()，
+    让等待中的流式任务先在当前工作线程中执行，流式请求不必等整个文件合成完
+    """
+    def __init__(self, max_workers: int = 1, max_finished_jobs: int = 100):
+        """
+        初始化任务队列
+
+        Args:
+            max_workers: 工作线程数，默认为1
+            max_finished_jobs: 最多保留的已结束任务数，超出后删除最早的任务记录，默认为100
+        """
+        self.max_finished_jobs = max_finished_jobs
+        self._jobs: "OrderedDict[str, TTSJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        # 待执行的任务，元素为(优先级, 提交序号, 任务, 任务函数)，同优先级按提交顺序执行
+        self._tasks: queue.PriorityQueue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        for index in range(max_workers):
+            threading.Thread(target=self._worker, name=f'tts-job_{index}', daemon=True).start()
+
+        logger.info(f"TTSJobQueue initialized with {max_workers} workers")
+
+    def submit(self, fn: Callable[[TTSJob], Dict[str, Any]], output_dir: str, total: int = 0) -> TTSJob:
+        """
+        提交任务，立即返回
+
+        Args:
+            fn: 任务函数，接收TTSJob并返回任务结果字典
+            output_dir: 任务独立的输出目录
+            total: 条目总数
+
+        Returns:
+            新建的任务
+        """
+        job = TTSJob(job_id=uuid.uuid4().hex, output_dir=output_dir, total=total)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+
+        self._enqueue(_PRIORITY_BATCH, job, fn)
+        logger.info(f"Submitted job {job.job_id} with {total} items")
+        return job
+
+    def submit_stream(self, fn: Callable[[TTSJob], Iterator[Any]], output_dir: str = '', total: int = 0,
+                      max_buffered: int = 64, stall_timeout: float = 60.0) -> TTSJob:
+        """
+        提交流式任务，立即返回，通过TTSJob.iter_stream()读取产出的数据块
+
+        流式任务与普通任务在同一组工作线程中执行，模型始终只被队列的工作线程使用；
+        流式任务排在所有等待中的普通任务之前，正在执行的普通任务在下一个条目之前让出工作线程。
+        数据块经有界缓冲区交给请求线程，读取慢时工作线程等待，不会无限占用内存
+
+        Args:
+            fn: 任务函数，接收TTSJob并返回数据块的迭代器
+            output_dir: 任务独立的输出目录，默认为''（不输出文件）
+            total: 条目总数
+            max_buffered: 缓冲区中最多等待读取的数据块数，默认为64
+            stall_timeout: 缓冲区持续满这么久（秒）时视为读取方已离开（如客户端在开始读取前断开），
+                           取消任务以释放工作线程，默认为60
+
+        Returns:
+            新建的任务
+        """
+        job = TTSJob(job_id=uuid.uuid4().hex, output_dir=output_dir, total=total,
+                     _stream=queue.Queue(maxsize=max_buffered), _stall_timeout=stall_timeout)
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+
+        self._enqueue(_PRIORITY_STREAM, job, lambda job: self._pump(job, fn))
+        logger.info(f"Submitted streaming job {job.job_id} with {total} items")
+        return job
+
+    def _enqueue(self, priority: int, job: TTSJob, fn: Callable[[TTSJob], Dict[str, Any]]) -> None:
+        """按优先级放入待执行任务"""
+        self._tasks.put((priority, next(self._sequence), job, fn))
+
+    def _worker(self) -> None:
+        """工作线程，按优先级依次执行任务"""
+        while True:
+            _, _, job, fn = self._tasks.get()
+            self._run(job, fn)
+
+    def run_pending_streams(self) -> int:
+        """
+        在当前线程中执行所有等待中的流式任务，由正在执行的普通任务在条目之间调用
+
+        普通任务的工作线程本来就独占模型，在这里执行流式任务不会与其他任务同时使用模型
+
+        Returns:
+            执行的流式任务数
+        """
+        count = 0
+        while True:
+            try:
+                task = self._tasks.get_nowait()
+            except queue.Empty:
+                return count
+            if task[0] != _PRIORITY_STREAM:
+                # 最高优先级的任务不是流式任务，放回后保持原来的提交顺序
+                self._tasks.put(task)
+                return count
+            _, _, job, fn = task
+            logger.info(f"Running streaming job {job.job_id} between batch items")
+            self._run(job, fn)
+            count += 1
+
+    @staticmethod
+    def _pump(job: TTSJob, fn: Callable[[TTSJob], Iterator[Any]]) -> Dict[str, Any]:
+        """在工作线程中执行流式任务，把产出的数据块放入缓冲区，结束（包括失败和取消）时放入结束标记"""
+        chunk_count = 0
+        try:
+            if not job.cancelled:
+                chunks = fn(job)
+                try:
+                    for chunk in chunks:
+                        if not job._put_chunk(chunk):
+                            break
+                        chunk_count += 1
+                finally:
+                    close = getattr(chunks, 'close', None)
+                    if close is not None:
+                        close()
+        finally:
+            job._put_chunk(_STREAM_END)
+        if job.cancelled:
+            logger.info(f"Streaming job {job.job_id} cancelled after {chunk_count} chunks")
+        return {'chunks': chunk_count, 'cancelled': job.cancelled}
+
+    def _run(self, job: TTSJob, fn: Callable[[TTSJob], Dict[str, Any]]) -> None:
+        """在工作线程中执行任务"""
+        job.status = 'running'
+        job.started_at = time.time()
+        try:
+            job.result = fn(job)
+            job.status = 'completed'
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {str(e)}")
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = time.time()
+            job._done.set()
+            logger.info(f"Job {job.job_id} finished with status: {job.status}")
+
+    def _prune(self) -> None:
+        """删除超出保留数量的已结束任务"""
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[TTSJob]:
+        """
+        获取任务
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            任务，不存在时返回None
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """列出所有任务的概要信息"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [
+            {
+                'job_id': job.job_id,
+                'status': job.status,
+                'total': job.total,
+                'completed': job.completed,
+                'created_at': job.created_at
+            }
+            for job in jobs
+        ]
@@ -0,0 +1,164 @@
+import os
+import json
+import struct
+import logging
+from array import array
+from typing import Any, BinaryIO, Iterator, Optional, Tuple
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 索引文件格式：魔数、源文件大小、源文件修改时间（纳秒）、记录数，之后是每条记录的起始字节偏移（uint64小端序）
+_MAGIC = b'JSONLIDX1\n'
+_HEADER = struct.Struct('<QqQ')
+
+def iter_jsonl_records(f: BinaryIO, first_index: int = 0, stop: Optional[int] = None,
+                       encoding: str = 'utf-8') -> Iterator[Tuple[int, Any]]:
+    """
+    从文件当前位置逐行解析JSONL记录，空行不计为记录，无法解析的行记录警告后跳过
+
+    Args:
+        f: 以二进制模式打开的文件对象，位置应在某条记录的行首
+        first_index: 第一条记录的序号，默认为0
+        stop: 在此序号之前停止（不包含），默认为None（读到文件结尾）
+        encoding: 文件编码，默认为'utf-8'
+
+    Returns:
+        (记录序号, 解析后的对象)元组的迭代器
+    """
+    index = first_index
+    for line in f:
+        if stop is not None and index >= stop:
+            return
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line.decode(encoding))
+        except ValueError as e:
+            # 中断写入的日志末尾常有半行记录，跳过而不是中止整个文件
+            logger.warning(f"Skipping invalid JSONL record {index}: {str(e)}")
+            record = None
+        if record is not None:
+            yield index, record
+        index += 1
+
+class JsonlIndex:
+    """
+    JSONL文件的字节偏移索引，可直接定位到第N条记录或读取一段记录，无需从头解析文件
+
+    索引保存在源文件旁的<文件名>.idx中，源文件的大小或修改时间变化时自动重建；
+    记录按非空行计数，无法解析的行也占一个序号，保证序号与行的对应关系不受内容影响
+    """
+    def __init__(self, file_path: str, index_path: Optional[str] = None):
+        """
+        初始化索引，已有且有效的索引文件直接加载，否则扫描源文件重建
+
+        Args:
+            file_path: JSONL文件路径
+            index_path: 索引文件路径，默认为None（<file_path>.idx）
+        """
+        self.file_path = file_path
+        self.index_path = index_path or f"{file_path}.idx"
+        self.offsets = array('Q')
+
+        stat = os.stat(file_path)
+        self._source_key = (stat.st_size, stat.st_mtime_ns)
+        if not self._load():
+            self._build()
+            self._save()
+
+    def _load(self) -> bool:
+        """加载索引文件，不存在或与源文件不一致时返回False"""
+        if not os.path.exists(self.index_path):
+            return False
+        try:
+            with open(self.index_path, 'rb') as f:
+                if f.read(len(_MAGIC)) != _MAGIC:
+                    return False
+                size, mtime_ns, count = _HEADER.unpack(f.read(_HEADER.size))
+                if (size, mtime_ns) != self._source_key:
+                    logger.info(f"JSONL index is stale, rebuilding: {self.index_path}")
+                    return False
+                self.offsets.fromfile(f, count)
+        except (OSError, EOFError, struct.error) as e:
+            logger.warning(f"Failed to load JSONL index {self.index_path}: {str(e)}")
+            self.offsets = array('Q')
+            return False
+        logger.info(f"Loaded JSONL index: {self.index_path} ({len(self.offsets)} records)")
+        return True
+
+    def _build(self) -> None:
+        """扫描源文件，记录每个非空行的起始字节偏移"""
+        offsets = array('Q')
+        offset = 0
+        with open(self.file_path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    offsets.append(offset)
+                offset += len(line)
+        self.offsets = offsets
+        logger.info(f"Built JSONL index for {self.file_path} ({len(offsets)} records)")
+
+    def _save(self) -> None:
+        """写入索引文件，先写临时文件再替换，源文件所在目录不可写时只保留内存中的索引"""
+        tmp_path = f"{self.index_path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(_MAGIC)
+                f.write(_HEADER.pack(*self._source_key, len(self.offsets)))
+                self.offsets.tofile(f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logger.warning(f"Failed to save JSONL index {self.index_path}: {str(e)}")
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def offset(self, index: int) -> int:
+        """
+        获取记录的起始字节偏移
+
+        Args:
+            index: 记录序号
+
+        Returns:
+            字节偏移
+        """
+        return self.offsets[index]
+
+    def read(self, index: int, encoding: str = 'utf-8') -> Any:
+        """
+        读取单条记录
+
+        Args:
+            index: 记录序号
+            encoding: 文件编码，默认为'utf-8'
+
+        Returns:
+            解析后的对象
+        """
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.offsets[index])
+            return json.loads(f.readline().decode(encoding))
+
+    def iter_records(self, start: int = 0, stop: Optional[int] = None,
+                     encoding: str = 'utf-8') -> Iterator[Tuple[int, Any]]:
+        """
+        读取序号在[start, stop)范围内的记录，直接定位到start所在的行
+
+        Args:
+            start: 起始序号，默认为0
+            stop: 结束序号（不包含），默认为None（读到最后一条记录）
+            encoding: 文件编码，默认为'utf-8'
+
+        Returns:
+            (记录序号, 解析后的对象)元组的迭代器
+        """
+        stop = len(self.offsets) if stop is None else min(stop, len(self.offsets))
+        if start < 0 or start >= stop:
+            return
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.offsets[start])
+            yield from iter_jsonl_records(f, first_index=start, stop=stop, encoding=encoding)
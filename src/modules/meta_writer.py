@@ -0,0 +1,190 @@
+import os
+import csv
+import json
+import logging
+import threading
+from typing import Any, Dict, Iterator, Optional
+
+from src.modules.tts_input import TTSSynthesisResult
+from src.modules.stage_timer import STAGES
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# meta文件的列，顺序即CSV的列顺序
+META_COLUMNS = [
+    'text',
+    'prompt_wav_path',
+    'output_audio_path',
+    'success',
+    'error_message',
+    'processing_time',
+    'cached',
+    # 各阶段耗时（秒）
+    *[f'{stage}_time' for stage in STAGES],
+    # 输出音频时长（秒）和实时率
+    'audio_duration',
+    'rtf',
+    # XTTS参数
+    'temperature',
+    'length_penalty',
+    'repetition_penalty',
+    'top_k',
+    'top_p',
+    'speed',
+    'emotion',
+    # 文本来源的输入文件、条目ID和条目在输入（分片前）中的序号
+    'source_file',
+    'item_id',
+    'input_index'
+]
+
+def result_to_row(result: TTSSynthesisResult) -> Dict[str, Any]:
+    """
+    将合成结果转换为meta文件的一行
+
+    Args:
+        result: 合成结果
+
+    Returns:
+        以META_COLUMNS为键的字典
+    """
+    input_data = result.input_data
+    # 获取XTTS参数值（如果有）
+    additional_params = input_data.additional_params or {}
+    stage_timings = result.stage_timings or {}
+
+    row = {
+        'text': input_data.text,
+        'prompt_wav_path': input_data.speaker_wav,
+        'output_audio_path': result.output_file if result.success else '',
+        'success': 'Yes' if result.success else 'No',
+        'error_message': result.error_message if not result.success else '',
+        'processing_time': result.processing_time if result.processing_time else '',
+        'cached': 'Yes' if result.cached else 'No',
+        'audio_duration': round(result.audio_duration, 3) if result.audio_duration else '',
+        'rtf': round(result.rtf, 4) if result.rtf else '',
+        # XTTS参数
+        'temperature': additional_params.get('temperature', ''),
+        'length_penalty': additional_params.get('length_penalty', ''),
+        'repetition_penalty': additional_params.get('repetition_penalty', ''),
+        'top_k': additional_params.get('top_k', ''),
+        'top_p': additional_params.get('top_p', ''),
+        'speed': additional_params.get('speed', ''),
+        'emotion': additional_params.get('emotion', ''),
+        'source_file': input_data.source_file or '',
+        'item_id': input_data.item_id or '',
+        'input_index': input_data.input_index if input_data.input_index is not None else ''
+    }
+    for stage in STAGES:
+        row[f'{stage}_time'] = round(stage_timings[stage], 4) if stage in stage_timings else ''
+    return row
+
+def read_meta_rows(meta_file: str) -> Iterator[Dict[str, Any]]:
+    """
+    逐行读取meta文件，格式根据扩展名判断（.jsonl为JSON Lines，其余为CSV）
+
+    Args:
+        meta_file: meta文件路径
+
+    Returns:
+        行字典的迭代器，CSV文件的值均为字符串
+    """
+    with open(meta_file, 'r', encoding='utf-8', newline='') as f:
+        if os.path.splitext(meta_file)[1].lower() == '.jsonl':
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+class MetaWriter:
+    """
+    流式meta文件写入器，每完成一条就追加一行并刷新到磁盘，支持CSV和JSON Lines格式
+
+    结果可以乱序提交，写入器会缓存提前完成的结果，保证文件中的行始终按输入顺序排列
+    """
+    def __init__(self, meta_file: str, meta_format: Optional[str] = None):
+        """
+        初始化meta写入器
+
+        Args:
+            meta_file: meta文件路径
+            meta_format: 文件格式，'csv'或'jsonl'，默认为None（根据扩展名判断，.jsonl为JSON Lines，其余为CSV）
+        """
+        if meta_format is None:
+            meta_format = 'jsonl' if os.path.splitext(meta_file)[1].lower() == '.jsonl' else 'csv'
+        if meta_format not in ('csv', 'jsonl'):
+            raise ValueError(f"Unsupported meta format: {meta_format}")
+
+        self.meta_file = meta_file
+        self.meta_format = meta_format
+        self.rows_written = 0
+        self._next_index = 0
+        self._pending: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        meta_dir = os.path.dirname(meta_file)
+        if meta_dir:
+            os.makedirs(meta_dir, exist_ok=True)
+
+        self._file = open(meta_file, 'w', encoding='utf-8', newline='')
+        self._csv_writer = None
+        if meta_format == 'csv':
+            self._csv_writer = csv.DictWriter(self._file, fieldnames=META_COLUMNS, extrasaction='ignore')
+            self._csv_writer.writeheader()
+            self._file.flush()
+
+        logger.info(f"Writing meta file: {meta_file} (format: {meta_format})")
+
+    def write(self, index: int, result: TTSSynthesisResult) -> None:
+        """
+        提交一条结果，前面的结果都已提交时立即写入
+
+        Args:
+            index: 结果在输入中的序号
+            result: 合成结果
+        """
+        self.write_row(index, result_to_row(result))
+
+    def write_row(self, index: int, row: Dict[str, Any]) -> None:
+        """
+        提交一行已转换的数据，如从其他meta文件读取的行，前面的行都已提交时立即写入
+
+        Args:
+            index: 行的序号
+            row: 以META_COLUMNS为键的字典
+        """
+        with self._lock:
+            self._pending[index] = row
+            while self._next_index in self._pending:
+                self._write_row(self._pending.pop(self._next_index))
+                self._next_index += 1
+            self._file.flush()
+
+    def _write_row(self, row: Dict[str, Any]) -> None:
+        """写入一行"""
+        if self._csv_writer is not None:
+            self._csv_writer.writerow(row)
+        else:
+            self._file.write(json.dumps(row, ensure_ascii=False, default=str) + '\n')
+        self.rows_written += 1
+
+    def close(self) -> None:
+        """关闭文件，仍未写入的结果（前面有缺失条目时）按序号顺序写入"""
+        with self._lock:
+            if self._file.closed:
+                return
+            if self._pending:
+                logger.warning(f"Meta file has {len(self._pending)} rows after a missing index, writing them in order")
+                for index in sorted(self._pending):
+                    self._write_row(self._pending.pop(index))
+            self._file.close()
+        logger.info(f"Meta file generated: {self.meta_file} ({self.rows_written} rows)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,17 +1,30 @@
+import os
+import time
 import logging
-from typing import Optional, Union, Dict, Any
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Optional, Union, Dict, Any, List, Tuple
 import builtins
 
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# 导入transformers相关模块以解决attention mask问题
-from transformers import AutoTokenizer, AutoModel, AutoConfig
+from src.modules.precision import PRECISIONS, apply_precision
+from src.modules.model_snapshot import ModelSnapshot
 
 # 全局TTS变量
 TTS = None
 
+# 预热时使用的各语言短句
+WARMUP_TEXTS = {
+    'zh-cn': '你好，欢迎使用语音合成服务。',
+    'en': 'Hello, welcome to the speech synthesis service.',
+    'ja': 'こんにちは、音声合成サービスへようこそ。',
+    'ko': '안녕하세요, 음성 합성 서비스에 오신 것을 환영합니다.'
+}
+
 def import_tts():
     """延迟导入TTS模块，使用补丁修复Optional类型错误"""
     global TTS
@@ -46,127 +59,572 @@ def import_tts():
 class ModelManager:
     """
     模型管理库类，负责加载和管理TTS模型，支持一次加载多次使用
+    
+    模型按(模型名称, 推理精度)缓存，同一模型的不同精度是相互独立的实例。
+    所有方法都是线程安全的：同一模型被多个线程同时请求时只加载一次，其余线程等待加载完成；
+    设置内存预算后，加载新模型使总内存超出预算时，按最近使用时间淘汰没有被引用（acquire）的模型
     """
-    def __init__(self):
-        """初始化模型管理器"""
-        self.models: Dict[str, TTS] = {}
+    def __init__(self, snapshot_dir: Optional[str] = "cache/models", memory_budget_mb: Optional[float] = None):
+        """
+        初始化模型管理器
+        
+        Args:
+            snapshot_dir: 模型权重快照目录，首次加载后导出快照，之后以内存映射方式加载；为None时不使用快照
+            memory_budget_mb: 已加载模型的总内存预算（MB），默认为None（不限制）
+        """
+        # 按最近使用时间排序，最早使用的在前
+        self.models: "OrderedDict[Tuple[str, str], TTS]" = OrderedDict()
         self.default_model_name = "tts_models/multilingual/multi-dataset/xtts_v2"
+        self.memory_budget_bytes = int(memory_budget_mb * 1024 ** 2) if memory_budget_mb else None
         
         # 中文专用tokenizer和模型
         self.chinese_tokenizer = None
         self.chinese_model = None
         
-        logger.info("ModelManager initialized")
+        # 各模型的加载、预热耗时、内存和使用统计，以及是否已完成预热
+        self.model_stats: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.ready: Dict[Tuple[str, str], bool] = {}
+        
+        # 各模型的引用计数，大于0的模型不会被淘汰
+        self._refcounts: Dict[Tuple[str, str], int] = {}
+        # 正在加载的模型，其他线程等待对应的事件
+        self._loading: Dict[Tuple[str, str], threading.Event] = {}
+        # 正在加载中文tokenizer时其他线程等待的事件，加载（可能需要下载）期间不持有注册表锁
+        self._tokenizer_loading: Optional[threading.Event] = None
+        self._lock = threading.RLock()
+        
+        # 模型权重快照
+        self.snapshot = ModelSnapshot(snapshot_dir) if snapshot_dir else None
+        
+        logger.info(f"ModelManager initialized (memory budget: {memory_budget_mb or 'unlimited'} MB)")
     
-    def load_model(self, model_name: Optional[str] = None, device: str = "cpu"):
+    def _model_key(self, model_name: Optional[str], precision: str) -> Tuple[str, str]:
+        """获取模型的缓存键(模型名称, 推理精度)"""
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unsupported precision: {precision}, expected one of {PRECISIONS}")
+        return (model_name or self.default_model_name, precision)
+    
+    def _touch(self, key: Tuple[str, str]) -> None:
+        """记录模型被使用，调用方需持有锁"""
+        self.models.move_to_end(key)
+        stats = self.model_stats.setdefault(key, {})
+        stats['last_used'] = time.time()
+        stats['use_count'] = stats.get('use_count', 0) + 1
+    
+    def load_model(self, model_name: Optional[str] = None, device: str = "cpu",
+                   precision: str = "fp32", warmup: bool = False,
+                   warmup_languages: Optional[List[str]] = None, speaker_wav: Optional[str] = None):
         """
         加载指定的TTS模型，如果模型已加载则直接返回
         
         Args:
             model_name: 模型名称，如果为None则使用默认模型
             device: 运行设备，默认为"cpu"
+            precision: 推理精度，'fp32'、'int8'（GPT线性层动态INT8量化）或'bf16'（GPT使用bfloat16 autocast），默认为"fp32"
+            warmup: 加载后是否立即预热，默认为False（模型加载后即视为就绪）
+            warmup_languages: 预热的语言列表，默认为["zh-cn"]
+            speaker_wav: 预热使用的音色参考音频，默认从音色库中随机选择
             
         Returns:
             加载好的TTS模型实例
         """
-        if model_name is None:
-            model_name = self.default_model_name
+        key = self._model_key(model_name, precision)
+        model_name = key[0]
         
-        if model_name not in self.models:
-            logger.info(f"Loading model: {model_name} on device: {device}")
+        while True:
+            with self._lock:
+                if key in self.models:
+                    logger.info(f"Model {model_name} ({precision}) already loaded, returning cached instance")
+                    self._touch(key)
+                    tts = self.models[key]
+                    break
+                loading = self._loading.get(key)
+                if loading is None:
+                    # 当前线程负责加载
+                    loading = self._loading[key] = threading.Event()
+                    owner = True
+                else:
+                    owner = False
+            
+            if not owner:
+                # 其他线程正在加载同一模型，等待完成后重新检查（加载失败时由当前线程重试）
+                logger.info(f"Model {model_name} ({precision}) is being loaded by another thread, waiting")
+                loading.wait()
+                continue
+            
             try:
-                # 设置中文专用tokenizer
-                self._setup_chinese_tokenizer()
-                
-                # 修复attention mask问题
-                self._fix_attention_mask_issue()
-                
-                # 延迟导入TTS模块并加载模型
-                TTS = import_tts()
+                tts = self._load_new_model(key, device, warmup)
+            finally:
+                with self._lock:
+                    del self._loading[key]
+                loading.set()
+            break
+        
+        if warmup and not self.is_ready(model_name, precision):
+            self.warmup_model(model_name, precision, languages=warmup_languages, speaker_wav=speaker_wav)
+        
+        return tts
+    
+    def _load_new_model(self, key: Tuple[str, str], device: str, warmup: bool):
+        """加载尚未加载的模型并加入注册表，超出内存预算时淘汰空闲模型"""
+        model_name, precision = key
+        logger.info(f"Loading model: {model_name} on device: {device} with precision: {precision}")
+        try:
+            # 延迟导入TTS模块并加载模型，有快照时直接映射快照中的权重
+            TTS = import_tts()
+            start_time = time.time()
+            tts, snapshot_status = self._load_from_snapshot(model_name, device)
+            if tts is None:
                 tts = TTS(model_name).to(device)
-                self.models[model_name] = tts
-                logger.info(f"Model {model_name} loaded successfully with Chinese tokenizer support")
-            except Exception as e:
-                logger.error(f"Failed to load model {model_name}: {str(e)}")
-                raise
-        else:
-            logger.info(f"Model {model_name} already loaded, returning cached instance")
+                snapshot_status = self._export_snapshot(tts, model_name)
+            effective_precision = apply_precision(tts, precision)
+        except Exception as e:
+            logger.error(f"Failed to load model {model_name}: {str(e)}")
+            raise
+        
+        stats = {
+            'device': device,
+            'precision': effective_precision,
+            'snapshot': snapshot_status,
+            'load_time': time.time() - start_time,
+            'memory_bytes': self._estimate_memory(tts),
+            'loaded_at': time.time()
+        }
+        with self._lock:
+            self.models[key] = tts
+            self.model_stats[key] = stats
+            self._touch(key)
+            # 不预热时加载完成即就绪，否则等待预热完成
+            self.ready[key] = not warmup
+            self._evict_idle(keep=key)
+        
+        logger.info(f"Model {model_name} ({effective_precision}) loaded successfully "
+                    f"in {stats['load_time']:.2f} seconds, memory: {stats['memory_bytes'] / 1024 ** 2:.0f} MB")
+        return tts
+    
+    @staticmethod
+    def _estimate_memory(tts) -> int:
+        """
+        估算模型占用的内存（字节），按state_dict中的张量大小计算，共享存储只计一次
+        
+        动态量化层的权重以打包形式保存，这里按其state_dict中的张量计算，结果为近似值
+        """
+        seen = set()
+        total = 0
+        
+        def add(tensor):
+            nonlocal total
+            if not hasattr(tensor, 'untyped_storage'):
+                return
+            storage = tensor.untyped_storage()
+            ptr = storage.data_ptr()
+            if ptr in seen:
+                return
+            seen.add(ptr)
+            total += storage.nbytes()
+        
+        try:
+            for value in tts.state_dict().values():
+                if isinstance(value, tuple):
+                    for item in value:
+                        add(item)
+                else:
+                    add(value)
+        except Exception as e:
+            logger.warning(f"Failed to estimate model memory: {str(e)}")
+        return total
+    
+    def _memory_in_use(self) -> int:
+        """已加载模型的总内存估算值，调用方需持有锁"""
+        return sum(self.model_stats.get(key, {}).get('memory_bytes', 0) for key in self.models)
+    
+    def _evict_idle(self, keep: Optional[Tuple[str, str]] = None) -> List[Tuple[str, str]]:
+        """
+        超出内存预算时，按最近使用时间淘汰没有被引用的模型，调用方需持有锁
+        
+        Args:
+            keep: 不参与淘汰的模型（刚加载的模型）
+            
+        Returns:
+            被淘汰的模型列表
+        """
+        evicted = []
+        if self.memory_budget_bytes is None:
+            return evicted
+        
+        for key in list(self.models):
+            if self._memory_in_use() <= self.memory_budget_bytes:
+                break
+            if key == keep or self._refcounts.get(key, 0) > 0:
+                continue
+            logger.info(f"Evicting idle model {key[0]} ({key[1]}) to stay within memory budget")
+            self._remove(key)
+            evicted.append(key)
+        
+        if self._memory_in_use() > self.memory_budget_bytes:
+            logger.warning(f"Loaded models use {self._memory_in_use() / 1024 ** 2:.0f} MB, "
+                           f"over the {self.memory_budget_bytes / 1024 ** 2:.0f} MB budget, "
+                           f"but the remaining models are in use")
+        return evicted
+    
+    def _remove(self, key: Tuple[str, str]) -> None:
+        """
+        从注册表中移除模型，调用方需持有锁
+        
+        仍在使用的模型保留引用计数，持有者之后调用release时才能正确递减，
+        重新加载后的模型也会在这些持有者释放前受到保护，不会被淘汰
+        """
+        del self.models[key]
+        self.model_stats.pop(key, None)
+        self.ready.pop(key, None)
+        if self._refcounts.get(key, 0) <= 0:
+            self._refcounts.pop(key, None)
+    
+    def acquire(self, model_name: Optional[str] = None, precision: str = "fp32", **load_kwargs):
+        """
+        获取模型并增加引用计数，引用计数大于0的模型不会被淘汰，使用完毕后需调用release
         
-        return self.models[model_name]
+        Args:
+            model_name: 模型名称，如果为None则使用默认模型
+            precision: 推理精度，默认为"fp32"
+            **load_kwargs: 模型未加载时传给load_model的其他参数
+            
+        Returns:
+            TTS模型实例
+        """
+        key = self._model_key(model_name, precision)
+        while True:
+            tts = self.load_model(key[0], precision=precision, **load_kwargs)
+            with self._lock:
+                # 加载完成到加锁之间模型可能已被其他线程淘汰，此时重新加载
+                if self.models.get(key) is tts:
+                    self._refcounts[key] = self._refcounts.get(key, 0) + 1
+                    return tts
     
-    def get_model(self, model_name: Optional[str] = None) -> TTS:
+    def release(self, model_name: Optional[str] = None, precision: str = "fp32") -> None:
+        """
+        释放acquire获取的模型引用，引用计数归零后模型可以被淘汰
+        
+        Args:
+            model_name: 模型名称，如果为None则使用默认模型
+            precision: 推理精度，默认为"fp32"
+        """
+        key = self._model_key(model_name, precision)
+        with self._lock:
+            count = self._refcounts.get(key, 0)
+            if count <= 0:
+                logger.warning(f"Model {key[0]} ({precision}) released more times than acquired")
+                return
+            self._refcounts[key] = count - 1
+            if key in self.models:
+                self.model_stats[key]['last_used'] = time.time()
+            self._evict_idle()
+    
+    @contextmanager
+    def use_model(self, model_name: Optional[str] = None, precision: str = "fp32", **load_kwargs):
+        """
+        以上下文管理器的方式使用模型，期间模型不会被淘汰
+        
+        Args:
+            model_name: 模型名称，如果为None则使用默认模型
+            precision: 推理精度，默认为"fp32"
+            **load_kwargs: 模型未加载时传给load_model的其他参数
+        """
+        tts = self.acquire(model_name, precision, **load_kwargs)
+        try:
+            yield tts
+        finally:
+            self.release(model_name, precision)
+    
+    def get_registry_stats(self) -> Dict[str, Any]:
+        """
+        获取注册表的统计信息
+        
+        Returns:
+            包含内存预算、总内存和每个模型的内存、引用计数、最近使用时间等信息的字典
+        """
+        with self._lock:
+            models = []
+            for key in self.models:
+                stats = self.model_stats.get(key, {})
+                models.append({
+                    'model_name': key[0],
+                    'precision': key[1],
+                    'memory_bytes': stats.get('memory_bytes', 0),
+                    'refcount': self._refcounts.get(key, 0),
+                    'use_count': stats.get('use_count', 0),
+                    'last_used': stats.get('last_used'),
+                    'loaded_at': stats.get('loaded_at'),
+                    'ready': self.ready.get(key, False)
+                })
+            return {
+                'memory_budget_bytes': self.memory_budget_bytes,
+                'memory_in_use_bytes': self._memory_in_use(),
+                'loading': [list(key) for key in self._loading],
+                'models': models
+            }
+    
+    def _load_from_snapshot(self, model_name: str, device: str):
+        """
+        尝试从权重快照加载模型
+        
+        Returns:
+            (TTS实例, 快照状态)元组，没有可用快照或加载失败时TTS实例为None
+        """
+        if self.snapshot is None:
+            return None, None
+        try:
+            tts = self.snapshot.load(model_name, device)
+        except Exception as e:
+            logger.warning(f"Failed to load model snapshot for {model_name}, loading checkpoint: {str(e)}")
+            return None, None
+        if tts is None:
+            return None, None
+        logger.info(f"Model {model_name} loaded from memory-mapped snapshot")
+        return tts, 'loaded'
+    
+    def _export_snapshot(self, tts, model_name: str) -> Optional[str]:
+        """
+        为刚从checkpoint加载的模型导出权重快照，必须在应用推理精度之前调用
+        
+        Returns:
+            快照状态，导出成功时为'exported'
+        """
+        if self.snapshot is None:
+            return None
+        try:
+            # Coqui模型下载目录的命名方式与TTS.utils.manage.ModelManager一致
+            model_dir = os.path.join(tts.manager.output_prefix, model_name.replace('/', '--'))
+            if self.snapshot.export(tts, model_name, model_dir):
+                return 'exported'
+        except Exception as e:
+            logger.warning(f"Failed to export model snapshot for {model_name}: {str(e)}")
+        return None
+    
+    def warmup_model(self, model_name: Optional[str] = None, precision: str = "fp32",
+                     languages: Optional[List[str]] = None,
+                     speaker_wav: Optional[str] = None, max_runs: int = 3,
+                     tolerance: float = 0.2) -> Dict[str, Any]:
+        """
+        预热模型：对每种语言合成一句短文本，触发分词器、文本前端词典和推理内核的首次初始化，
+        使首个真实请求的延迟与稳定状态一致
+        
+        每种语言重复合成，直到相邻两次的耗时相差不超过tolerance或达到max_runs次，完成后将模型标记为就绪
+        
+        Args:
+            model_name: 模型名称，如果为None则使用默认模型
+            precision: 推理精度，默认为"fp32"
+            languages: 预热的语言列表，默认为["zh-cn"]
+            speaker_wav: 预热使用的音色参考音频，默认从音色库中随机选择
+            max_runs: 每种语言最多合成的次数，默认为3
+            tolerance: 判断耗时已稳定的相对误差，默认为0.2
+            
+        Returns:
+            预热统计信息，包含总耗时和每种语言每次合成的耗时
+        """
+        key = self._model_key(model_name, precision)
+        model_name = key[0]
+        if languages is None:
+            languages = ['zh-cn']
+        
+        tts = self.get_model(model_name, precision)
+        logger.info(f"Warming up model {model_name} ({precision}) for languages: {languages}")
+        self.ready[key] = False
+        start_time = time.time()
+        runs: Dict[str, List[float]] = {}
+        warmup_error = None
+        try:
+            if speaker_wav is None and getattr(tts, 'is_multi_speaker', True):
+                from src.modules.voice_library import get_voice_library
+                speaker_wav = get_voice_library().get_random_prompt()
+            
+            for language in languages:
+                text = WARMUP_TEXTS.get(language, WARMUP_TEXTS['en'])
+                runs[language] = []
+                for _ in range(max_runs):
+                    run_start = time.time()
+                    # 使用BERT预处理时（分词器已加载）中文合成前会调用分词器，一并预热
+                    if self.chinese_tokenizer is not None and language.startswith('zh'):
+                        self.chinese_tokenizer.tokenize(text)
+                    kwargs = {'text': text, 'speaker_wav': speaker_wav}
+                    if getattr(tts, 'is_multi_lingual', True):
+                        kwargs['language'] = language
+                    tts.tts(**kwargs)
+                    runs[language].append(time.time() - run_start)
+                    
+                    if len(runs[language]) >= 2 and runs[language][-1] >= runs[language][-2] * (1 - tolerance):
+                        break
+                logger.info(f"Warmup for {language}: " + ', '.join(f"{t:.2f}s" for t in runs[language]))
+        except Exception as e:
+            # 预热失败不影响模型使用，只是首个请求仍需承担初始化开销
+            warmup_error = str(e)
+            logger.warning(f"Failed to warm up model {model_name}: {warmup_error}")
+        
+        warmup_stats = {'warmup_time': time.time() - start_time, 'warmup_runs': runs, 'warmup_error': warmup_error}
+        with self._lock:
+            self.model_stats.setdefault(key, {}).update(warmup_stats)
+            self.ready[key] = True
+        logger.info(f"Model {model_name} warmup finished in {warmup_stats['warmup_time']:.2f} seconds, model is ready")
+        return warmup_stats
+    
+    def is_ready(self, model_name: Optional[str] = None, precision: str = "fp32") -> bool:
+        """
+        检查指定的模型是否已加载并完成预热（未要求预热时加载完成即就绪）
+        
+        Args:
+            model_name: 模型名称，如果为None则检查默认模型
+            precision: 推理精度，默认为"fp32"
+            
+        Returns:
+            模型是否就绪
+        """
+        return self.ready.get(self._model_key(model_name, precision), False)
+    
+    def get_model_stats(self, model_name: Optional[str] = None, precision: str = "fp32") -> Dict[str, Any]:
+        """
+        获取模型的加载和预热统计信息
+        
+        Args:
+            model_name: 模型名称，如果为None则使用默认模型
+            precision: 推理精度，默认为"fp32"
+            
+        Returns:
+            包含加载耗时、预热耗时和是否就绪的字典
+        """
+        key = self._model_key(model_name, precision)
+        return {
+            'model_name': key[0],
+            'precision': precision,
+            'loaded': key in self.models,
+            'ready': self.is_ready(*key),
+            **self.model_stats.get(key, {})
+        }
+    
+    def get_model(self, model_name: Optional[str] = None, precision: str = "fp32") -> TTS:
         """
         获取指定的模型实例，如果模型未加载则加载
         
         Args:
             model_name: 模型名称，如果为None则使用默认模型
+            precision: 推理精度，默认为"fp32"
             
         Returns:
             TTS模型实例
         """
-        if model_name is None:
-            model_name = self.default_model_name
+        key = self._model_key(model_name, precision)
         
-        if model_name not in self.models:
-            return self.load_model(model_name)
+        with self._lock:
+            if key in self.models:
+                self._touch(key)
+                return self.models[key]
         
-        return self.models[model_name]
+        return self.load_model(key[0], precision=precision)
     
-    def unload_model(self, model_name: Optional[str] = None) -> None:
+    def unload_model(self, model_name: Optional[str] = None, precision: str = "fp32") -> None:
         """
         卸载指定的模型
         
         Args:
             model_name: 模型名称，如果为None则卸载默认模型
+            precision: 推理精度，默认为"fp32"
         """
-        if model_name is None:
-            model_name = self.default_model_name
+        key = self._model_key(model_name, precision)
         
-        if model_name in self.models:
-            logger.info(f"Unloading model: {model_name}")
-            del self.models[model_name]
-        else:
-            logger.warning(f"Model {model_name} not found in loaded models")
+        with self._lock:
+            if key in self.models:
+                if self._refcounts.get(key, 0) > 0:
+                    logger.warning(f"Unloading model {key[0]} ({precision}) while it is still in use")
+                logger.info(f"Unloading model: {key[0]} ({precision})")
+                self._remove(key)
+            else:
+                logger.warning(f"Model {key[0]} ({precision}) not found in loaded models")
     
     def unload_all_models(self) -> None:
         """卸载所有已加载的模型"""
         logger.info("Unloading all models")
-        self.models.clear()
+        with self._lock:
+            for key in list(self.models):
+                if self._refcounts.get(key, 0) > 0:
+                    logger.warning(f"Unloading model {key[0]} ({key[1]}) while it is still in use")
+                self._remove(key)
     
     def list_loaded_models(self) -> list:
-        """列出所有已加载的模型名称"""
-        return list(self.models.keys())
+        """列出所有已加载的模型，每项为(模型名称, 推理精度)"""
+        with self._lock:
+            return list(self.models.keys())
     
-    def is_model_loaded(self, model_name: Optional[str] = None) -> bool:
+    def is_model_loaded(self, model_name: Optional[str] = None, precision: str = "fp32") -> bool:
         """
         检查指定的模型是否已加载
         
         Args:
             model_name: 模型名称，如果为None则检查默认模型
+            precision: 推理精度，默认为"fp32"
             
         Returns:
             模型是否已加载
         """
-        if model_name is None:
-            model_name = self.default_model_name
+        return self._model_key(model_name, precision) in self.models
+    
+    def get_chinese_tokenizer(self):
+        """
+        获取中文专用tokenizer，首次调用时加载，只有使用BERT预处理时才需要
+        
+        与模型加载相同，多个线程同时请求时只加载一次，其余线程等待；加载期间不持有注册表锁，
+        下载tokenizer时不会阻塞其他线程获取或释放模型
         
-        return model_name in self.models
+        Returns:
+            BERT-base-chinese分词器
+        """
+        while True:
+            with self._lock:
+                if self.chinese_tokenizer is not None:
+                    return self.chinese_tokenizer
+                loading = self._tokenizer_loading
+                if loading is None:
+                    # 当前线程负责加载
+                    loading = self._tokenizer_loading = threading.Event()
+                    owner = True
+                else:
+                    owner = False
+            
+            if not owner:
+                # 其他线程正在加载，等待完成后重新检查（加载失败时由当前线程重试）
+                loading.wait()
+                continue
+            
+            try:
+                tokenizer = self._setup_chinese_tokenizer()
+                # 修复attention mask问题
+                self._fix_attention_mask_issue(tokenizer)
+                with self._lock:
+                    self.chinese_tokenizer = tokenizer
+            finally:
+                with self._lock:
+                    self._tokenizer_loading = None
+                loading.set()
     
     def _setup_chinese_tokenizer(self):
         """
-        设置中文专用tokenizer
+        加载中文专用tokenizer
         使用BERT-base-chinese分词器，专门针对中文优化
+        
+        Returns:
+            加载好的分词器
         """
         try:
             logger.info("Setting up Chinese tokenizer...")
             
+            # transformers导入较慢，只在加载模型时导入
+            from transformers import AutoTokenizer
+            
             # 尝试使用本地已下载的tokenizer
             import os
             local_tokenizer_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "models", "bert-base-chinese")
             
             if os.path.exists(local_tokenizer_path):
                 logger.info(f"Loading local BERT tokenizer from {local_tokenizer_path}")
-                self.chinese_tokenizer = AutoTokenizer.from_pretrained(local_tokenizer_path)
+                tokenizer = AutoTokenizer.from_pretrained(local_tokenizer_path)
             else:
                 # 如果本地不存在，则尝试从huggingface下载，但禁用SSL验证
                 logger.info("Downloading BERT tokenizer from huggingface (SSL verification disabled)")
@@ -178,39 +636,43 @@ class ModelManager:
                 else:
                     ssl._create_default_https_context = _create_unverified_https_context
                 
-                self.chinese_tokenizer = AutoTokenizer.from_pretrained("bert-base-chinese", local_files_only=False)
+                tokenizer = AutoTokenizer.from_pretrained("bert-base-chinese", local_files_only=False)
                 
                 # 保存到本地以便下次使用
                 os.makedirs(os.path.dirname(local_tokenizer_path), exist_ok=True)
-                self.chinese_tokenizer.save_pretrained(local_tokenizer_path)
+                tokenizer.save_pretrained(local_tokenizer_path)
                 logger.info(f"Saved BERT tokenizer to {local_tokenizer_path}")
             
             # 配置pad token，确保与eos token不同
-            if self.chinese_tokenizer.pad_token is None:
-                self.chinese_tokenizer.pad_token = self.chinese_tokenizer.eos_token
+            if tokenizer.pad_token is None:
+                tokenizer.pad_token = tokenizer.eos_token
             
             logger.info("Chinese tokenizer setup successfully")
+            return tokenizer
             
         except Exception as e:
             logger.error(f"Failed to setup Chinese tokenizer: {str(e)}")
             raise
     
-    def _fix_attention_mask_issue(self):
+    def _fix_attention_mask_issue(self, tokenizer):
         """
         修复attention mask问题
         确保pad token和eos token不同，避免attention mask混淆
+        
+        Args:
+            tokenizer: 刚加载的分词器
         """
         try:
             logger.info("Fixing attention mask issue...")
             
-            if self.chinese_tokenizer:
+            if tokenizer is not None:
                 # 确保pad token和eos token不同
-                if self.chinese_tokenizer.pad_token == self.chinese_tokenizer.eos_token:
+                if tokenizer.pad_token == tokenizer.eos_token:
                     # 如果相同，设置一个不同的pad token
-                    self.chinese_tokenizer.pad_token = "[PAD]"
-                    if "[PAD]" not in self.chinese_tokenizer.get_vocab():
+                    tokenizer.pad_token = "[PAD]"
+                    if "[PAD]" not in tokenizer.get_vocab():
                         # 如果词汇表中没有[PAD]，使用unk token
-                        self.chinese_tokenizer.pad_token = self.chinese_tokenizer.unk_token
+                        tokenizer.pad_token = tokenizer.unk_token
             
             logger.info("Attention mask issue fixed successfully")
             
@@ -0,0 +1,186 @@
+import os
+import json
+import time
+import logging
+from typing import Any, Dict, Optional
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 快照格式版本，修改快照内容时递增，旧快照会被重新导出
+SNAPSHOT_VERSION = 1
+
+# gpt_inference与gpt共享同一组层，保存时去掉重复的键，加载时由init_gpt_for_inference重新建立
+_SHARED_PREFIXES = ('gpt.gpt_inference.',)
+
+class ModelSnapshot:
+    """
+    XTTS模型权重快照，首次加载模型后导出一份可内存映射的权重文件，之后的进程直接映射该文件启动
+
+    快照使用torch的zip格式保存，通过torch.load(mmap=True)和load_state_dict(assign=True)加载，
+    权重直接引用文件映射的页面而不是复制到进程内存中，同一主机上的多个进程共享相同的物理页
+    """
+    def __init__(self, snapshot_dir: str = "cache/models"):
+        """
+        初始化模型快照
+
+        Args:
+            snapshot_dir: 快照目录，默认为"cache/models"
+        """
+        self.snapshot_dir = snapshot_dir
+
+    def _model_dir(self, model_name: str) -> str:
+        """快照中某个模型的目录"""
+        return os.path.join(self.snapshot_dir, model_name.replace('/', '--'))
+
+    def _weights_file(self, model_name: str) -> str:
+        return os.path.join(self._model_dir(model_name), 'model.pt')
+
+    def _info_file(self, model_name: str) -> str:
+        return os.path.join(self._model_dir(model_name), 'snapshot.json')
+
+    @staticmethod
+    def _source_signature(checkpoint_file: str) -> Dict[str, Any]:
+        """原始checkpoint的签名，checkpoint更新后快照失效"""
+        stat = os.stat(checkpoint_file)
+        return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+    @staticmethod
+    def _get_xtts_model(tts):
+        """获取TTS API实例中的XTTS模型，不是XTTS时返回None"""
+        synthesizer = getattr(tts, 'synthesizer', None)
+        tts_model = getattr(synthesizer, 'tts_model', None)
+        if tts_model is not None and hasattr(tts_model, 'gpt') and hasattr(tts_model, 'load_checkpoint'):
+            return tts_model
+        return None
+
+    def _read_info(self, model_name: str) -> Optional[Dict[str, Any]]:
+        """读取快照信息，快照不存在或已失效时返回None"""
+        info_file = self._info_file(model_name)
+        if not os.path.exists(info_file) or not os.path.exists(self._weights_file(model_name)):
+            return None
+        try:
+            with open(info_file, 'r', encoding='utf-8') as f:
+                info = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Invalid snapshot info {info_file}: {str(e)}")
+            return None
+
+        import torch
+        if info.get('version') != SNAPSHOT_VERSION or info.get('torch_version') != torch.__version__:
+            return None
+        checkpoint_file = os.path.join(info.get('model_dir', ''), 'model.pth')
+        if not os.path.exists(checkpoint_file) or info.get('source') != self._source_signature(checkpoint_file):
+            return None
+        return info
+
+    def exists(self, model_name: str) -> bool:
+        """
+        检查模型是否有可用的快照
+
+        Args:
+            model_name: 模型名称
+
+        Returns:
+            快照是否存在且与原始checkpoint一致
+        """
+        return self._read_info(model_name) is not None
+
+    def export(self, tts, model_name: str, model_dir: str) -> bool:
+        """
+        导出已加载模型的权重快照，需在应用推理精度之前调用
+
+        Args:
+            tts: 已加载的TTS API实例
+            model_name: 模型名称
+            model_dir: 原始模型目录（包含config.json、model.pth和vocab.json）
+
+        Returns:
+            是否导出成功，模型不是XTTS时返回False
+        """
+        xtts_model = self._get_xtts_model(tts)
+        checkpoint_file = os.path.join(model_dir, 'model.pth')
+        if xtts_model is None or not os.path.exists(checkpoint_file):
+            return False
+
+        import torch
+
+        start_time = time.time()
+        os.makedirs(self._model_dir(model_name), exist_ok=True)
+        state_dict = {
+            key: value for key, value in xtts_model.state_dict().items()
+            if not key.startswith(_SHARED_PREFIXES)
+        }
+
+        # 先写临时文件再替换，避免其他进程读到写了一半的快照
+        weights_file = self._weights_file(model_name)
+        tmp_file = f"{weights_file}.{os.getpid()}.tmp"
+        torch.save(state_dict, tmp_file)
+        os.replace(tmp_file, weights_file)
+
+        info = {
+            'version': SNAPSHOT_VERSION,
+            'model_name': model_name,
+            'model_dir': os.path.abspath(model_dir),
+            'torch_version': torch.__version__,
+            'source': self._source_signature(checkpoint_file),
+            'created': time.time()
+        }
+        info_file = self._info_file(model_name)
+        with open(f"{info_file}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(info, f, ensure_ascii=False, indent=2)
+        os.replace(f"{info_file}.tmp", info_file)
+
+        logger.info(f"Exported model snapshot to {weights_file} in {time.time() - start_time:.2f} seconds")
+        return True
+
+    def load(self, model_name: str, device: str = "cpu"):
+        """
+        从快照加载模型，权重以内存映射方式引用快照文件
+
+        Args:
+            model_name: 模型名称
+            device: 运行设备，默认为"cpu"（其他设备会将权重复制到设备上，无法共享页面）
+
+        Returns:
+            TTS API实例，没有可用快照时返回None
+        """
+        info = self._read_info(model_name)
+        if info is None:
+            return None
+
+        import torch
+        from TTS.api import TTS
+        from TTS.config import load_config
+        from TTS.tts.models import setup_model
+        from TTS.utils.synthesizer import Synthesizer
+
+        model_dir = info['model_dir']
+        weights_file = self._weights_file(model_name)
+        config = load_config(os.path.join(model_dir, 'config.json'))
+        xtts_model = setup_model(config)
+
+        # 复用Xtts.load_checkpoint完成分词器、说话人和推理模型的初始化，
+        # 只替换读取权重的部分：映射快照文件，并用assign直接引用映射的张量而不是复制
+        xtts_model.get_compatible_checkpoint_state_dict = lambda path: torch.load(
+            path, map_location='cpu', mmap=True, weights_only=True
+        )
+        xtts_model.load_state_dict = lambda state_dict, strict=True: type(xtts_model).load_state_dict(
+            xtts_model, state_dict, strict=strict, assign=True
+        )
+        try:
+            xtts_model.load_checkpoint(config, checkpoint_dir=model_dir, checkpoint_path=weights_file, eval=True)
+        finally:
+            del xtts_model.get_compatible_checkpoint_state_dict
+            del xtts_model.load_state_dict
+
+        synthesizer = Synthesizer(use_cuda=False)
+        synthesizer.tts_model = xtts_model
+        synthesizer.tts_config = config
+        synthesizer.output_sample_rate = config.audio['output_sample_rate']
+
+        tts = TTS()
+        tts.model_name = model_name
+        tts.synthesizer = synthesizer
+        return tts.to(device)
@@ -1,8 +1,9 @@
 import os
 import random
 import logging
+import threading
+from collections import OrderedDict
 import numpy as np
-import librosa
 import soundfile as sf
 from typing import List, Dict, Optional, Tuple
 from pathlib import Path
@@ -87,40 +88,78 @@ class NoiseMixer:
     """
     噪声混合器，用于将噪声与语音混合
     """
-    def __init__(self, noise_library: NoiseLibrary = None):
+    def __init__(self, noise_library: NoiseLibrary = None, noise_cache_size: int = 8):
         """
         初始化噪声混合器
         
         Args:
             noise_library: 噪声库实例，如果为None则创建默认实例
+            noise_cache_size: 最多缓存的噪声数据条数，超出后按LRU策略淘汰，默认为8
         """
+        if noise_cache_size < 1:
+            raise ValueError("Noise cache size must be at least 1")
+        
         self.noise_library = noise_library or NoiseLibrary()
+        # 已加载并重采样的噪声数据缓存，键为(噪声文件, 采样率)
+        self.noise_cache_size = noise_cache_size
+        self._noise_cache: "OrderedDict[Tuple[str, int], np.ndarray]" = OrderedDict()
+        self._noise_cache_lock = threading.Lock()
         
-    def mix_noise(self, audio_path: str, noise_type: str = 'random', snr_db: float = 10.0, output_dir = None) -> Optional[str]:
+    def _load_noise(self, noise_file: Path, sr: int) -> np.ndarray:
         """
-        将噪声与语音混合
+        加载噪声文件并重采样到目标采样率，结果按(文件, 采样率)缓存
         
         Args:
-            audio_path: 原始音频文件路径
+            noise_file: 噪声文件路径
+            sr: 目标采样率
+            
+        Returns:
+            噪声波形数据
+        """
+        key = (str(noise_file), sr)
+        with self._noise_cache_lock:
+            if key in self._noise_cache:
+                self._noise_cache.move_to_end(key)
+                return self._noise_cache[key]
+        
+        # 在锁外加载，避免阻塞其他噪声的查询
+        # librosa依赖numba，导入较慢，只在需要时导入
+        import librosa
+        noise_data, noise_sr = librosa.load(noise_file, sr=None)
+        logger.info(f"Loaded noise file: {noise_file}, sample rate: {noise_sr}")
+        
+        # 确保噪声和音频具有相同的采样率
+        if noise_sr != sr:
+            noise_data = librosa.resample(noise_data, orig_sr=noise_sr, target_sr=sr)
+            logger.info(f"Resampled noise to match audio sample rate: {sr}")
+        
+        with self._noise_cache_lock:
+            self._noise_cache[key] = noise_data
+            self._noise_cache.move_to_end(key)
+            while len(self._noise_cache) > self.noise_cache_size:
+                evicted_key, _ = self._noise_cache.popitem(last=False)
+                logger.debug(f"Evicted cached noise: {evicted_key[0]} ({evicted_key[1]} Hz)")
+        return noise_data
+    
+    def mix_noise_array(self, audio_data: np.ndarray, sr: int, noise_type: str = 'random',
+                        snr_db: float = 10.0) -> Optional[Tuple[np.ndarray, Path]]:
+        """
+        将噪声与内存中的语音波形混合，不读写任何音频文件
+        
+        Args:
+            audio_data: 原始语音波形
+            sr: 语音采样率
             noise_type: 噪声类型，文件名、'random'或'random_from_list'
             snr_db: 信噪比(dB)，范围0-20
             
         Returns:
-            混合后的音频文件路径，如果混合失败则返回None
+            (混合后的波形, 使用的噪声文件)元组，如果混合失败则返回None
         """
         # 验证SNR值在有效范围内
         if snr_db < 0 or snr_db > 20:
             logger.warning(f"SNR value {snr_db} is out of range [0, 20], using default 10dB")
             snr_db = 10.0
         
-        # 加载原始音频
-        try:
-            audio_data, sr = librosa.load(audio_path, sr=None)
-            logger.info(f"Loaded audio file: {audio_path}, sample rate: {sr}")
-        except Exception as e:
-            logger.error(f"Failed to load audio file {audio_path}: {str(e)}")
-            return None
-        
         # 获取噪声文件
         noise_file = self.noise_library.get_noise_file(noise_type)
         if not noise_file:
@@ -129,17 +168,11 @@ class NoiseMixer:
         
         # 加载噪声文件
         try:
-            noise_data, noise_sr = librosa.load(noise_file, sr=None)
-            logger.info(f"Loaded noise file: {noise_file}, sample rate: {noise_sr}")
+            noise_data = self._load_noise(noise_file, sr)
         except Exception as e:
             logger.error(f"Failed to load noise file {noise_file}: {str(e)}")
             return None
         
-        # 确保噪声和音频具有相同的采样率
-        if noise_sr != sr:
-            noise_data = librosa.resample(noise_data, orig_sr=noise_sr, target_sr=sr)
-            logger.info(f"Resampled noise to match audio sample rate: {sr}")
-        
         # 调整噪声长度以匹配音频
         if len(noise_data) < len(audio_data):
             # 如果噪声太短，重复噪声
@@ -158,6 +191,39 @@ class NoiseMixer:
             logger.error(f"Failed to mix audio with noise: {str(e)}")
             return None
         
+        return mixed_audio, noise_file
+        
+    def mix_noise(self, audio_path: str, noise_type: str = 'random', snr_db: float = 10.0, output_dir = None) -> Optional[str]:
+        """
+        将噪声与语音混合
+        
+        Args:
+            audio_path: 原始音频文件路径
+            noise_type: 噪声类型，文件名、'random'或'random_from_list'
+            snr_db: 信噪比(dB)，范围0-20
+            
+        Returns:
+            混合后的音频文件路径，如果混合失败则返回None
+        """
+        # 验证SNR值在有效范围内
+        if snr_db < 0 or snr_db > 20:
+            logger.warning(f"SNR value {snr_db} is out of range [0, 20], using default 10dB")
+            snr_db = 10.0
+        
+        # 加载原始音频
+        try:
+            import librosa
+            audio_data, sr = librosa.load(audio_path, sr=None)
+            logger.info(f"Loaded audio file: {audio_path}, sample rate: {sr}")
+        except Exception as e:
+            logger.error(f"Failed to load audio file {audio_path}: {str(e)}")
+            return None
+        
+        mixed = self.mix_noise_array(audio_data, sr, noise_type=noise_type, snr_db=snr_db)
+        if mixed is None:
+            return None
+        mixed_audio, noise_file = mixed
+        
         # 生成输出路径
         output_dir = output_dir or Path("output/tts_with_noise")
         output_dir = Path(output_dir)
@@ -198,6 +264,7 @@ class NoiseMixer:
         
         # 加载原始音频
         try:
+            import librosa
             audio_data, sr = librosa.load(audio_path, sr=None)
             logger.info(f"Loaded audio file: {audio_path}, sample rate: {sr}")
         except Exception as e:
@@ -224,14 +291,8 @@ class NoiseMixer:
         # 对每个噪声文件进行混合
         for i, noise_file in enumerate(noise_files):
             try:
-                # 加载噪声文件
-                noise_data, noise_sr = librosa.load(noise_file, sr=None)
-                logger.info(f"Loaded noise file: {noise_file}, sample rate: {noise_sr}")
-                
-                # 确保噪声和音频具有相同的采样率
-                if noise_sr != sr:
-                    noise_data = librosa.resample(noise_data, orig_sr=noise_sr, target_sr=sr)
-                    logger.info(f"Resampled noise to match audio sample rate: {sr}")
+                # 加载噪声文件（已重采样到音频采样率）
+                noise_data = self._load_noise(noise_file, sr)
                 
                 # 调整噪声长度以匹配音频
                 if len(noise_data) < len(audio_data):
@@ -292,5 +353,23 @@ class NoiseMixer:
         
         return mixed_signal
 
-# 创建全局噪声混合器实例
-noise_mixer = NoiseMixer()
\ No newline at end of file
+# 全局噪声混合器实例，首次使用时才创建，避免导入模块时扫描噪声目录
+_noise_mixer: Optional[NoiseMixer] = None
+
+def get_noise_mixer() -> NoiseMixer:
+    """
+    获取全局噪声混合器实例，首次调用时加载噪声库
+    
+    Returns:
+        全局噪声混合器实例
+    """
+    global _noise_mixer
+    if _noise_mixer is None:
+        _noise_mixer = NoiseMixer()
+    return _noise_mixer
+
+def __getattr__(name: str):
+    """兼容旧的`noise_mixer`全局变量，访问时才创建实例"""
+    if name == 'noise_mixer':
+        return get_noise_mixer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,135 @@
+import logging
+from collections.abc import MutableMapping
+from functools import wraps
+
+# torch只在应用精度时导入，只使用PRECISIONS的模块（如命令行参数解析）不需要加载torch
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 支持的推理精度
+# fp32: 原始精度
+# int8: GPT的线性层使用动态INT8量化（权重INT8存储，激活在运行时量化），其余部分保持fp32
+# bf16: GPT在bfloat16 autocast下运行，输出转换回fp32，声码器保持fp32以保证音质
+PRECISIONS = ('fp32', 'int8', 'bf16')
+
+def bf16_supported() -> bool:
+    """检查当前CPU是否原生支持bfloat16运算（AVX512-BF16或AMX），不支持时autocast反而更慢"""
+    import torch
+
+    checks = ('_is_avx512_bf16_supported', '_is_amx_tile_supported')
+    return any(getattr(torch.cpu, name, lambda: False)() for name in checks)
+
+def _convert_conv1d_to_linear(module: 'torch.nn.Module') -> int:
+    """
+    将transformers GPT2中的Conv1D层替换为等价的nn.Linear，动态量化只对nn.Linear生效
+
+    Args:
+        module: 要转换的模块
+
+    Returns:
+        被替换的层数
+    """
+    import torch
+    from transformers.pytorch_utils import Conv1D
+
+    converted = 0
+    for name, child in module.named_children():
+        if isinstance(child, Conv1D):
+            # Conv1D的权重形状为(in_features, out_features)，计算为x @ W + b
+            linear = torch.nn.Linear(child.weight.shape[0], child.weight.shape[1])
+            linear.weight.data = child.weight.data.t().contiguous()
+            linear.bias.data = child.bias.data
+            setattr(module, name, linear)
+            converted += 1
+        else:
+            converted += _convert_conv1d_to_linear(child)
+    return converted
+
+def _quantize_int8(xtts_model) -> None:
+    """对XTTS的GPT模块进行动态INT8量化"""
+    import torch
+
+    converted = _convert_conv1d_to_linear(xtts_model.gpt)
+    # 推理使用的gpt_inference与gpt共享同一组层，原地替换后两者都使用量化后的层
+    torch.ao.quantization.quantize_dynamic(xtts_model.gpt, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    logger.info(f"Applied dynamic INT8 quantization to GPT linear layers ({converted} Conv1D layers converted)")
+
+# 不转换的输出：KV缓存只传回下一步的autocast前向，保持bfloat16可以避免每步转换并节省一半的缓存内存
+_KEEP_BF16_KEYS = frozenset({'past_key_values'})
+
+def _to_float32(value):
+    """
+    将输出中的bfloat16张量转换回float32，包括嵌套在ModelOutput、字典、元组和列表中的张量，
+    保证logits等进入采样（softmax、top-p）时是float32
+    """
+    import torch
+
+    if isinstance(value, torch.Tensor):
+        return value.float() if value.dtype == torch.bfloat16 else value
+    if isinstance(value, MutableMapping):
+        # transformers的ModelOutput是OrderedDict的子类，按键赋值时会同步更新同名属性
+        for key in list(value.keys()):
+            if key not in _KEEP_BF16_KEYS:
+                value[key] = _to_float32(value[key])
+        return value
+    if isinstance(value, tuple):
+        converted = [_to_float32(v) for v in value]
+        # namedtuple需要按位置参数构造
+        return type(value)(*converted) if hasattr(value, '_fields') else tuple(converted)
+    if isinstance(value, list):
+        return [_to_float32(v) for v in value]
+    return value
+
+def _autocast_forward(module: 'torch.nn.Module') -> None:
+    """让模块的forward在bfloat16 autocast下运行，输出转换回float32"""
+    import torch
+
+    forward = module.forward
+
+    @wraps(forward)
+    def autocast_forward(*args, **kwargs):
+        with torch.autocast(device_type='cpu', dtype=torch.bfloat16):
+            return _to_float32(forward(*args, **kwargs))
+
+    module.forward = autocast_forward
+
+def _autocast_bf16(xtts_model) -> None:
+    """GPT的训练前向（计算latent）和自回归推理前向都使用bfloat16 autocast"""
+    gpt = xtts_model.gpt
+    _autocast_forward(gpt)
+    if getattr(gpt, 'gpt_inference', None) is not None:
+        _autocast_forward(gpt.gpt_inference)
+    logger.info("Enabled bfloat16 autocast for GPT")
+
+def apply_precision(tts, precision: str) -> str:
+    """
+    将推理精度应用到已加载的TTS模型，模型会被原地修改
+
+    Args:
+        tts: TTS API实例
+        precision: 推理精度，'fp32'、'int8'或'bf16'
+
+    Returns:
+        实际生效的精度，模型不是XTTS或CPU不支持bf16时回退为'fp32'
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unsupported precision: {precision}, expected one of {PRECISIONS}")
+    if precision == 'fp32':
+        return precision
+
+    synthesizer = getattr(tts, 'synthesizer', None)
+    xtts_model = getattr(synthesizer, 'tts_model', None)
+    if xtts_model is None or not hasattr(xtts_model, 'gpt'):
+        logger.warning(f"Precision {precision} is only supported for XTTS models, using fp32")
+        return 'fp32'
+
+    if precision == 'int8':
+        _quantize_int8(xtts_model)
+    elif precision == 'bf16':
+        if not bf16_supported():
+            logger.warning("CPU has no native bfloat16 support, using fp32")
+            return 'fp32'
+        _autocast_bf16(xtts_model)
+    return precision
@@ -0,0 +1,60 @@
+from typing import List, Sequence
+
+import numpy as np
+
+def _ramp(length: int) -> np.ndarray:
+    """从0到1的线性渐变"""
+    return np.linspace(0.0, 1.0, length, endpoint=False, dtype=np.float32)
+
+def join_segments(wavs: Sequence[np.ndarray], sample_rate: int,
+                  crossfade_ms: float = 20.0, silence_ms: float = 200.0) -> np.ndarray:
+    """
+    按顺序拼接各片段的波形
+
+    silence_ms大于0时片段之间插入静音，片段首尾做crossfade_ms长的淡入淡出以避免爆音；
+    silence_ms为0时相邻片段重叠crossfade_ms并交叉淡化
+
+    Args:
+        wavs: 各片段的波形数据
+        sample_rate: 采样率
+        crossfade_ms: 淡入淡出或交叉淡化的时长（毫秒），默认为20
+        silence_ms: 片段之间的静音时长（毫秒），默认为200
+
+    Returns:
+        拼接后的波形数据
+    """
+    if crossfade_ms < 0 or silence_ms < 0:
+        raise ValueError("Crossfade and silence durations cannot be negative")
+
+    fade = int(sample_rate * crossfade_ms / 1000)
+    silence = np.zeros(int(sample_rate * silence_ms / 1000), dtype=np.float32)
+
+    parts: List[np.ndarray] = []
+    for wav in wavs:
+        wav = np.asarray(wav, dtype=np.float32)
+        if not parts:
+            parts.append(wav)
+            continue
+
+        prev = parts[-1]
+        if len(silence):
+            fade_out = min(fade, len(prev))
+            if fade_out:
+                prev = prev.copy()
+                prev[-fade_out:] *= _ramp(fade_out)[::-1]
+                parts[-1] = prev
+            parts.append(silence)
+            fade_in = min(fade, len(wav))
+            if fade_in:
+                wav = wav.copy()
+                wav[:fade_in] *= _ramp(fade_in)
+        else:
+            overlap = min(fade, len(prev), len(wav))
+            if overlap:
+                ramp = _ramp(overlap)
+                parts[-1] = prev[:-overlap]
+                parts.append(prev[-overlap:] * (1.0 - ramp) + wav[:overlap] * ramp)
+                wav = wav[overlap:]
+        parts.append(wav)
+
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
@@ -0,0 +1,201 @@
+import sys
+import heapq
+import hashlib
+import logging
+import argparse
+import itertools
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.modules.meta_writer import MetaWriter, read_meta_rows
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def validate_shard(num_shards: int, shard_index: int) -> None:
+    """
+    检查分片参数
+
+    Args:
+        num_shards: 分片总数
+        shard_index: 本分片的序号，从0开始
+    """
+    if num_shards < 1:
+        raise ValueError("Number of shards must be at least 1")
+    if not 0 <= shard_index < num_shards:
+        raise ValueError(f"Shard index must be in [0, {num_shards}), got {shard_index}")
+
+def make_item_id(text_id: Any, subdir: Optional[str] = None) -> str:
+    """
+    生成条目ID：单个输入文件时为文本ID，多个输入文件时为"<输出子目录>/<文本ID>"，与音频的相对输出路径一致
+
+    Args:
+        text_id: 文本ID
+        subdir: 输入文件对应的输出子目录，默认为None（单个输入文件）
+
+    Returns:
+        条目ID
+    """
+    return f"{subdir}/{text_id}" if subdir else str(text_id)
+
+def shard_of(item_id: str, num_shards: int) -> int:
+    """
+    根据条目ID的哈希确定条目所属的分片
+
+    使用固定的哈希函数而不是内置的hash()（字符串哈希每个进程随机），不同机器、不同Python版本上
+    同一条目总是分到同一个分片，各分片不需要协调即可不重不漏地处理同一个输入
+
+    Args:
+        item_id: 条目ID
+        num_shards: 分片总数
+
+    Returns:
+        分片序号
+    """
+    if num_shards <= 1:
+        return 0
+    digest = hashlib.blake2b(item_id.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % num_shards
+
+def iter_input_items(input_files: List[str], **load_kwargs) -> Iterator[Tuple[int, str]]:
+    """
+    按合成时的顺序列出输入文件中的所有条目（分片前），用于检查合并后的meta文件是否缺少条目
+
+    Args:
+        input_files: 输入文件路径列表，应与合成时展开后的列表相同
+        **load_kwargs: 读取参数，传给TextLoader.iter_text_batches
+
+    Returns:
+        (输入序号, 条目ID)元组的迭代器
+    """
+    from src.modules.text_loader import TextLoader
+    from src.modules.file_parser import output_subdirs
+
+    loader = TextLoader()
+    subdirs = output_subdirs(input_files) if len(input_files) > 1 else [None]
+    texts = (
+        (text_dict['id'], subdir)
+        for input_file, subdir in zip(input_files, subdirs)
+        for batch in loader.iter_text_batches(input_file, **load_kwargs)
+        for text_dict in batch
+    )
+    for input_index, (text_id, subdir) in enumerate(texts):
+        yield input_index, make_item_id(text_id, subdir)
+
+def _iter_indexed_rows(meta_file: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """读取一个分片的meta文件，产出(输入序号, 行)，分片的meta文件按输入序号递增排列"""
+    last_index = -1
+    for row in read_meta_rows(meta_file):
+        value = row.get('input_index')
+        if value is None or value == '':
+            raise ValueError(f"Meta file has no input_index column: {meta_file}")
+        input_index = int(value)
+        if input_index < last_index:
+            raise ValueError(f"Meta file is not in input order: {meta_file}")
+        last_index = input_index
+        yield input_index, row
+
+def merge_shard_metas(meta_files: List[str], output_meta_file: str,
+                      expected_items: Optional[Iterable[Tuple[int, str]]] = None,
+                      num_shards: Optional[int] = None, meta_format: Optional[str] = None) -> Dict[str, Any]:
+    """
+    将各分片的meta文件按输入序号合并为一个文件，并找出缺失和失败的条目
+
+    各分片的meta文件本身按输入序号排列，逐行归并，内存占用与条目数无关；同一条目出现在多个文件中
+    （如失败后重跑的分片）时优先取成功的结果。指定expected_items时按其检查缺失的条目，
+    否则只能发现输入序号中间的空缺，最后几个条目缺失时无法发现
+
+    Args:
+        meta_files: 各分片的meta文件路径列表，支持CSV和JSON Lines
+        output_meta_file: 合并后的meta文件路径
+        expected_items: 输入中所有条目的(输入序号, 条目ID)，如iter_input_items的结果，默认为None
+        num_shards: 分片总数，指定时报告缺失条目所属的分片，默认为None
+        meta_format: 合并后的文件格式，'csv'或'jsonl'，默认为None（根据扩展名判断）
+
+    Returns:
+        合并报告：rows（写入行数）、duplicates（重复行数）、missing和failed（条目列表，
+        每项包含input_index、item_id，missing带shard，failed带error_message）
+    """
+    merged = heapq.merge(*(_iter_indexed_rows(meta_file) for meta_file in meta_files), key=lambda item: item[0])
+    expected = iter(expected_items) if expected_items is not None else None
+    missing: List[Dict[str, Any]] = []
+    failed: List[Dict[str, Any]] = []
+    duplicates = 0
+    next_index = 0
+
+    def add_missing(input_index: int, item_id: Optional[str] = None) -> None:
+        shard = shard_of(item_id, num_shards) if num_shards and item_id is not None else None
+        missing.append({'input_index': input_index, 'item_id': item_id, 'shard': shard})
+
+    with MetaWriter(output_meta_file, meta_format) as meta_writer:
+        for input_index, group in itertools.groupby(merged, key=lambda item: item[0]):
+            rows = [row for _, row in group]
+            duplicates += len(rows) - 1
+            row = next((row for row in rows if row.get('success') == 'Yes'), rows[-1])
+
+            if expected is not None:
+                for expected_index, item_id in expected:
+                    if expected_index == input_index:
+                        if row.get('item_id') and row['item_id'] != item_id:
+                            logger.warning(f"Item {input_index} is {row['item_id']} in meta but {item_id} in input, "
+                                           f"the input may have changed since synthesis")
+                        break
+                    add_missing(expected_index, item_id)
+                else:
+                    logger.warning(f"Item {input_index} is not in the input")
+                    expected = iter(())
+            else:
+                for gap_index in range(next_index, input_index):
+                    add_missing(gap_index)
+            next_index = input_index + 1
+
+            meta_writer.write_row(meta_writer.rows_written, row)
+            if row.get('success') != 'Yes':
+                failed.append({'input_index': input_index, 'item_id': row.get('item_id'),
+                               'error_message': row.get('error_message', '')})
+
+        if expected is not None:
+            for expected_index, item_id in expected:
+                add_missing(expected_index, item_id)
+        rows_written = meta_writer.rows_written
+
+    logger.info(f"Merged {len(meta_files)} meta files into {output_meta_file}: {rows_written} rows, "
+                f"{len(missing)} missing, {len(failed)} failed, {duplicates} duplicates")
+    return {'rows': rows_written, 'duplicates': duplicates, 'missing': missing, 'failed': failed}
+
+def main():
+    """合并各分片meta文件的命令行工具，有缺失或失败的条目时以非零状态退出"""
+    parser = argparse.ArgumentParser(description='Merge per-shard meta files into input order')
+    parser.add_argument('meta_files', type=str, nargs='+', help='Per-shard meta files (CSV or JSONL)')
+    parser.add_argument('--output', type=str, required=True, help='Merged meta file path')
+    parser.add_argument('--meta-format', type=str, choices=['csv', 'jsonl'], help='Merged meta format (default: by extension, else csv)')
+    parser.add_argument('--input', type=str, nargs='+',
+                        help='Input files, directories or glob patterns of the job, to find items missing at the end')
+    parser.add_argument('--num-shards', type=int, help='Number of shards of the job, to report the shard of missing items')
+    parser.add_argument('--limit', type=int, default=20, help='Number of missing and failed items to list (default: 20)')
+
+    args = parser.parse_args()
+
+    expected_items = None
+    if args.input:
+        from src.modules.file_parser import expand_input_paths
+        expected_items = iter_input_items(expand_input_paths(args.input))
+
+    report = merge_shard_metas(args.meta_files, args.output, expected_items=expected_items,
+                               num_shards=args.num_shards, meta_format=args.meta_format)
+
+    print(f"Merged meta file: {args.output}")
+    print(f"  Rows: {report['rows']}")
+    print(f"  Duplicates: {report['duplicates']}")
+    print(f"  Missing: {len(report['missing'])}")
+    for item in report['missing'][:args.limit]:
+        shard = f"  (shard {item['shard']})" if item['shard'] is not None else ''
+        print(f"    {item['input_index']}  {item['item_id'] or ''}{shard}")
+    print(f"  Failed: {len(report['failed'])}")
+    for item in report['failed'][:args.limit]:
+        print(f"    {item['input_index']}  {item['item_id'] or ''}  {item['error_message']}")
+
+    sys.exit(1 if report['missing'] or report['failed'] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class SpeakerLatentCache:
+    """
+    XTTS音色条件向量缓存，按(参考音频路径, 修改时间, gpt_cond_len, 采样率)缓存
+    gpt_cond_latent和speaker_embedding，避免每条文本重复加载参考音频并计算条件向量
+    """
+    def __init__(self, max_size: int = 32):
+        """
+        初始化音色条件向量缓存
+
+        Args:
+            max_size: 最多缓存的条目数，超出后按LRU策略淘汰，默认为32
+        """
+        if max_size < 1:
+            raise ValueError("Max size must be at least 1")
+
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple, Tuple[Any, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        logger.info(f"SpeakerLatentCache initialized with max size: {max_size}")
+
+    def make_key(self, speaker_wav: Union[str, List[str]], gpt_cond_len: int, sample_rate: int) -> Tuple:
+        """
+        生成缓存键，参考音频文件被修改后键会随之变化
+
+        Args:
+            speaker_wav: 音色参考音频文件路径或路径列表
+            gpt_cond_len: 用于计算GPT条件向量的音频长度（秒）
+            sample_rate: 加载参考音频时使用的采样率
+
+        Returns:
+            缓存键
+        """
+        wavs = [speaker_wav] if isinstance(speaker_wav, str) else list(speaker_wav)
+        files = []
+        for wav in wavs:
+            path = os.path.abspath(wav)
+            files.append((path, os.path.getmtime(path)))
+        return (tuple(files), gpt_cond_len, sample_rate)
+
+    def get_or_compute(self, speaker_wav: Union[str, List[str]], gpt_cond_len: int, sample_rate: int,
+                       compute_fn: Callable[[], Tuple[Any, Any]]) -> Tuple[Any, Any]:
+        """
+        获取缓存的条件向量，未命中时调用compute_fn计算并写入缓存
+
+        Args:
+            speaker_wav: 音色参考音频文件路径或路径列表
+            gpt_cond_len: 用于计算GPT条件向量的音频长度（秒）
+            sample_rate: 加载参考音频时使用的采样率
+            compute_fn: 计算(gpt_cond_latent, speaker_embedding)的函数
+
+        Returns:
+            (gpt_cond_latent, speaker_embedding)元组
+        """
+        key = self.make_key(speaker_wav, gpt_cond_len, sample_rate)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # 在锁外计算，避免阻塞其他音色的查询
+        logger.debug(f"Computing conditioning latents for: {speaker_wav}")
+        latents = compute_fn()
+
+        with self._lock:
+            self._entries[key] = latents
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                evicted_key, _ = self._entries.popitem(last=False)
+                logger.debug(f"Evicted conditioning latents: {evicted_key[0]}")
+
+        return latents
+
+    def clear(self) -> None:
+        """清空缓存并重置命中统计"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计信息
+
+        Returns:
+            包含条目数、容量、命中数、未命中数和命中率的字典
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,85 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+# 合成流程的各个阶段，顺序即meta文件中的列顺序
+STAGES = [
+    'preprocess',     # 文本预处理（不含BERT分词）和句子切分
+    'tokenize',       # BERT-base-chinese分词（批量合成时还包括XTTS的token转换）
+    'conditioning',   # 音色条件向量计算（缓存命中时接近0）
+    'gpt_decode',     # GPT自回归解码
+    'vocoder',        # HiFiGAN声码器
+    'write'           # 写入音频文件
+]
+
+class StageTimer:
+    """
+    分阶段计时器，同一阶段的多次耗时累加
+
+    阶段可以嵌套，进入内层阶段时暂停外层阶段的计时，各阶段耗时互不重叠，
+    例如在preprocess阶段内调用分词器时，分词耗时只计入tokenize
+    """
+    def __init__(self):
+        """初始化计时器"""
+        self.timings: Dict[str, float] = {}
+        self._stack: List[str] = []
+        self._started: Optional[float] = None
+
+    def add(self, stage: str, seconds: float) -> None:
+        """
+        直接累加某个阶段的耗时，用于分摊批量解码等无法单独计时的情况
+
+        Args:
+            stage: 阶段名称
+            seconds: 耗时（秒）
+        """
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    def _charge(self) -> None:
+        """将当前阶段自上次计时以来的耗时计入该阶段"""
+        now = time.perf_counter()
+        if self._stack:
+            self.add(self._stack[-1], now - self._started)
+        self._started = now
+
+    def start(self, stage: str) -> None:
+        """
+        开始一个阶段，外层阶段暂停计时
+
+        Args:
+            stage: 阶段名称
+        """
+        self._charge()
+        self._stack.append(stage)
+
+    def stop(self) -> None:
+        """结束当前阶段，外层阶段恢复计时"""
+        if not self._stack:
+            return
+        self._charge()
+        self._stack.pop()
+
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        """
+        以上下文管理器的方式对一个阶段计时
+
+        Args:
+            stage: 阶段名称
+        """
+        self.start(stage)
+        try:
+            yield
+        finally:
+            self.stop()
+
+    def merge(self, timings: Dict[str, float], scale: float = 1.0) -> None:
+        """
+        合并其他计时器的各阶段耗时
+
+        Args:
+            timings: 各阶段耗时字典，如另一个计时器的timings或合成结果的stage_timings
+            scale: 耗时的缩放比例，如按batch中的条目数平摊时为1/条目数
+        """
+        for stage, seconds in timings.items():
+            self.add(stage, seconds * scale)
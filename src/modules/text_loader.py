@@ -2,15 +2,84 @@ import os
 import csv
 import json
 import logging
-import pandas as pd
 import re
-from typing import List, Dict, Any, Optional
+import itertools
+from typing import List, Dict, Any, Iterable, Iterator, Optional
 from dataclasses import dataclass
 
+from src.modules.jsonl_index import JsonlIndex, iter_jsonl_records
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# 文本读取和规范化规则的版本，读取结果或特殊符号转换的规则变化时递增，使语料缓存失效
+NORMALIZATION_VERSION = 1
+
+# 特殊符号到中文的转换表
+_SYMBOL_TABLE = str.maketrans({
+    '<': '小于',
+    '＜': '小于',
+    '>': '大于',
+    '＞': '大于',
+    '≤': '小于等于',
+    '≥': '大于等于',
+    '=': '等于',
+    '≠': '不等于',
+    '≈': '约等于',
+    '±': '正负',
+    '×': '乘以',
+    '÷': '除以',
+    '∞': '无穷大',
+    '∑': '求和',
+    '∏': '求积',
+    '∫': '积分',
+    '∂': '偏微分',
+    '∇': '梯度',
+    '√': '平方根',
+    '∛': '立方根',
+    '℃': '摄氏度',
+    '℉': '华氏度',
+    '°': '度',
+    '′': '分',
+    '″': '秒',
+    '％': '百分之',
+    '‰': '千分之',
+    '‱': '万分之'
+})
+
+# 范围表示（如"200-500"）和百分比（如"50%"）一次扫描处理；
+# 范围的第二个数后紧跟百分号时（如"10-20%"）一并转换，与先处理范围再处理百分比的结果相同
+_RANGE_PERCENT_RE = re.compile(r'(\d+)-(\d+)((?:\.\d+)?%)?|(\d+(?:\.\d+)?)%')
+
+# 支持的输入文件扩展名
+SUPPORTED_EXTENSIONS = ('.txt', '.csv', '.xlsx', '.xls', '.json', '.jsonl')
+
+# 按列批量读取CSV和Excel时每批的行数
+DEFAULT_BATCH_ROWS = 10000
+
+_CHINESE_NUMS = {
+    0: '零', 1: '一', 2: '二', 3: '三', 4: '四', 5: '五', 
+    6: '六', 7: '七', 8: '八', 9: '九', 10: '十'
+}
+
+def _percent_to_chinese(num: str) -> str:
+    """将百分比转换为中文，0到10的整数转换为中文数字，其他数字保留阿拉伯数字"""
+    if '.' not in num:
+        num_int = int(num)
+        if num_int in _CHINESE_NUMS:
+            return f"百分之{_CHINESE_NUMS[num_int]}"
+    return f"百分之{num}"
+
+def _replace_range_percent(match: re.Match) -> str:
+    start, end, end_percent, percent = match.groups()
+    if percent is not None:
+        return _percent_to_chinese(percent)
+    if end_percent:
+        # "10-20%" -> "10到百分之二十"，"1-2.5%" -> "1到百分之2.5"
+        return f"{start}到{_percent_to_chinese(end + end_percent[:-1])}"
+    return f"{start}到{end}"
+
 class TextLoader:
     """
     文本文件加载模块，支持多种格式的文本文件加载和解析
@@ -29,91 +98,13 @@ class TextLoader:
         Returns:
             转换后的文本
         """
-        # 定义符号到中文的映射
-        symbol_map = {
-            '<': '小于',
-            '＜': '小于',
-            '>': '大于',
-            '＞': '大于',
-            '≤': '小于等于',
-            '≤': '小于等于',
-            '≥': '大于等于',
-            '≥': '大于等于',
-            '=': '等于',
-            '≠': '不等于',
-            '≠': '不等于',
-            '≈': '约等于',
-            '≈': '约等于',
-            '±': '正负',
-            '±': '正负',
-            '×': '乘以',
-            '×': '乘以',
-            '÷': '除以',
-            '÷': '除以',
-            '∞': '无穷大',
-            '∞': '无穷大',
-            '∑': '求和',
-            '∑': '求和',
-            '∏': '求积',
-            '∏': '求积',
-            '∫': '积分',
-            '∫': '积分',
-            '∂': '偏微分',
-            '∂': '偏微分',
-            '∇': '梯度',
-            '∇': '梯度',
-            '√': '平方根',
-            '√': '平方根',
-            '∛': '立方根',
-            '∛': '立方根',
-            '℃': '摄氏度',
-            '℃': '摄氏度',
-            '℉': '华氏度',
-            '℉': '华氏度',
-            '°': '度',
-            '°': '度',
-            '′': '分',
-            '′': '分',
-            '″': '秒',
-            '″': '秒',
-            '％': '百分之',
-            '％': '百分之',
-            '‰': '千分之',
-            '‰': '千分之',
-            '‱': '万分之',
-            '‱': '万分之'
-        }
-        
-        # 处理范围表示，如 "200-500" -> "200到500"
-        text = re.sub(r'(\d+)-(\d+)', r'\1到\2', text)
+        # 替换特殊符号，转换表预先编译，一次扫描完成
+        text = text.translate(_SYMBOL_TABLE)
         
-        # 替换特殊符号
-        for symbol, replacement in symbol_map.items():
-            text = text.replace(symbol, replacement)
-        
-        # 处理百分比，如 "50%" -> "百分之五十"
-        def replace_percent(match):
-            num = match.group(1)
-            # 如果是整数，尝试转换为中文数字
-            try:
-                if '.' not in num:
-                    # 简单的数字到中文转换，只处理常见情况
-                    num_int = int(num)
-                    chinese_nums = {
-                        0: '零', 1: '一', 2: '二', 3: '三', 4: '四', 5: '五', 
-                        6: '六', 7: '七', 8: '八', 9: '九', 10: '十'
-                    }
-                    if num_int in chinese_nums:
-                        return f"百分之{chinese_nums[num_int]}"
-                    # 对于更大的数字，保留阿拉伯数字
-                    return f"百分之{num}"
-                else:
-                    # 小数情况，保留阿拉伯数字
-                    return f"百分之{num}"
-            except ValueError:
-                return f"百分之{num}"
-        
-        text = re.sub(r'(\d+(?:\.\d+)?)%', replace_percent, text)
+        # 处理范围表示和百分比，如 "200-500" -> "200到500"，"50%" -> "百分之五十"；
+        # 大部分文本不含这两种写法，跳过正则匹配
+        if '-' in text or '%' in text:
+            text = _RANGE_PERCENT_RE.sub(_replace_range_percent, text)
         
         return text
     
@@ -128,25 +119,218 @@ class TextLoader:
         Returns:
             解析后的文本列表，每个元素是一个字典，包含文本和可能的其他信息
         """
+        return list(self.iter_texts(file_path, **kwargs))
+    
+    def iter_texts(self, file_path: str, **kwargs) -> Iterator[Dict[str, Any]]:
+        """
+        逐条读取文本文件，按需解析，不会一次性把整个文件读入内存
+        
+        Args:
+            file_path: 文件路径
+            **kwargs: 其他参数，根据文件类型不同而不同
+            
+        Returns:
+            文本字典的迭代器，字典内容与load_text_file相同
+        """
         # 获取文件扩展名
         file_ext = os.path.splitext(file_path)[1].lower()
         
+        # 只有JSONL文件有字节偏移索引，可以按记录序号定位
+        if file_ext != '.jsonl' and (kwargs.get('start') or kwargs.get('stop') is not None):
+            raise ValueError(f"Record ranges are only supported for JSONL files, got: {file_ext}")
+        
         # 根据文件扩展名选择不同的加载方法
         if file_ext == '.txt':
-            return self._load_txt_file(file_path, **kwargs)
+            return self._iter_txt_file(file_path, **kwargs)
         elif file_ext == '.csv':
-            return self._load_csv_file(file_path, **kwargs)
+            return self._iter_csv_file(file_path, **kwargs)
         elif file_ext in ['.xlsx', '.xls']:
-            return self._load_excel_file(file_path, **kwargs)
+            return self._iter_excel_file(file_path, **kwargs)
         elif file_ext == '.json':
-            return self._load_json_file(file_path, **kwargs)
+            return self._iter_json_file(file_path, **kwargs)
+        elif file_ext == '.jsonl':
+            return self._iter_jsonl_file(file_path, **kwargs)
         else:
             logger.error(f"Unsupported file format: {file_ext}")
             raise ValueError(f"Unsupported file format: {file_ext}")
     
-    def _load_txt_file(self, file_path: str, encoding: str = 'utf-8', **kwargs) -> List[Dict[str, Any]]:
+    def iter_text_batches(self, file_path: str, batch_size: int = DEFAULT_BATCH_ROWS,
+                          **kwargs) -> Iterator[List[Dict[str, Any]]]:
+        """
+        按批读取文本文件，每批产出一个文本字典列表，字典内容与iter_texts相同
+        
+        CSV（pandas分块读取）和xlsx（openpyxl只读模式流式读取）按列处理：去除空白、过滤空文本、
+        转换特殊符号和生成ID都是整列操作，不逐行构造字典；其他格式逐条读取后分批
+        
+        Args:
+            file_path: 文件路径
+            batch_size: 每批的最大行数，默认为10000
+            **kwargs: 其他参数，与iter_texts相同
+            
+        Returns:
+            文本字典列表的迭代器
+        """
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+        file_ext = os.path.splitext(file_path)[1].lower()
+        if file_ext == '.csv':
+            return self._iter_csv_batches(file_path, batch_size, **kwargs)
+        if file_ext == '.xlsx':
+            return self._iter_xlsx_batches(file_path, batch_size, **kwargs)
+        return self._batched(self.iter_texts(file_path, **kwargs), batch_size)
+    
+    @staticmethod
+    def _batched(texts: Iterator[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+        """将逐条产出的文本字典分批"""
+        while True:
+            batch = list(itertools.islice(texts, batch_size))
+            if not batch:
+                return
+            yield batch
+    
+    def _frame_to_texts(self, df, text_column: str, id_column: Optional[str],
+                        file_type: str, excel: bool = False) -> List[Dict[str, Any]]:
+        """
+        将一批行按列转换为文本字典列表
+        
+        Args:
+            df: 一批行（pandas.DataFrame），索引为行号
+            text_column: 文本所在的列名
+            id_column: ID所在的列名，为None时使用行号作为ID
+            file_type: 文件类型名称，用于错误信息
+            excel: 是否按Excel的规则处理，空单元格的文本视为'nan'并过滤，其他列的空值转换为'nan'
+            
+        Returns:
+            文本字典列表
+        """
+        if text_column not in df.columns:
+            raise ValueError(f"Text column '{text_column}' not found in {file_type} file")
+        
+        original = df[text_column]
+        if excel:
+            original = original.where(original.notna(), 'nan')
+        original = original.astype(str).str.strip()
+        keep = original != ''
+        if excel:
+            keep &= original != 'nan'  # 处理空值
+        if not keep.any():
+            return []
+        
+        rows = df[keep]
+        original = original[keep].tolist()
+        # 字典键的顺序与逐行读取相同：text、original_text、id，然后是其他列（同名列覆盖前面的值）；
+        # 各列先转换为Python列表再按行组合，比DataFrame.to_dict逐个单元格装箱快得多
+        columns = {
+            # 转换特殊符号，转换表和正则表达式已预先编译，整列一次完成
+            'text': [self.convert_special_symbols(text) for text in original],
+            'original_text': original  # 保留原始文本
+        }
+        
+        # 设置ID
+        if id_column and id_column in df.columns:
+            columns['id'] = rows[id_column].astype(str).tolist()
+        else:
+            columns['id'] = ('text_' + rows.index.astype(str)).tolist()
+        
+        # 添加其他列的信息
+        for col in df.columns:
+            if col not in [text_column, id_column]:
+                value = rows[col]
+                if excel:
+                    value = value.astype(object).where(value.notna(), 'nan')
+                columns[col] = value.tolist()
+        
+        keys = list(columns)
+        return [dict(zip(keys, values)) for values in zip(*columns.values())]
+    
+    def _iter_csv_batches(self, file_path: str, batch_size: int, text_column: str = 'text',
+                          id_column: Optional[str] = None, encoding: str = 'utf-8',
+                          **kwargs) -> Iterator[List[Dict[str, Any]]]:
+        """
+        用pandas分块读取CSV文件，所有列按字符串读取，与逐行读取的结果一致
+        
+        Args:
+            file_path: 文件路径
+            batch_size: 每批的最大行数
+            text_column: 文本所在的列名，默认为'text'
+            id_column: ID所在的列名，默认为None（使用行号作为ID）
+            encoding: 文件编码，默认为'utf-8'
+            **kwargs: 其他参数
+            
+        Returns:
+            文本字典列表的迭代器
+        """
+        import pandas as pd
+        
+        logger.info(f"Loading CSV file in batches: {file_path}")
+        count = 0
+        try:
+            chunks = pd.read_csv(file_path, chunksize=batch_size, dtype=str, keep_default_na=False,
+                                 encoding=encoding)
+            for chunk in chunks:
+                texts = self._frame_to_texts(chunk, text_column, id_column, 'CSV')
+                if texts:
+                    count += len(texts)
+                    yield texts
+            logger.info(f"Loaded {count} texts from CSV file")
+        except Exception as e:
+            logger.error(f"Failed to load CSV file: {str(e)}")
+            raise
+    
+    def _iter_xlsx_batches(self, file_path: str, batch_size: int, sheet_name: Any = 0,
+                           text_column: str = 'text', id_column: Optional[str] = None,
+                           **kwargs) -> Iterator[List[Dict[str, Any]]]:
+        """
+        用openpyxl只读模式流式读取xlsx文件，不把整个工作表读入内存
+        
+        Args:
+            file_path: 文件路径
+            batch_size: 每批的最大行数
+            sheet_name: 工作表名称或索引，默认为0（第一个工作表）
+            text_column: 文本所在的列名，默认为'text'
+            id_column: ID所在的列名，默认为None（使用行号作为ID）
+            **kwargs: 其他参数
+            
+        Returns:
+            文本字典列表的迭代器
+        """
+        import pandas as pd
+        from openpyxl import load_workbook
+        
+        logger.info(f"Loading Excel file in batches: {file_path}")
+        count = 0
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            sheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+            rows = sheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                raise ValueError(f"Text column '{text_column}' not found in Excel file")
+            # 与pandas.read_excel相同，没有列名的列命名为"Unnamed: <序号>"
+            columns = [name if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)]
+            
+            start = 0
+            while True:
+                batch = list(itertools.islice(rows, batch_size))
+                if not batch:
+                    break
+                df = pd.DataFrame.from_records(batch, columns=columns,
+                                               index=pd.RangeIndex(start, start + len(batch)))
+                start += len(batch)
+                texts = self._frame_to_texts(df, text_column, id_column, 'Excel', excel=True)
+                if texts:
+                    count += len(texts)
+                    yield texts
+            logger.info(f"Loaded {count} texts from Excel file")
+        except Exception as e:
+            logger.error(f"Failed to load Excel file: {str(e)}")
+            raise
+        finally:
+            workbook.close()
+    
+    def _iter_txt_file(self, file_path: str, encoding: str = 'utf-8', **kwargs) -> Iterator[Dict[str, Any]]:
         """
-        加载TXT文件
+        逐行读取TXT文件
         
         Args:
             file_path: 文件路径
@@ -154,10 +338,10 @@ class TextLoader:
             **kwargs: 其他参数
             
         Returns:
-            解析后的文本列表
+            文本字典的迭代器
         """
         logger.info(f"Loading TXT file: {file_path}")
-        texts = []
+        count = 0
         try:
             with open(file_path, 'r', encoding=encoding) as f:
                 file_name = os.path.splitext(os.path.basename(file_path))[0]
@@ -166,21 +350,21 @@ class TextLoader:
                     if line:
                         # 转换特殊符号
                         processed_line = self.convert_special_symbols(line)
-                        texts.append({
+                        count += 1
+                        yield {
                             'id': f'{file_name}_{idx}',
                             'text': processed_line,
                             'original_text': line  # 保留原始文本
-                        })
-            logger.info(f"Loaded {len(texts)} texts from TXT file")
-            return texts
+                        }
+            logger.info(f"Loaded {count} texts from TXT file")
         except Exception as e:
             logger.error(f"Failed to load TXT file: {str(e)}")
             raise
     
-    def _load_csv_file(self, file_path: str, text_column: str = 'text', id_column: Optional[str] = None, 
-                      encoding: str = 'utf-8', **kwargs) -> List[Dict[str, Any]]:
+    def _iter_csv_file(self, file_path: str, text_column: str = 'text', id_column: Optional[str] = None, 
+                       encoding: str = 'utf-8', **kwargs) -> Iterator[Dict[str, Any]]:
         """
-        加载CSV文件
+        逐行读取CSV文件
         
         Args:
             file_path: 文件路径
@@ -190,10 +374,10 @@ class TextLoader:
             **kwargs: 其他参数
             
         Returns:
-            解析后的文本列表
+            文本字典的迭代器
         """
         logger.info(f"Loading CSV file: {file_path}")
-        texts = []
+        count = 0
         try:
             with open(file_path, 'r', encoding=encoding, newline='') as f:
                 reader = csv.DictReader(f)
@@ -221,17 +405,17 @@ class TextLoader:
                             if key not in [text_column, id_column]:
                                 text_dict[key] = value
                         
-                        texts.append(text_dict)
-            logger.info(f"Loaded {len(texts)} texts from CSV file")
-            return texts
+                        count += 1
+                        yield text_dict
+            logger.info(f"Loaded {count} texts from CSV file")
         except Exception as e:
             logger.error(f"Failed to load CSV file: {str(e)}")
             raise
     
-    def _load_excel_file(self, file_path: str, sheet_name: str = 0, text_column: str = 'text', 
-                        id_column: Optional[str] = None, **kwargs) -> List[Dict[str, Any]]:
+    def _iter_excel_file(self, file_path: str, sheet_name: str = 0, text_column: str = 'text', 
+                         id_column: Optional[str] = None, **kwargs) -> Iterator[Dict[str, Any]]:
         """
-        加载Excel文件
+        读取Excel文件，工作表由pandas一次读入，行数据逐条转换
         
         Args:
             file_path: 文件路径
@@ -241,11 +425,14 @@ class TextLoader:
             **kwargs: 其他参数
             
         Returns:
-            解析后的文本列表
+            文本字典的迭代器
         """
         logger.info(f"Loading Excel file: {file_path}")
-        texts = []
+        count = 0
         try:
+            # pandas导入较慢，只在读取Excel时导入
+            import pandas as pd
+            
             # 读取Excel文件
             df = pd.read_excel(file_path, sheet_name=sheet_name)
             
@@ -279,18 +466,125 @@ class TextLoader:
                                 value = value.item()
                             text_dict[col] = str(value) if pd.isna(value) else value
                     
-                    texts.append(text_dict)
+                    count += 1
+                    yield text_dict
             
-            logger.info(f"Loaded {len(texts)} texts from Excel file")
-            return texts
+            logger.info(f"Loaded {count} texts from Excel file")
         except Exception as e:
             logger.error(f"Failed to load Excel file: {str(e)}")
             raise
     
-    def _load_json_file(self, file_path: str, text_key: str = 'text', id_key: Optional[str] = None, 
-                       encoding: str = 'utf-8', **kwargs) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _iter_json_items(f, chunk_size: int = 1 << 16) -> Iterator[Any]:
+        """
+        逐个解析JSON文件中的项目：顶层为数组时增量解析，每次只在内存中保留一个数据块；
+        顶层为对象时整体解析，有'items'数组时返回其中的项目，否则将对象作为单个项目
+        
+        Args:
+            f: 以文本模式打开的文件对象
+            chunk_size: 每次读取的字符数，默认为64K
+            
+        Returns:
+            项目迭代器
+        """
+        decoder = json.JSONDecoder()
+        buffer = f.read(chunk_size)
+        pos = len(buffer) - len(buffer.lstrip())
+        if buffer[pos:pos + 1] != '[':
+            # 顶层不是数组，整体解析
+            f.seek(0)
+            data = json.load(f)
+            if isinstance(data, dict):
+                # 如果是字典，尝试将其转换为列表
+                if 'items' in data and isinstance(data['items'], list):
+                    data = data['items']
+                else:
+                    # 否则，将字典作为单个项目处理
+                    data = [data]
+            if not isinstance(data, list):
+                raise ValueError(f"JSON data must be a list or contain a 'items' list")
+            yield from data
+            return
+        
+        pos += 1
+        while True:
+            # 跳过空白和分隔符，缓冲区用完时读取下一个数据块
+            while True:
+                while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                    pos += 1
+                if pos < len(buffer):
+                    break
+                buffer, pos = f.read(chunk_size), 0
+                if not buffer:
+                    raise ValueError("Unterminated JSON array")
+            if buffer[pos] == ']':
+                return
+            
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+                # 数字等标量可能被数据块截断（如"1.5"只读到"1."），后面必须是分隔符才算完整
+                complete = end < len(buffer) and buffer[end] in ' \t\r\n,]'
+            except json.JSONDecodeError:
+                complete = False
+            if not complete:
+                # 项目跨越数据块边界，读取更多数据后重新解析
+                chunk = f.read(max(chunk_size, len(buffer) - pos))
+                if chunk:
+                    buffer, pos = buffer[pos:] + chunk, 0
+                    continue
+                item, end = decoder.raw_decode(buffer, pos)
+            
+            yield item
+            pos = end
+    
+    def _json_item_to_text(self, item: Any, idx: int, text_key: str = 'text',
+                           id_key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        将JSON或JSONL中的一个项目转换为文本字典
+        
+        Args:
+            item: 解析后的项目
+            idx: 项目序号，未指定ID键时用于生成ID
+            text_key: 文本所在的键名，默认为'text'
+            id_key: ID所在的键名，默认为None（使用序号作为ID）
+            
+        Returns:
+            文本字典，项目不是字典、没有文本或文本为空时返回None
+        """
+        if not isinstance(item, dict):
+            return None  # 跳过非字典项
+        
+        if text_key not in item:
+            return None  # 跳过没有文本键的项
+        
+        text = str(item[text_key]).strip()
+        if not text or text == 'nan':
+            return None
+        
+        # 转换特殊符号
+        processed_text = self.convert_special_symbols(text)
+        text_dict = {
+            'text': processed_text,
+            'original_text': text  # 保留原始文本
+        }
+        
+        # 设置ID
+        if id_key and id_key in item:
+            text_dict['id'] = str(item[id_key])
+        else:
+            text_dict['id'] = f'text_{idx}'
+        
+        # 添加其他键的信息
+        for key, value in item.items():
+            if key not in [text_key, id_key]:
+                text_dict[key] = value
+        
+        return text_dict
+    
+    def _iter_json_file(self, file_path: str, text_key: str = 'text', id_key: Optional[str] = None, 
+                        encoding: str = 'utf-8', **kwargs) -> Iterator[Dict[str, Any]]:
         """
-        加载JSON文件
+        逐项读取JSON文件
         
         Args:
             file_path: 文件路径
@@ -300,62 +594,71 @@ class TextLoader:
             **kwargs: 其他参数
             
         Returns:
-            解析后的文本列表
+            文本字典的迭代器
         """
         logger.info(f"Loading JSON file: {file_path}")
-        texts = []
+        count = 0
         try:
             with open(file_path, 'r', encoding=encoding) as f:
-                data = json.load(f)
-                
-                # 检查数据格式
-                if isinstance(data, dict):
-                    # 如果是字典，尝试将其转换为列表
-                    if 'items' in data and isinstance(data['items'], list):
-                        data = data['items']
-                    else:
-                        # 否则，将字典作为单个项目处理
-                        data = [data]
-                
-                if not isinstance(data, list):
-                    raise ValueError(f"JSON data must be a list or contain a 'items' list")
-                
                 # 处理每个项目
-                for idx, item in enumerate(data):
-                    if not isinstance(item, dict):
-                        continue  # 跳过非字典项
-                    
-                    if text_key not in item:
-                        continue  # 跳過没有文本键的项
-                    
-                    text = str(item[text_key]).strip()
-                    if text and text != 'nan':
-                        # 转换特殊符号
-                        processed_text = self.convert_special_symbols(text)
-                        text_dict = {
-                            'text': processed_text,
-                            'original_text': text  # 保留原始文本
-                        }
-                        
-                        # 设置ID
-                        if id_key and id_key in item:
-                            text_dict['id'] = str(item[id_key])
-                        else:
-                            text_dict['id'] = f'text_{idx}'
-                        
-                        # 添加其他键的信息
-                        for key, value in item.items():
-                            if key not in [text_key, id_key]:
-                                text_dict[key] = value
-                        
-                        texts.append(text_dict)
+                for idx, item in enumerate(self._iter_json_items(f)):
+                    text_dict = self._json_item_to_text(item, idx, text_key, id_key)
+                    if text_dict is not None:
+                        count += 1
+                        yield text_dict
             
-            logger.info(f"Loaded {len(texts)} texts from JSON file")
-            return texts
+            logger.info(f"Loaded {count} texts from JSON file")
         except Exception as e:
             logger.error(f"Failed to load JSON file: {str(e)}")
             raise
     
+    def _iter_jsonl_file(self, file_path: str, text_key: str = 'text', id_key: Optional[str] = None,
+                         encoding: str = 'utf-8', start: int = 0, stop: Optional[int] = None,
+                         **kwargs) -> Iterator[Dict[str, Any]]:
+        """
+        逐行读取JSONL文件，每个非空行是一条记录
+        
+        指定start或stop时通过字节偏移索引（<文件名>.idx，不存在或过期时自动重建）直接定位到起始记录，
+        用于把大文件按记录范围分给多个进程，或从中间续跑；记录序号即非空行序号，未指定ID键时生成的ID与是否指定范围无关
+        
+        Args:
+            file_path: 文件路径
+            text_key: 文本所在的键名，默认为'text'
+            id_key: ID所在的键名，默认为None（使用记录序号作为ID）
+            encoding: 文件编码，默认为'utf-8'
+            start: 起始记录序号，默认为0
+            stop: 结束记录序号（不包含），默认为None（读到文件结尾）
+            **kwargs: 其他参数
+            
+        Returns:
+            文本字典的迭代器
+        """
+        logger.info(f"Loading JSONL file: {file_path}")
+        count = 0
+        try:
+            if start or stop is not None:
+                records = JsonlIndex(file_path).iter_records(start, stop, encoding=encoding)
+            else:
+                # 从头读取时不需要索引
+                records = self._iter_jsonl_from_start(file_path, encoding)
+            
+            for idx, item in records:
+                text_dict = self._json_item_to_text(item, idx, text_key, id_key)
+                if text_dict is not None:
+                    count += 1
+                    yield text_dict
+            
+            logger.info(f"Loaded {count} texts from JSONL file")
+        except Exception as e:
+            logger.error(f"Failed to load JSONL file: {str(e)}")
+            raise
+    
+    @staticmethod
+    def _iter_jsonl_from_start(file_path: str, encoding: str) -> Iterator[Any]:
+        """从头逐行读取JSONL记录，产出(记录序号, 解析后的对象)"""
+        with open(file_path, 'rb') as f:
+            yield from iter_jsonl_records(f, encoding=encoding)
+    
     def convert_to_tts_inputs(self, texts: List[Dict[str, Any]], output_dir: str, 
                              speaker_wav: Optional[str] = None, 
                              language: str = 'zh-cn', 
@@ -374,14 +677,33 @@ class TextLoader:
             TTS输入列表
         """
         logger.info(f"Converting {len(texts)} texts to TTS inputs")
+        tts_inputs = list(self.iter_tts_inputs(texts, output_dir, speaker_wav, language, model_name))
+        logger.info(f"Converted {len(texts)} texts to TTS inputs successfully")
+        return tts_inputs
+    
+    def iter_tts_inputs(self, texts: Iterable[Dict[str, Any]], output_dir: str, 
+                        speaker_wav: Optional[str] = None, 
+                        language: str = 'zh-cn', 
+                        model_name: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        逐条将文本转换为TTS输入格式，可直接消费iter_texts的结果
         
+        Args:
+            texts: 文本字典的可迭代对象
+            output_dir: 输出目录
+            speaker_wav: 音色参考音频文件路径
+            language: 语言代码
+            model_name: 模型名称
+            
+        Returns:
+            TTS输入的迭代器
+        """
         # 确保输出目录存在
         os.makedirs(output_dir, exist_ok=True)
         
-        tts_inputs = []
-        for text_info in texts:
+        for idx, text_info in enumerate(texts):
             # 生成输出文件路径
-            text_id = text_info.get('id', f"text_{len(tts_inputs)}")
+            text_id = text_info.get('id', f"text_{idx}")
             output_path = os.path.join(output_dir, f"{text_id}.wav")
             
             # 创建TTS输入
@@ -397,10 +719,7 @@ class TextLoader:
             if speaker_wav:
                 tts_input['speaker_wav'] = speaker_wav
             
-            tts_inputs.append(tts_input)
-        
-        logger.info(f"Converted {len(texts)} texts to TTS inputs successfully")
-        return tts_inputs
+            yield tts_input
 
 # 示例用法
 if __name__ == "__main__":
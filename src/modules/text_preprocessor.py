@@ -0,0 +1,251 @@
+import re
+import logging
+import unicodedata
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+from src.modules.stage_timer import StageTimer
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 支持的中文预处理方式
+# bert: 使用bert-base-chinese分词器切分文本，需要加载transformers和分词器
+# regex: 使用预编译正则表达式按BERT的基本分词规则切分文本，不需要分词器，结果与bert相同
+#        （除了分词器会拆分成子词或标为[UNK]的词，见RegexPreprocessor）
+PREPROCESSORS = ('bert', 'regex')
+
+# 预处理规则的版本，组合或规范化规则变化时递增，使语料缓存失效
+PREPROCESSING_VERSION = 1
+
+# 分词器的特殊标记，重建文本时跳过
+_SPECIAL_TOKENS = {'[UNK]', '[CLS]', '[SEP]', '[PAD]', '[MASK]'}
+
+# BERT分词器单独切分的CJK字符区间
+_CJK_RANGES = [
+    (0x4E00, 0x9FFF), (0x3400, 0x4DBF), (0x20000, 0x2A6DF), (0x2A700, 0x2B73F),
+    (0x2B740, 0x2B81F), (0x2B820, 0x2CEAF), (0xF900, 0xFAFF), (0x2F800, 0x2FA1F)
+]
+
+# BERT分词器单个词的最大长度，更长的词整体标为[UNK]
+_MAX_WORD_CHARS = 100
+
+# 重建文本时各类词的处理方式
+_SKIP, _PUNCTUATION, _PADDED, _PLAIN = range(4)
+
+@lru_cache(maxsize=65536)
+def _token_kind(token: str) -> int:
+    """判断词的处理方式，语料中的词（尤其是单个汉字）大量重复，结果缓存"""
+    # 处理特殊字符和标点符号
+    if token in _SPECIAL_TOKENS:
+        return _SKIP
+    # 标点符号前添加空格
+    if any(p in token for p in ',.!?;:"'):
+        return _PUNCTUATION
+    # 英文字母和数字前后添加空格
+    if any(c.isalnum() and not '\u4e00' <= c <= '\u9fff' for c in token):
+        return _PADDED
+    return _PLAIN
+
+def _rstrip_parts(parts: List[str]) -> None:
+    """去掉已组合部分末尾的空白，相当于对拼接后的字符串调用rstrip"""
+    while parts:
+        stripped = parts[-1].rstrip()
+        if stripped:
+            parts[-1] = stripped
+            return
+        parts.pop()
+
+def _join_tokens(tokens: List[str]) -> str:
+    """
+    将分词结果重新组合成文本，英文字母和数字前后添加空格
+
+    Args:
+        tokens: 分词结果
+
+    Returns:
+        组合后的文本
+    """
+    parts = []
+    for token in tokens:
+        kind = _token_kind(token)
+        if kind == _PLAIN:
+            parts.append(token)
+        elif kind == _PADDED:
+            parts.append(' ' + token + ' ')
+        elif kind == _PUNCTUATION:
+            # 处理中文标点
+            for char in token:
+                if char in '，。！？；："':
+                    _rstrip_parts(parts)
+                    parts.append(char + ' ')
+                else:
+                    parts.append(char)
+    return ''.join(parts)
+
+# 标点替换和空格规范化使用的正则表达式
+_ALNUM_RE = re.compile(r'([a-zA-Z]+|\d+)')
+_SPACES_RE = re.compile(r'\s+')
+_PUNCTUATION_TABLE = str.maketrans({'，': ', ', '。': '. ', '！': '! ', '？': '? ', '；': '; ', '：': ': '})
+
+def _normalize(text: str) -> str:
+    """将中文标点转换为英文标点，英文字母和数字前后添加空格，并清理多余的空格"""
+    text = text.translate(_PUNCTUATION_TABLE)
+    # 字母和数字的连续片段互不重叠，一次替换与先处理字母再处理数字的结果相同
+    text = _ALNUM_RE.sub(r' \1 ', text)
+    return _SPACES_RE.sub(' ', text).strip()
+
+class ChinesePreprocessor:
+    """
+    中文文本预处理：切分文本、重新组合并规范标点和空格，解决断句问题
+
+    子类实现tokenize，组合和规范化的规则对所有预处理方式相同
+    """
+    name = None
+
+    def tokenize(self, text: str) -> Optional[List[str]]:
+        """
+        切分文本
+
+        Args:
+            text: 原始文本
+
+        Returns:
+            分词结果，无法分词时返回None（跳过组合，只做规范化）
+        """
+        raise NotImplementedError
+
+    def preprocess(self, text: str, timer: Optional[StageTimer] = None) -> str:
+        """
+        预处理文本
+
+        Args:
+            text: 原始文本
+            timer: 分阶段计时器，分词耗时计入tokenize阶段，默认为None
+
+        Returns:
+            预处理后的文本
+        """
+        if not text:
+            return text
+
+        timer = timer or StageTimer()
+        processed_text = text
+        try:
+            with timer.stage('tokenize'):
+                tokens = self.tokenize(text)
+            if tokens is not None:
+                processed_text = _join_tokens(tokens)
+        except Exception as e:
+            # 分词失败时只做规范化
+            logger.warning(f"Failed to tokenize text with {self.name} preprocessor: {str(e)}")
+
+        processed_text = _normalize(processed_text)
+        # 每行都会调用，使用延迟格式化，未开启debug日志时不拼接字符串
+        logger.debug("Text preprocessing: '%s' -> '%s'", text, processed_text)
+        return processed_text
+
+class BertPreprocessor(ChinesePreprocessor):
+    """使用bert-base-chinese分词器切分文本"""
+    name = 'bert'
+
+    def __init__(self, get_tokenizer: Callable):
+        """
+        初始化BERT预处理器，立即加载分词器
+
+        Args:
+            get_tokenizer: 返回分词器的函数，如ModelManager.get_chinese_tokenizer
+        """
+        self.tokenizer = get_tokenizer()
+
+    def tokenize(self, text: str) -> Optional[List[str]]:
+        if self.tokenizer is None:
+            return None
+        return self.tokenizer.tokenize(text)
+
+def _ranges_to_class(ranges) -> str:
+    """将码位区间转换为正则表达式字符类的内容"""
+    return ''.join(
+        re.escape(chr(start)) if start == end else f"{re.escape(chr(start))}-{re.escape(chr(end))}"
+        for start, end in ranges
+    )
+
+def _to_ranges(codepoints: List[int]) -> List[Tuple[int, int]]:
+    """将有序的码位列表压缩成连续区间"""
+    ranges = []
+    for cp in codepoints:
+        if ranges and ranges[-1][1] == cp - 1:
+            ranges[-1] = (ranges[-1][0], cp)
+        else:
+            ranges.append((cp, cp))
+    return ranges
+
+def _is_ascii_punctuation(cp: int) -> bool:
+    """BERT分词器把ASCII中的非字母数字符号都当作标点"""
+    return 33 <= cp <= 47 or 58 <= cp <= 64 or 91 <= cp <= 96 or 123 <= cp <= 126
+
+@lru_cache(maxsize=None)
+def _compiled_patterns():
+    """
+    首次使用时按BERT分词器的字符分类规则构建正则表达式，扫描基本多文种平面的字符类别约需几十毫秒
+
+    Returns:
+        (删除字符的正则表达式, 分词的正则表达式)元组
+    """
+    punctuation, whitespace, removed = [], [], []
+    for cp in range(0x10000):
+        category = unicodedata.category(chr(cp))
+        if _is_ascii_punctuation(cp) or category.startswith('P'):
+            punctuation.append(cp)
+        elif cp in (0x20, 0x09, 0x0A, 0x0D) or category == 'Zs':
+            whitespace.append(cp)
+        elif cp == 0xFFFD or category.startswith('C') or category == 'Mn':
+            # 清理文本时删除的控制字符和替换字符，以及去除重音时删除的组合附加符号
+            removed.append(cp)
+    # 辅助平面只处理私用区，其余辅助平面字符在语料中基本不会出现
+    removed_ranges = _to_ranges(removed) + [(0xF0000, 0x10FFFF)]
+
+    cjk = _ranges_to_class(_CJK_RANGES)
+    punctuation = _ranges_to_class(_to_ranges(punctuation))
+    whitespace = _ranges_to_class(_to_ranges(whitespace))
+    removed_re = re.compile(f"[{_ranges_to_class(removed_ranges)}]+")
+    token_re = re.compile(f"[{cjk}]|[{punctuation}]|[^{cjk}{punctuation}{whitespace}]+")
+    return removed_re, token_re
+
+class RegexPreprocessor(ChinesePreprocessor):
+    """
+    使用预编译正则表达式按BERT的基本分词规则切分文本，不需要加载transformers和分词器
+
+    与BERT分词器相同：删除控制字符、转小写并去除重音，CJK字符和标点单独成词，其余按空白切分。
+    不同的是不做WordPiece切分：分词器会把词表外的词拆成带##前缀的子词（如"testing"拆成"test"和"##ing"），
+    或把无法切分的字符标为[UNK]后被丢弃，这两种情况正则分词保留原词，输出与BERT不同
+    """
+    name = 'regex'
+
+    def tokenize(self, text: str) -> List[str]:
+        removed_re, token_re = _compiled_patterns()
+        text = text.lower()
+        if not text.isascii():
+            text = unicodedata.normalize('NFD', text)
+        text = removed_re.sub('', text)
+        return [token for token in token_re.findall(text) if len(token) <= _MAX_WORD_CHARS]
+
+def create_preprocessor(name: str, model_manager=None) -> ChinesePreprocessor:
+    """
+    创建中文预处理器
+
+    Args:
+        name: 预处理方式，'bert'或'regex'
+        model_manager: 模型管理器实例，'bert'方式从中获取分词器
+
+    Returns:
+        预处理器实例
+    """
+    if name == 'bert':
+        if model_manager is None:
+            raise ValueError("The bert preprocessor requires a model manager")
+        return BertPreprocessor(model_manager.get_chinese_tokenizer)
+    if name == 'regex':
+        return RegexPreprocessor()
+    raise ValueError(f"Unsupported preprocessor: {name}, expected one of {PREPROCESSORS}")
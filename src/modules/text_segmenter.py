@@ -0,0 +1,147 @@
+import re
+import logging
+from typing import Callable, List, Optional
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 句末标点后可能跟随的右引号和右括号
+_CLOSING = r'[”’"\'」』）)\]】》]*'
+
+# 句子边界：中英文句末标点，英文句号只在后面是空白或文本结尾时断句（避免切开"3.14"），以及换行；
+# 边界应在原始文本上查找，预处理会在数字和标点两侧加空格（"3.14"变为"3 . 14"）
+_SENTENCE_END_RE = re.compile(rf'[。！？；!?;…]+{_CLOSING}|\.+(?=\s|$){_CLOSING}|\n')
+
+# 分句边界：句子超出预算时再按逗号、顿号、冒号和破折号切分，英文逗号和冒号后面是数字时不切分（"3,000"、"10:30"）
+_CLAUSE_END_RE = re.compile(rf'[，、：—]+{_CLOSING}|[,:]+(?!\d){_CLOSING}')
+
+# 句号前的单词是缩写时不断句，单个字母加句号的缩写（"U.S."、"e.g."）另外判断
+_ABBREVIATIONS = frozenset({
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'vs', 'etc', 'inc', 'ltd', 'co', 'corp',
+    'no', 'fig', 'vol', 'approx', 'dept', 'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep',
+    'sept', 'oct', 'nov', 'dec'
+})
+_LAST_WORD_RE = re.compile(r'([A-Za-z]+(?:\.[A-Za-z]+)*)$')
+_INITIALS_RE = re.compile(r'[A-Za-z](?:\.[A-Za-z])*')
+
+# XTTS未给出语言的字符上限时使用的预算
+DEFAULT_MAX_TOKENS = 250
+
+def _is_abbreviation(text: str, match: re.Match) -> bool:
+    """判断英文句号的匹配是否是缩写的一部分"""
+    if not match.group().startswith('.') or text.startswith('..', match.start()):
+        return False
+    word = _LAST_WORD_RE.search(text, 0, match.start())
+    if word is None:
+        return False
+    word = word.group(1)
+    return word.lower() in _ABBREVIATIONS or _INITIALS_RE.fullmatch(word) is not None
+
+def _split_after(pattern: re.Pattern, text: str) -> List[str]:
+    """在每个匹配之后切分文本，去掉首尾空白和空片段"""
+    pieces = []
+    start = 0
+    for match in pattern.finditer(text):
+        if pattern is _SENTENCE_END_RE and _is_abbreviation(text, match):
+            continue
+        piece = text[start:match.end()].strip()
+        if piece:
+            pieces.append(piece)
+        start = match.end()
+    tail = text[start:].strip()
+    if tail:
+        pieces.append(tail)
+    return pieces
+
+class TextSegmenter:
+    """
+    长文本分段器：按中英文标点切分句子，再将相邻的句子合并为不超过token预算的片段
+
+    超出预算的句子先按逗号等分句标点切分，仍然超出时在预算处（尽量在空白处）强制切开；
+    指定预处理函数时在原始文本上查找句子和分句边界，每个句子预处理后再按预处理结果计算预算
+    """
+    def __init__(self, max_tokens: int = DEFAULT_MAX_TOKENS, count_tokens: Optional[Callable[[str], int]] = None):
+        """
+        初始化分段器
+
+        Args:
+            max_tokens: 每个片段的最大token数，默认为250
+            count_tokens: 计算文本token数的函数，默认为None（按字符数计算，与XTTS的字符上限一致）
+        """
+        if max_tokens < 1:
+            raise ValueError("Max tokens must be at least 1")
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens or len
+
+    def split_sentences(self, text: str) -> List[str]:
+        """
+        按句末标点和换行切分句子
+
+        Args:
+            text: 原始文本
+
+        Returns:
+            句子列表
+        """
+        return _split_after(_SENTENCE_END_RE, text)
+
+    def _fits(self, text: str) -> bool:
+        return self.count_tokens(text) <= self.max_tokens
+
+    def _hard_split(self, text: str) -> List[str]:
+        """在预算处强制切开文本，切点尽量选在空白处，避免切断英文单词"""
+        pieces = []
+        while text and not self._fits(text):
+            end = min(len(text), self.max_tokens)
+            while end > 1 and not self._fits(text[:end]):
+                end -= 1
+            space = text.rfind(' ', 0, end)
+            if space > 0:
+                end = space
+            pieces.append(text[:end].strip())
+            text = text[end:].strip()
+        if text:
+            pieces.append(text)
+        return pieces
+
+    def _fit_sentence(self, sentence: str, preprocess: Callable[[str], str]) -> List[str]:
+        """将句子预处理，超出预算时按原始文本的分句边界切分后分别预处理，仍然超出时强制切开"""
+        processed = preprocess(sentence)
+        if self._fits(processed):
+            return [processed] if processed else []
+        pieces = []
+        for clause in _split_after(_CLAUSE_END_RE, sentence):
+            processed = preprocess(clause)
+            if processed:
+                pieces.extend([processed] if self._fits(processed) else self._hard_split(processed))
+        return pieces
+
+    def split(self, text: str, preprocess: Optional[Callable[[str], str]] = None) -> List[str]:
+        """
+        将文本切分为不超过token预算的片段
+
+        Args:
+            text: 原始文本
+            preprocess: 预处理函数，对每个句子（超出预算时对每个分句）调用，片段由预处理结果组成，
+                        默认为None（不预处理）
+
+        Returns:
+            片段列表，按原文顺序
+        """
+        preprocess = preprocess or (lambda piece: piece)
+        segments = []
+        current = ''
+        for sentence in self.split_sentences(text):
+            for piece in self._fit_sentence(sentence, preprocess):
+                candidate = f"{current} {piece}" if current else piece
+                if current and not self._fits(candidate):
+                    segments.append(current)
+                    current = piece
+                else:
+                    current = candidate
+        if current:
+            segments.append(current)
+
+        logger.debug(f"Split text of {len(text)} characters into {len(segments)} segments")
+        return segments
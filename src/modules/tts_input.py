@@ -12,8 +12,8 @@ class TTSInput:
     # 音色参考音频文件路径
     speaker_wav: str
     
-    # 输出文件路径
-    output_path: str
+    # 输出文件路径，为None时只在内存中合成
+    output_path: Optional[str]
     
     # 语言代码，默认为中文
     language: str = "zh-cn"
@@ -27,6 +27,18 @@ class TTSInput:
     # 其他可选参数，用于扩展
     additional_params: Dict[str, Any] = field(default_factory=dict)
     
+    # 已预处理的文本（如语料缓存中的结果），不为None时合成时跳过中文预处理
+    processed_text: Optional[str] = None
+    
+    # 文本来源的输入文件路径，写入meta文件，便于多文件任务追溯
+    source_file: Optional[str] = None
+    
+    # 条目ID（多个输入文件时带文件子目录前缀），用于分片和合并分片的meta文件
+    item_id: Optional[str] = None
+    
+    # 条目在输入（分片前）中的序号，用于合并分片的meta文件时恢复输入顺序
+    input_index: Optional[int] = None
+    
     def __post_init__(self):
         """初始化后的验证和处理"""
         # 验证文本不为空
@@ -37,7 +49,7 @@ class TTSInput:
         if not self.speaker_wav:
             raise ValueError("Speaker wav file path cannot be empty")
         
-        if not self.output_path:
+        if self.output_path is not None and not self.output_path:
             raise ValueError("Output file path cannot be empty")
 
 @dataclass
@@ -51,6 +63,9 @@ class TTSBatchInput:
     # 批处理的最大并发数，默认为1（不并行）
     max_concurrency: int = 1
     
+    # 批量解码时每个batch的最大句子数，默认为1（逐条解码）
+    batch_size: int = 1
+    
     def __post_init__(self):
         """初始化后的验证和处理"""
         if not self.inputs:
@@ -58,6 +73,9 @@ class TTSBatchInput:
         
         if self.max_concurrency < 1:
             raise ValueError("Max concurrency must be at least 1")
+        
+        if self.batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
 
 @dataclass
 class TTSSynthesisResult:
@@ -78,6 +96,44 @@ class TTSSynthesisResult:
     
     # 处理时间（秒）
     processing_time: Optional[float] = None
+    
+    # 合成的波形数据（numpy数组），仅在内存合成时保留
+    audio: Optional[Any] = None
+    
+    # 波形数据的采样率
+    sample_rate: Optional[int] = None
+    
+    # 是否命中合成结果缓存
+    cached: bool = False
+    
+    # 各阶段耗时（秒），键为stage_timer.STAGES中的阶段名称
+    stage_timings: Dict[str, float] = field(default_factory=dict)
+    
+    # 输出音频时长（秒）
+    audio_duration: Optional[float] = None
+    
+    # 实时率（处理时间/音频时长），小于1表示比实时更快
+    rtf: Optional[float] = None
+
+@dataclass
+class TTSStreamChunk:
+    """
+    流式合成产出的音频片段
+    """
+    # 音频波形数据（numpy数组）
+    audio: Any
+    
+    # 采样率
+    sample_rate: int
+    
+    # 片段序号，从0开始
+    index: int
+    
+    # 片段所属句子的序号
+    sentence_index: int = 0
+    
+    # 从请求开始到产出该片段所经过的时间（秒），index为0时即首包延迟
+    elapsed: Optional[float] = None
 
 @dataclass
 class TTSBatchResult:
@@ -261,8 +261,26 @@ class VoiceLibrary:
         self.available_prompts = self._get_available_prompts()
         logger.info(f"Voice library refreshed with {len(self.available_prompts)} available prompts")
 
-# 创建全局音色库实例，方便应用程序使用
-voice_library = VoiceLibrary()
+# 全局音色库实例，首次使用时才创建，避免导入模块时扫描音色目录
+_voice_library: Optional[VoiceLibrary] = None
+
+def get_voice_library() -> VoiceLibrary:
+    """
+    获取全局音色库实例，首次调用时加载
+    
+    Returns:
+        全局音色库实例
+    """
+    global _voice_library
+    if _voice_library is None:
+        _voice_library = VoiceLibrary()
+    return _voice_library
+
+def __getattr__(name: str):
+    """兼容旧的`voice_library`全局变量，访问时才创建实例"""
+    if name == 'voice_library':
+        return get_voice_library()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
     try:
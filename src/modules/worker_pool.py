@@ -0,0 +1,195 @@
+import os
+import gc
+import logging
+import multiprocessing
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.modules.tts_input import TTSInput, TTSSynthesisResult
+from src.modules.cpu_config import CPUConfig, apply_cpu_config, available_cpus, resolve_cores, split_cores
+
+# 配置日志
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# 子进程中使用的合成器实例
+# fork模式下由父进程在创建进程池前设置，子进程以写时复制方式共享已加载的模型权重
+_worker_synthesizer = None
+
+def _init_worker(num_threads: int, synthesizer_kwargs: Optional[Dict[str, Any]],
+                 inter_op_threads: Optional[int], worker_cores: Optional[List[List[int]]], worker_counter) -> None:
+    """
+    子进程初始化函数
+
+    Args:
+        num_threads: 子进程使用的torch intra-op线程数
+        synthesizer_kwargs: spawn模式下用于在子进程中创建合成器的参数，fork模式下为None
+        inter_op_threads: 子进程使用的torch inter-op线程数
+        worker_cores: 每个子进程绑定的核心列表，为None时不绑核
+        worker_counter: 用于为子进程分配序号的共享计数器
+    """
+    global _worker_synthesizer
+    with worker_counter.get_lock():
+        worker_index = worker_counter.value
+        worker_counter.value += 1
+
+    cores = worker_cores[worker_index % len(worker_cores)] if worker_cores else None
+    apply_cpu_config(CPUConfig(intra_op_threads=num_threads, inter_op_threads=inter_op_threads, cpu_cores=cores))
+
+    if _worker_synthesizer is None:
+        # spawn模式无法继承父进程的模型，需要在子进程中重新加载
+        from src.tts_synthesizer import TTSSynthesizer
+        _worker_synthesizer = TTSSynthesizer(**(synthesizer_kwargs or {}))
+
+    logger.info(f"Synthesis worker {os.getpid()} ready with {num_threads} torch threads")
+
+def _run_task(tts_input: TTSInput) -> TTSSynthesisResult:
+    """在子进程中合成单个输入"""
+    return _worker_synthesizer.synthesize_input(tts_input)
+
+def _run_segment(task: Tuple[str, Any, str, Dict[str, Any]]) -> Tuple[Any, Dict[str, float]]:
+    """在子进程中合成长文本的一个片段，返回(波形数据, 各阶段耗时)"""
+    from src.modules.stage_timer import StageTimer
+
+    text, speaker_wav, language, params = task
+    timer = StageTimer()
+    wav = _worker_synthesizer.synthesize_segment(text, speaker_wav, language, timer=timer, **params)
+    return wav, timer.timings
+
+class SynthesisWorkerPool:
+    """
+    多进程合成工作池，每个子进程持有一份模型，结果按输入顺序返回
+    """
+    def __init__(self, synthesizer, num_workers: int, threads_per_worker: Optional[int] = None,
+                 start_method: Optional[str] = None, cpu_config: Optional[CPUConfig] = None):
+        """
+        初始化合成工作池
+
+        Args:
+            synthesizer: 父进程中已加载模型的TTSSynthesizer实例
+            num_workers: 子进程数量
+            threads_per_worker: 每个子进程的torch线程数，默认为可用核心数平均分配
+            start_method: 进程启动方式，默认在支持时使用'fork'以共享模型权重
+            cpu_config: CPU配置，pin_workers为True时将可用核心（或cpu_cores/numa_node指定的核心）平均分给各子进程并绑定
+        """
+        if num_workers < 1:
+            raise ValueError("Number of workers must be at least 1")
+
+        if start_method is None:
+            start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+
+        cpu_config = cpu_config or CPUConfig()
+        cores = resolve_cores(cpu_config) or available_cpus()
+
+        self.synthesizer = synthesizer
+        self.num_workers = num_workers
+        self.worker_cores = split_cores(cores, num_workers) if cpu_config.pin_workers else None
+        self.threads_per_worker = threads_per_worker or max(1, len(cores) // num_workers)
+        self.inter_op_threads = cpu_config.inter_op_threads
+        self.start_method = start_method
+        self._pool = None
+
+        logger.info(f"SynthesisWorkerPool initialized with {num_workers} workers, "
+                    f"{self.threads_per_worker} threads per worker, start method: {start_method}, "
+                    f"pinned cores: {self.worker_cores}")
+
+    def imap(self, inputs: Iterable[TTSInput]) -> Iterator[TTSSynthesisResult]:
+        """
+        并行合成输入，按输入顺序逐个产出结果
+
+        Args:
+            inputs: TTS输入序列
+
+        Returns:
+            合成结果迭代器
+        """
+        return self._imap(_run_task, inputs)
+
+    def imap_segments(self, segments: Iterable[str], speaker_wav, language: str,
+                      params: Dict[str, Any]) -> Iterator[Tuple[Any, Dict[str, float]]]:
+        """
+        并行合成长文本的各个片段，按片段顺序逐个产出结果
+
+        fork模式下子进程继承父进程的音色条件向量缓存，父进程预先计算条件向量后各片段共享同一份
+
+        Args:
+            segments: 预处理并分段后的文本片段
+            speaker_wav: 音色参考音频文件路径或路径列表
+            language: 语言代码
+            params: XTTS推理参数（temperature、top_k等）
+
+        Returns:
+            (波形数据, 各阶段耗时)迭代器
+        """
+        return self._imap(_run_segment, ((segment, speaker_wav, language, params) for segment in segments))
+
+    def start(self) -> None:
+        """
+        创建子进程，之后的imap调用复用同一组子进程，直到调用close
+
+        不调用start时，每次imap调用都会临时创建并关闭子进程
+        """
+        global _worker_synthesizer
+        if self._pool is not None:
+            return
+        context = multiprocessing.get_context(self.start_method)
+
+        synthesizer_kwargs = None
+        if self.start_method == 'fork':
+            _worker_synthesizer = self.synthesizer
+            # 冻结已有对象，避免子进程中的垃圾回收触碰模型对象导致写时复制页被复制
+            gc.freeze()
+        else:
+            synthesizer_kwargs = {
+                'output_dir': self.synthesizer.output_dir,
+                'gpt_cond_len': self.synthesizer.gpt_cond_len,
+                'speaker_cache_size': self.synthesizer.speaker_cache.max_size,
+                'audio_cache': self.synthesizer.audio_cache,
+                'precision': self.synthesizer.precision,
+                'model_name': self.synthesizer.model_name,
+                'preprocessor': self.synthesizer.preprocessor.name
+            }
+
+        try:
+            worker_counter = context.Value('i', 0)
+            self._pool = context.Pool(
+                processes=self.num_workers,
+                initializer=_init_worker,
+                initargs=(self.threads_per_worker, synthesizer_kwargs, self.inter_op_threads,
+                          self.worker_cores, worker_counter)
+            )
+        except Exception:
+            self._reset_fork_state()
+            raise
+
+    def close(self) -> None:
+        """关闭子进程"""
+        if self._pool is None:
+            return
+        try:
+            self._pool.terminate()
+            self._pool.join()
+        finally:
+            self._pool = None
+            self._reset_fork_state()
+
+    def _reset_fork_state(self) -> None:
+        global _worker_synthesizer
+        if self.start_method == 'fork':
+            gc.unfreeze()
+            _worker_synthesizer = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _imap(self, task: Callable, items: Iterable) -> Iterator:
+        """在进程池中对每个元素执行task，按顺序产出结果"""
+        if self._pool is not None:
+            yield from self._pool.imap(task, items)
+            return
+
+        with self:
+            yield from self._pool.imap(task, items)
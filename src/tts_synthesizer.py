@@ -2,9 +2,12 @@ import os
 import time
 import logging
 import argparse
+import itertools
 import random
-from typing import List, Dict, Any, Optional
-import pandas as pd
+import threading
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Iterator, Callable, Tuple, Union
+import numpy as np
 from datetime import datetime
 
 # 配置日志
@@ -13,20 +16,50 @@ logger = logging.getLogger(__name__)
 
 # 导入自定义模块
 from src.modules.text_loader import TextLoader
-from src.modules.voice_library import voice_library
-from src.modules.tts_input import TTSInput, TTSSynthesisResult
+from src.modules.voice_library import get_voice_library
+from src.modules.tts_input import TTSInput, TTSBatchInput, TTSSynthesisResult, TTSBatchResult, TTSStreamChunk
+from src.modules.speaker_cache import SpeakerLatentCache
+from src.modules.job_manifest import JobManifest
+from src.modules.meta_writer import MetaWriter
+from src.modules.stage_timer import StageTimer
+from src.modules.cpu_config import CPUConfig, apply_cpu_config, autotune_threads, parse_cpu_list
+from src.modules.text_preprocessor import PREPROCESSORS, PREPROCESSING_VERSION, create_preprocessor
+from src.modules.text_segmenter import TextSegmenter, DEFAULT_MAX_TOKENS
+from src.modules.segment_joiner import join_segments
+from src.modules.sharding import make_item_id, shard_of, validate_shard
 
 class TTSSynthesizer:
-    def __init__(self, output_dir: str = "output", model_manager=None):
+    def __init__(self, output_dir: str = "output", model_manager=None,
+                 speaker_cache_size: int = 32, gpt_cond_len: int = 12, audio_cache=None,
+                 precision: str = "fp32", model_name: Optional[str] = None,
+                 cpu_config: Optional[CPUConfig] = None, preprocessor: str = "bert", corpus_cache=None):
         """
         初始化TTS合成器
         Args:
             output_dir: 输出目录，默认为"output"
             model_manager: 模型管理器实例，如果为None则创建默认实例
+            speaker_cache_size: 音色条件向量缓存的最大条目数，默认为32
+            gpt_cond_len: 用于计算GPT条件向量的参考音频长度（秒），默认为12
+            audio_cache: 合成结果缓存（AudioCache）实例，默认为None（不使用缓存）
+            precision: 推理精度，'fp32'、'int8'或'bf16'，默认为"fp32"
+            model_name: 模型名称，默认为None（使用模型管理器的默认模型XTTS v2）
+            cpu_config: CPU线程和绑核配置，在加载模型前应用到当前进程，默认为None（使用torch默认设置）
+            preprocessor: 中文文本预处理方式，'bert'（bert-base-chinese分词器）或'regex'（正则表达式，不加载分词器），默认为"bert"
+            corpus_cache: 预处理后语料的缓存（CorpusCache）实例，process_text_file再次处理同一文件时跳过文本处理，默认为None（不使用缓存）
         """
         self.output_dir = output_dir
         self.text_loader = TextLoader()
         self.model_manager = model_manager
+        self.gpt_cond_len = gpt_cond_len
+        self.speaker_cache = SpeakerLatentCache(max_size=speaker_cache_size)
+        self.audio_cache = audio_cache
+        self.corpus_cache = corpus_cache
+        self.precision = precision
+        self.cpu_config = cpu_config
+        
+        # 在加载模型前设置线程数和绑核，inter-op线程数只能在并行计算开始前设置
+        if cpu_config is not None:
+            apply_cpu_config(cpu_config)
         
         # 如果没有提供model_manager，则创建一个
         if self.model_manager is None:
@@ -36,11 +69,363 @@ class TTSSynthesizer:
         # 确保输出目录存在
         os.makedirs(output_dir, exist_ok=True)
         
-        # 加载模型（一次加载，多次使用）
-        self.tts = self.model_manager.load_model()
+        # 中文文本预处理，'bert'方式会加载分词器
+        self.preprocessor = create_preprocessor(preprocessor, self.model_manager)
+        
+        # 加载模型（一次加载，多次使用），合成器存在期间持有模型引用，模型不会被模型管理器淘汰
+        self.model_name = model_name or self.model_manager.default_model_name
+        self.tts = self.model_manager.acquire(self.model_name, precision=precision)
         
         logger.info(f"TTSSynthesizer initialized with output directory: {output_dir}")
     
+    def close(self) -> None:
+        """释放对模型的引用，之后模型管理器可以在内存不足时淘汰该模型"""
+        if self.tts is not None:
+            self.model_manager.release(self.model_name, self.precision)
+            self.tts = None
+    
+    def autotune_threads(self, speaker_wav: str, text: str = "今天天气很好，我们一起去公园散步吧。",
+                         language: str = "zh-cn", candidates: Optional[List[int]] = None) -> int:
+        """
+        在几个候选线程数下合成测试文本，选择实时率最低的intra-op线程数并应用到当前进程
+        
+        Args:
+            speaker_wav: 测试使用的音色参考音频
+            text: 测试文本
+            language: 语言代码，默认为"zh-cn"
+            candidates: 候选线程数，默认为可用核心数的1/4、1/2和全部
+            
+        Returns:
+            选中的线程数
+        """
+        def measure_rtf() -> float:
+            result = self.synthesize_to_array(text, speaker_wav, language=language)
+            if not result.success:
+                raise RuntimeError(f"Autotune synthesis failed: {result.error_message}")
+            return result.rtf
+        
+        best, _ = autotune_threads(measure_rtf, candidates)
+        if self.cpu_config is None:
+            self.cpu_config = CPUConfig()
+        self.cpu_config.intra_op_threads = best
+        return best
+    
+    def _get_xtts_model(self):
+        """
+        获取底层XTTS模型实例，只有XTTS模型支持复用音色条件向量
+
+        Returns:
+            XTTS模型实例，如果当前模型不是XTTS则返回None
+        """
+        synthesizer = getattr(self.tts, 'synthesizer', None)
+        tts_model = getattr(synthesizer, 'tts_model', None)
+        if tts_model is not None and hasattr(tts_model, 'get_conditioning_latents') and hasattr(tts_model, 'inference'):
+            return tts_model
+        return None
+
+    def _get_conditioning_latents(self, xtts_model, speaker_wav):
+        """
+        获取音色条件向量，优先从缓存中读取
+
+        Args:
+            xtts_model: XTTS模型实例
+            speaker_wav: 音色参考音频文件路径或路径列表
+
+        Returns:
+            (gpt_cond_latent, speaker_embedding)元组
+        """
+        config = xtts_model.config
+        sample_rate = config.audio.sample_rate
+
+        def compute():
+            return xtts_model.get_conditioning_latents(
+                audio_path=speaker_wav,
+                gpt_cond_len=self.gpt_cond_len,
+                gpt_cond_chunk_len=getattr(config, 'gpt_cond_chunk_len', 4),
+                max_ref_length=getattr(config, 'max_ref_len', 10),
+                sound_norm_refs=getattr(config, 'sound_norm_refs', False),
+                load_sr=sample_rate
+            )
+
+        return self.speaker_cache.get_or_compute(speaker_wav, self.gpt_cond_len, sample_rate, compute)
+
+    @contextmanager
+    def _time_vocoder(self, xtts_model, timer: StageTimer) -> Iterator[None]:
+        """
+        通过前向钩子单独统计HiFiGAN声码器的耗时，Xtts.inference内部依次执行GPT解码和声码器，无法在外部分开计时
+
+        Args:
+            xtts_model: XTTS模型实例
+            timer: 分阶段计时器
+        """
+        vocoder = getattr(xtts_model, 'hifigan_decoder', None)
+        if vocoder is None or not hasattr(vocoder, 'register_forward_pre_hook'):
+            yield
+            return
+
+        # 同一模型可能被其他线程（如流式接口）同时使用，只统计当前线程的调用
+        thread_id = threading.get_ident()
+
+        def pre_hook(module, inputs):
+            if threading.get_ident() == thread_id:
+                timer.start('vocoder')
+
+        def post_hook(module, inputs, outputs):
+            if threading.get_ident() == thread_id:
+                timer.stop()
+
+        handles = [vocoder.register_forward_pre_hook(pre_hook), vocoder.register_forward_hook(post_hook)]
+        try:
+            yield
+        finally:
+            for handle in handles:
+                handle.remove()
+
+    def _xtts_synthesize(self, xtts_model, text: str, speaker_wav, language: str,
+                         split_sentences: bool, timer: Optional[StageTimer] = None, **params) -> np.ndarray:
+        """
+        使用缓存的音色条件向量直接调用XTTS推理，行为与Synthesizer.tts保持一致
+
+        Args:
+            xtts_model: XTTS模型实例
+            text: 预处理后的文本
+            speaker_wav: 音色参考音频文件路径或路径列表
+            language: 语言代码
+            split_sentences: 是否分割句子
+            timer: 分阶段计时器，默认为None（不记录各阶段耗时）
+            **params: XTTS推理参数（temperature、top_k等）
+
+        Returns:
+            合成的波形数据
+        """
+        timer = timer or StageTimer()
+        with timer.stage('conditioning'):
+            gpt_cond_latent, speaker_embedding = self._get_conditioning_latents(xtts_model, speaker_wav)
+
+        synthesizer = self.tts.synthesizer
+        with timer.stage('preprocess'):
+            sentences = synthesizer.split_into_sentences(text) if split_sentences else [text]
+
+        wavs = []
+        for sentence in sentences:
+            wavs.append(self._xtts_inference(xtts_model, sentence, language, gpt_cond_latent, speaker_embedding,
+                                             timer, **params))
+            # 与Synthesizer.tts一致，句子之间插入静音
+            wavs.append(np.zeros(10000, dtype=np.float32))
+
+        return np.concatenate(wavs) if wavs else np.zeros(0, dtype=np.float32)
+
+    def _xtts_inference(self, xtts_model, text: str, language: str, gpt_cond_latent, speaker_embedding,
+                        timer: StageTimer, **params) -> np.ndarray:
+        """
+        对单个句子或片段调用XTTS推理
+
+        Args:
+            xtts_model: XTTS模型实例
+            text: 预处理后的句子或片段
+            language: 语言代码
+            gpt_cond_latent: GPT条件向量
+            speaker_embedding: 说话人向量
+            timer: 分阶段计时器
+            **params: XTTS推理参数（temperature、top_k等）
+
+        Returns:
+            合成的波形数据
+        """
+        with timer.stage('gpt_decode'), self._time_vocoder(xtts_model, timer):
+            outputs = xtts_model.inference(
+                text=text,
+                language=language,
+                gpt_cond_latent=gpt_cond_latent,
+                speaker_embedding=speaker_embedding,
+                **params
+            )
+        waveform = outputs['wav']
+        if hasattr(waveform, 'cpu'):
+            waveform = waveform.cpu().numpy()
+        return np.asarray(waveform, dtype=np.float32).squeeze()
+
+    def synthesize_segment(self, text: str, speaker_wav, language: str,
+                           timer: Optional[StageTimer] = None, **params) -> np.ndarray:
+        """
+        合成长文本的一个片段，音色条件向量从缓存中获取，同一音色的各片段共享同一份
+
+        Args:
+            text: 预处理并分段后的文本片段
+            speaker_wav: 音色参考音频文件路径或路径列表
+            language: 语言代码
+            timer: 分阶段计时器，默认为None
+            **params: 已处理'random'后的XTTS推理参数
+
+        Returns:
+            合成的波形数据
+        """
+        timer = timer or StageTimer()
+        xtts_model = self._get_xtts_model()
+        with timer.stage('conditioning'):
+            gpt_cond_latent, speaker_embedding = self._get_conditioning_latents(xtts_model, speaker_wav)
+        return self._xtts_inference(xtts_model, text, language, gpt_cond_latent, speaker_embedding, timer, **params)
+
+    def get_segmenter(self, language: str = "zh-cn", max_segment_tokens: Optional[int] = None) -> TextSegmenter:
+        """
+        创建长文本分段器，默认预算为XTTS对该语言的字符上限（如中文82个字符），超出上限时合成质量会下降
+
+        Args:
+            language: 语言代码，默认为"zh-cn"
+            max_segment_tokens: 每个片段的最大token数（字符数），默认为None（使用XTTS的字符上限）
+
+        Returns:
+            分段器实例
+        """
+        if max_segment_tokens is None:
+            tokenizer = getattr(self._get_xtts_model(), 'tokenizer', None)
+            char_limits = getattr(tokenizer, 'char_limits', None) or {}
+            max_segment_tokens = char_limits.get(language.split('-')[0], DEFAULT_MAX_TOKENS)
+        return TextSegmenter(max_tokens=max_segment_tokens)
+
+    def get_output_sample_rate(self) -> int:
+        """
+        获取模型输出音频的采样率
+
+        Returns:
+            采样率
+        """
+        synthesizer = getattr(self.tts, 'synthesizer', None)
+        return getattr(synthesizer, 'output_sample_rate', None) or 24000
+
+    def save_audio(self, audio: np.ndarray, output_path: str, sample_rate: Optional[int] = None) -> str:
+        """
+        将波形数据写入音频文件，与tts_to_file使用相同的归一化方式
+
+        Args:
+            audio: 波形数据
+            output_path: 输出文件路径
+            sample_rate: 采样率，默认为模型输出采样率
+
+        Returns:
+            输出文件路径
+        """
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        # 输出文件可能是缓存音频的硬链接，先删除再写入，避免覆盖缓存内容
+        if os.path.lexists(output_path):
+            os.remove(output_path)
+
+        synthesizer = getattr(self.tts, 'synthesizer', None)
+        if synthesizer is not None and (sample_rate is None or sample_rate == synthesizer.output_sample_rate):
+            synthesizer.save_wav(wav=audio, path=output_path)
+        else:
+            import soundfile as sf
+            sf.write(output_path, audio, sample_rate or self.get_output_sample_rate())
+        return output_path
+
+    @staticmethod
+    def _set_timing_stats(result: TTSSynthesisResult, timer: StageTimer) -> None:
+        """
+        将各阶段耗时写入合成结果，并根据音频时长计算实时率
+
+        Args:
+            result: 合成结果，需已设置processing_time和audio_duration
+            timer: 分阶段计时器
+        """
+        result.stage_timings = dict(timer.timings)
+        if result.processing_time is not None and result.audio_duration:
+            result.rtf = result.processing_time / result.audio_duration
+
+    @staticmethod
+    def _get_file_duration(file_path: str) -> Optional[float]:
+        """读取音频文件时长（秒），只读取文件头，失败时返回None"""
+        try:
+            import soundfile as sf
+            return sf.info(file_path).duration
+        except Exception:
+            return None
+
+    @staticmethod
+    def resolve_emotion_wav(emotion: Optional[str]) -> Optional[str]:
+        """
+        获取情感类型对应的参考音频（data_voice/emotion/<emotion>.wav）
+
+        Args:
+            emotion: 情感类型，None或'neutral'表示不使用情感参考音频
+
+        Returns:
+            情感参考音频路径，不使用情感或文件不存在时返回None
+        """
+        if not emotion or emotion == 'neutral':
+            return None
+        emotion_wav_path = os.path.join("data_voice", "emotion", f"{emotion}.wav")
+        if not os.path.exists(emotion_wav_path):
+            logger.warning(f"Emotion audio file not found: {emotion_wav_path}")
+            return None
+        logger.info(f"Found emotion audio file: {emotion_wav_path}")
+        return emotion_wav_path
+
+    def get_speaker_cache_stats(self) -> Dict[str, Any]:
+        """
+        获取音色条件向量缓存的统计信息
+
+        Returns:
+            包含命中数、未命中数等信息的字典
+        """
+        return self.speaker_cache.stats()
+    
+    def _get_audio_cache_key(self, text: str, speaker_wav, language: str,
+                             split_sentences: bool, params: Dict[str, Any]) -> Optional[str]:
+        """
+        生成合成结果缓存键，未启用缓存或无法生成时返回None
+        
+        Args:
+            text: 要合成的文本
+            speaker_wav: 音色参考音频文件路径或路径列表
+            language: 语言代码
+            split_sentences: 是否分割句子
+            params: 已处理'random'后的XTTS参数
+            
+        Returns:
+            缓存键
+        """
+        if self.audio_cache is None:
+            return None
+        try:
+            # 不同精度和预处理方式的合成结果可能不同，非默认值时模型名称带上精度和预处理方式
+            model_name = self.model_name if self.precision == 'fp32' else f"{self.model_name}@{self.precision}"
+            if self.preprocessor.name != 'bert':
+                model_name = f"{model_name}+{self.preprocessor.name}"
+            return self.audio_cache.make_key(
+                text, speaker_wav, params,
+                model_name=model_name,
+                language=language,
+                split_sentences=split_sentences,
+                # gpt_cond_len影响条件向量，预处理规则变化时合成的文本不同，都会改变合成结果
+                conditioning={'gpt_cond_len': self.gpt_cond_len, 'preprocessing_version': PREPROCESSING_VERSION}
+            )
+        except Exception as e:
+            logger.warning(f"Failed to build audio cache key: {str(e)}")
+            return None
+    
+    def _make_cached_result(self, text: str, speaker_wav, output_path: str, language: str,
+                            split_sentences: bool, params: Dict[str, Any], start_time: float) -> TTSSynthesisResult:
+        """构建缓存命中时的合成结果"""
+        result = TTSSynthesisResult(
+            input_data=TTSInput(
+                text=text,
+                speaker_wav=speaker_wav,
+                output_path=output_path,
+                language=language,
+                split_sentences=split_sentences,
+                additional_params=params
+            ),
+            success=True,
+            output_file=output_path,
+            processing_time=time.time() - start_time,
+            cached=True,
+            audio_duration=self._get_file_duration(output_path)
+        )
+        self._set_timing_stats(result, StageTimer())
+        return result
+    
     def _process_param_value(self, param_name: str, param_value: Any, param_range: tuple) -> Any:
         """
         处理参数值，如果是'random'则在指定范围内随机生成
@@ -62,92 +447,56 @@ class TTSSynthesizer:
                 return random.uniform(param_range[0], param_range[1])
         return param_value
 
-    def _preprocess_chinese_text(self, text: str) -> str:
+    def _resolve_params(self, temperature: Any = 0.65, length_penalty: Any = 1.0,
+                        repetition_penalty: Any = 2.0, top_k: Any = 50, top_p: Any = 0.8,
+                        speed: Any = 1.0, emotion: Any = "happy") -> Dict[str, Any]:
+        """
+        处理XTTS参数，将'random'替换为指定范围内的随机值
+        
+        Returns:
+            处理后的参数字典
+        """
+        return {
+            'temperature': self._process_param_value('temperature', temperature, (0.5, 1.0)),
+            'length_penalty': self._process_param_value('length_penalty', length_penalty, (0.5, 2.0)),
+            'repetition_penalty': self._process_param_value('repetition_penalty', repetition_penalty, (1.0, 3.0)),
+            'top_k': self._process_param_value('top_k', top_k, (10, 100)),
+            'top_p': self._process_param_value('top_p', top_p, (0.7, 1.0)),
+            'speed': self._process_param_value('speed', speed, (0.9, 1.1)),
+            'emotion': self._process_param_value('emotion', emotion, ('happy', 'sad', 'angry', 'surprise','neutral')),
+        }
+
+    def _preprocess_chinese_text(self, text: str, timer: Optional[StageTimer] = None) -> str:
         """
-        预处理中文文本，使用BERT-base-chinese分词器进行更精确的文本处理，解决断句问题
+        预处理中文文本，切分后重新组合并规范标点和空格，解决断句问题
         
         Args:
             text: 原始文本
+            timer: 分阶段计时器，分词耗时计入tokenize阶段，默认为None
             
         Returns:
             预处理后的文本
         """
-        if not text:
-            return text
-        
-        processed_text = text
-        
-        try:
-            # 尝试使用BERT-base-chinese分词器进行分词
-            if hasattr(self.model_manager, 'chinese_tokenizer') and self.model_manager.chinese_tokenizer:
-                logger.debug("Using BERT-base-chinese tokenizer for text preprocessing")
-                
-                # 使用BERT分词器进行分词
-                tokens = self.model_manager.chinese_tokenizer.tokenize(text)
-                
-                # 将分词后的结果重新组合成句子，注意处理标点符号
-                temp_text = ""
-                for token in tokens:
-                    # 处理特殊字符和标点符号
-                    if token in ['[UNK]', '[CLS]', '[SEP]', '[PAD]', '[MASK]']:
-                        continue
-                    # 标点符号前添加空格
-                    elif any(p in token for p in ',.!?;:"'):
-                        # 处理中文标点
-                        for char in token:
-                            if char in '，。！？；："':
-                                temp_text = temp_text.rstrip() + char + ' '
-                            else:
-                                temp_text += char
-                    # 英文字母和数字前后添加空格
-                    elif any(c.isalnum() and not '\u4e00' <= c <= '\u9fff' for c in token):
-                        temp_text += ' ' + token + ' '
-                    else:
-                        temp_text += token
-                
-                processed_text = temp_text
-        except Exception as e:
-            logger.warning(f"Failed to use BERT tokenizer for preprocessing: {str(e)}")
-            # 如果BERT分词器使用失败，回退到原来的处理方式
-            pass
-        
-        # 确保中文标点符号正确
-        processed_text = processed_text.replace('，', ', ').replace('。', '. ')
-        processed_text = processed_text.replace('！', '! ').replace('？', '? ')
-        processed_text = processed_text.replace('；', '; ').replace('：', ': ')
-        
-        # 处理英文字母和数字，确保正确发音
-        import re
-        
-        # 处理英文字母
-        processed_text = re.sub(r'([a-zA-Z]+)', r' \1 ', processed_text)
-        
-        # 处理数字
-        processed_text = re.sub(r'(\d+)', r' \1 ', processed_text)
-        
-        # 清理多余的空格
-        processed_text = re.sub(r'\s+', ' ', processed_text).strip()
-        
-        logger.debug(f"Text preprocessing: '{text}' -> '{processed_text}'")
-        return processed_text
+        return self.preprocessor.preprocess(text, timer)
     
-    def synthesize_text(self, text: str, speaker_wav: str, output_path: str, 
-                       language: str = "zh-cn", split_sentences: bool = True,
-                       # XTTS模型参数
-                       temperature: Any = 0.65,
-                       length_penalty: Any = 1.0,
-                       repetition_penalty: Any = 2.0,
-                       emotion: Any = "happy",
-                       top_k: Any = 50,
-                       top_p: Any = 0.8,
-                       speed: Any = 1.0) -> TTSSynthesisResult:
+    def synthesize_to_array(self, text: str, speaker_wav: str, output_path: Optional[str] = None,
+                            language: str = "zh-cn", split_sentences: bool = True,
+                            # XTTS模型参数
+                            temperature: Any = 0.65,
+                            length_penalty: Any = 1.0,
+                            repetition_penalty: Any = 2.0,
+                            emotion: Any = "happy",
+                            top_k: Any = 50,
+                            top_p: Any = 0.8,
+                            speed: Any = 1.0,
+                            processed_text: Optional[str] = None) -> TTSSynthesisResult:
         """
-        合成单个文本为语音
+        合成单个文本为内存中的波形数据，结果中的audio和sample_rate可直接交给后续环节（加噪、质检、编码）使用
         
         Args:
             text: 要合成的文本
             speaker_wav: 音色参考音频文件路径
-            output_path: 输出文件路径
+            output_path: 目标输出文件路径，默认为None（只在内存中合成，不写文件）
             language: 语言代码，默认为"zh-cn"
             split_sentences: 是否分割句子，默认为True
             temperature: 自回归模型的softmax温度，默认为0.65
@@ -156,31 +505,31 @@ class TTSSynthesizer:
             top_k: 较低的值会使解码器产生更"可能"（也就是更无聊）的输出，默认为50
             top_p: 较低的值会使解码器产生更"可能"（也就是更无聊）的输出，默认为0.8
             speed: 生成音频的速度比率，默认为1.0
+            processed_text: 已预处理的文本，默认为None（对text做中文预处理）
             
         Returns:
-            合成结果
+            合成结果，成功时包含audio和sample_rate
         """
         start_time = time.time()
+        timer = StageTimer()
         
         # 处理随机参数
-        temperature = self._process_param_value('temperature', temperature, (0.5, 1.0))
-        length_penalty = self._process_param_value('length_penalty', length_penalty, (0.5, 2.0))
-        repetition_penalty = self._process_param_value('repetition_penalty', repetition_penalty, (1.0, 3.0))
-        top_k = self._process_param_value('top_k', top_k, (10, 100))
-        top_p = self._process_param_value('top_p', top_p, (0.7, 1.0))
-        speed = self._process_param_value('speed', speed, (0.9, 1.1))
-        emotion = self._process_param_value('emotion', emotion, ('happy', 'sad', 'angry', 'surprise','neutral'))
-        
-        # 创建额外参数字典
-        additional_params = {
-            'temperature': temperature,
-            'length_penalty': length_penalty,
-            'repetition_penalty': repetition_penalty,
-            'top_k': top_k,
-            'top_p': top_p,
-            'speed': speed,
-            'emotion': emotion,
-        }
+        additional_params = self._resolve_params(
+            temperature=temperature,
+            length_penalty=length_penalty,
+            repetition_penalty=repetition_penalty,
+            top_k=top_k,
+            top_p=top_p,
+            speed=speed,
+            emotion=emotion
+        )
+        temperature = additional_params['temperature']
+        length_penalty = additional_params['length_penalty']
+        repetition_penalty = additional_params['repetition_penalty']
+        top_k = additional_params['top_k']
+        top_p = additional_params['top_p']
+        speed = additional_params['speed']
+        emotion = additional_params['emotion']
         
         result = TTSSynthesisResult(
             input_data=TTSInput(
@@ -195,21 +544,39 @@ class TTSSynthesizer:
         )
         
         try:
-            logger.info(f"Synthesizing text to {output_path} with params: {additional_params}")
+            logger.info(f"Synthesizing text with params: {additional_params}")
             
-            # 预处理中文文本
-            processed_text = self._preprocess_chinese_text(text)
+            # 预处理中文文本，语料缓存中已有预处理结果时跳过
+            if processed_text is None:
+                with timer.stage('preprocess'):
+                    processed_text = self._preprocess_chinese_text(text, timer)
             
             # 执行TTS合成
-            # 检查模型是否是XTTS类型，以便正确传递参数
-            if hasattr(self.tts, 'tts_to_file'):
-                # 如果tts_to_file方法支持这些参数，直接传递
+            # XTTS模型使用缓存的音色条件向量，避免每条文本重复计算
+            xtts_model = self._get_xtts_model()
+            if xtts_model is not None:
+                audio = self._xtts_synthesize(
+                    xtts_model,
+                    text=processed_text,
+                    speaker_wav=speaker_wav,
+                    language=language,
+                    split_sentences=split_sentences,
+                    timer=timer,
+                    temperature=temperature,
+                    length_penalty=length_penalty,
+                    repetition_penalty=repetition_penalty,
+                    top_k=top_k,
+                    top_p=top_p,
+                    speed=speed
+                )
+            else:
+                # 其他模型通过tts接口获取波形，无法区分解码和声码器阶段，全部计入gpt_decode
+                timer.start('gpt_decode')
                 try:
-                    self.tts.tts_to_file(
+                    audio = self.tts.tts(
                         text=processed_text,
                         speaker_wav=speaker_wav,
                         language=language,
-                        file_path=output_path,
                         split_sentences=split_sentences,
                         # XTTS特定参数
                         temperature=temperature,
@@ -219,36 +586,612 @@ class TTSSynthesizer:
                         top_p=top_p,
                         speed=speed,
                         emotion=emotion,
-                        gpt_cond_len= 12, # test 
+                        gpt_cond_len=self.gpt_cond_len,
                     )
                 except TypeError:
                     # 如果不支持额外参数，回退到基本调用
                     logger.warning("Model doesn't support additional parameters, using basic call")
-                    self.tts.tts_to_file(
+                    audio = self.tts.tts(
                         text=processed_text,
                         speaker_wav=speaker_wav,
                         language=language,
-                        file_path=output_path,
                         split_sentences=split_sentences
                     )
+                finally:
+                    timer.stop()
+            
+            result.audio = np.asarray(audio, dtype=np.float32)
+            result.sample_rate = self.get_output_sample_rate()
+            result.audio_duration = len(result.audio) / result.sample_rate
+            result.success = True
+            result.processing_time = time.time() - start_time
+            self._set_timing_stats(result, timer)
+            
+        except Exception as e:
+            error_msg = str(e)
+            result.error_message = error_msg
+            logger.error(f"Failed to synthesize text: {error_msg}")
+        
+        return result
+    
+    def synthesize_text(self, text: str, speaker_wav: str, output_path: str, 
+                       language: str = "zh-cn", split_sentences: bool = True,
+                       # XTTS模型参数
+                       temperature: Any = 0.65,
+                       length_penalty: Any = 1.0,
+                       repetition_penalty: Any = 2.0,
+                       emotion: Any = "happy",
+                       top_k: Any = 50,
+                       top_p: Any = 0.8,
+                       speed: Any = 1.0,
+                       processed_text: Optional[str] = None) -> TTSSynthesisResult:
+        """
+        合成单个文本为语音
+        
+        Args:
+            text: 要合成的文本
+            speaker_wav: 音色参考音频文件路径
+            output_path: 输出文件路径
+            language: 语言代码，默认为"zh-cn"
+            split_sentences: 是否分割句子，默认为True
+            temperature: 自回归模型的softmax温度，默认为0.65
+            length_penalty: 应用于自回归解码器的长度惩罚，默认为1.0
+            repetition_penalty: 防止自回归解码器在解码期间重复的惩罚，默认为2.0
+            top_k: 较低的值会使解码器产生更"可能"（也就是更无聊）的输出，默认为50
+            top_p: 较低的值会使解码器产生更"可能"（也就是更无聊）的输出，默认为0.8
+            speed: 生成音频的速度比率，默认为1.0
+            processed_text: 已预处理的文本，默认为None（对text做中文预处理）
+            
+        Returns:
+            合成结果
+        """
+        start_time = time.time()
+        
+        # 先处理随机参数，缓存键需要使用实际的参数值
+        params = self._resolve_params(
+            temperature=temperature,
+            length_penalty=length_penalty,
+            repetition_penalty=repetition_penalty,
+            top_k=top_k,
+            top_p=top_p,
+            speed=speed,
+            emotion=emotion
+        )
+        
+        # 查询合成结果缓存
+        cache_key = self._get_audio_cache_key(text, speaker_wav, language, split_sentences, params)
+        if cache_key and self.audio_cache.get(cache_key, output_path):
+            return self._make_cached_result(text, speaker_wav, output_path, language,
+                                            split_sentences, params, start_time)
+        
+        result = self.synthesize_to_array(
+            text=text,
+            speaker_wav=speaker_wav,
+            output_path=output_path,
+            language=language,
+            split_sentences=split_sentences,
+            processed_text=processed_text,
+            **params
+        )
+        if not result.success:
+            return result
+        
+        try:
+            write_start = time.perf_counter()
+            self.save_audio(result.audio, output_path, result.sample_rate)
+            result.stage_timings['write'] = time.perf_counter() - write_start
             
             # 检查输出文件是否存在
             if os.path.exists(output_path):
-                result.success = True
                 result.output_file = output_path
+                # 已写入文件，释放波形数据，避免批量处理时结果列表占用大量内存
+                result.audio = None
                 result.processing_time = time.time() - start_time
+                if result.audio_duration:
+                    result.rtf = result.processing_time / result.audio_duration
                 logger.info(f"Successfully synthesized text to {output_path} in {result.processing_time:.2f} seconds")
+                if cache_key:
+                    self.audio_cache.put(cache_key, output_path, text)
             else:
                 raise Exception("Output file was not created")
             
         except Exception as e:
             error_msg = str(e)
+            result.success = False
             result.error_message = error_msg
             logger.error(f"Failed to synthesize text: {error_msg}")
         
         return result
     
-    def process_text_file(self, input_file: str, output_meta_file: str = None, 
+    def synthesize_long_text(self, text: str, speaker_wav: str, output_path: str,
+                             language: str = "zh-cn", max_segment_tokens: Optional[int] = None,
+                             num_workers: int = 1, crossfade_ms: float = 20.0, silence_ms: float = 200.0,
+                             # XTTS模型参数
+                             temperature: Any = 0.65,
+                             length_penalty: Any = 1.0,
+                             repetition_penalty: Any = 2.0,
+                             emotion: Any = "happy",
+                             top_k: Any = 50,
+                             top_p: Any = 0.8,
+                             speed: Any = 1.0) -> TTSSynthesisResult:
+        """
+        合成长文本：按标点将文本切分为不超过token预算的片段，多个工作进程并行合成各片段，
+        再按顺序拼接（淡入淡出和静音）写入一个输出文件，耗时随核心数而不是文本长度增长
+        
+        Args:
+            text: 要合成的文本
+            speaker_wav: 音色参考音频文件路径
+            output_path: 输出文件路径
+            language: 语言代码，默认为"zh-cn"
+            max_segment_tokens: 每个片段的最大token数（字符数），默认为None（使用XTTS对该语言的字符上限）
+            num_workers: 并行合成的工作进程数，默认为1（在当前进程中依次合成）
+            crossfade_ms: 片段衔接处淡入淡出的时长（毫秒），默认为20
+            silence_ms: 片段之间的静音时长（毫秒），为0时相邻片段交叉淡化，默认为200
+            temperature: 自回归模型的softmax温度，默认为0.65
+            length_penalty: 应用于自回归解码器的长度惩罚，默认为1.0
+            repetition_penalty: 防止自回归解码器在解码期间重复的惩罚，默认为2.0
+            top_k: 较低的值会使解码器产生更"可能"（也就是更无聊）的输出，默认为50
+            top_p: 较低的值会使解码器产生更"可能"（也就是更无聊）的输出，默认为0.8
+            speed: 生成音频的速度比率，默认为1.0
+            
+        Returns:
+            合成结果，stage_timings为各片段耗时之和（并行时大于processing_time）
+        """
+        start_time = time.time()
+        timer = StageTimer()
+        
+        # 所有片段使用同一组参数，'random'只处理一次
+        additional_params = self._resolve_params(
+            temperature=temperature,
+            length_penalty=length_penalty,
+            repetition_penalty=repetition_penalty,
+            top_k=top_k,
+            top_p=top_p,
+            speed=speed,
+            emotion=emotion
+        )
+        
+        xtts_model = self._get_xtts_model()
+        if xtts_model is None:
+            # 其他模型无法复用条件向量，整段交给synthesize_text
+            return self.synthesize_text(text, speaker_wav, output_path, language=language, **additional_params)
+        
+        result = TTSSynthesisResult(
+            input_data=TTSInput(
+                text=text,
+                speaker_wav=speaker_wav,
+                output_path=output_path,
+                language=language,
+                split_sentences=True,
+                additional_params=additional_params
+            ),
+            success=False
+        )
+        
+        try:
+            with timer.stage('preprocess'):
+                # 先在原始文本上分句再逐句预处理，预处理后的"3 . 14"中的句号会被误认为句末
+                segments = self.get_segmenter(language, max_segment_tokens).split(
+                    text, preprocess=lambda piece: self._preprocess_chinese_text(piece, timer))
+            
+            # 先在当前进程中计算音色条件向量，fork出的工作进程直接使用缓存中的同一份
+            with timer.stage('conditioning'):
+                self._get_conditioning_latents(xtts_model, speaker_wav)
+            
+            params = dict(additional_params)
+            params.pop('emotion')
+            num_workers = min(num_workers, len(segments))
+            logger.info(f"Synthesizing {len(segments)} segments with {num_workers} workers")
+            
+            if num_workers > 1:
+                from src.modules.worker_pool import SynthesisWorkerPool
+                pool = SynthesisWorkerPool(self, num_workers=num_workers, cpu_config=self.cpu_config)
+                wavs = []
+                for wav, timings in pool.imap_segments(segments, speaker_wav, language, params):
+                    wavs.append(wav)
+                    timer.merge(timings)
+            else:
+                wavs = [self.synthesize_segment(segment, speaker_wav, language, timer=timer, **params)
+                        for segment in segments]
+            
+            sample_rate = self.get_output_sample_rate()
+            audio = join_segments(wavs, sample_rate, crossfade_ms=crossfade_ms, silence_ms=silence_ms)
+            with timer.stage('write'):
+                self.save_audio(audio, output_path, sample_rate)
+            
+            result.output_file = output_path
+            result.sample_rate = sample_rate
+            result.audio_duration = len(audio) / sample_rate
+            result.success = True
+            result.processing_time = time.time() - start_time
+            self._set_timing_stats(result, timer)
+            logger.info(f"Successfully synthesized {len(segments)} segments to {output_path} "
+                        f"in {result.processing_time:.2f} seconds")
+            
+        except Exception as e:
+            error_msg = str(e)
+            result.error_message = error_msg
+            logger.error(f"Failed to synthesize long text: {error_msg}")
+        
+        return result
+    
+    def synthesize_stream(self, text: str, speaker_wav: str, language: str = "zh-cn",
+                          split_sentences: bool = True, stream_chunk_size: int = 20,
+                          # XTTS模型参数
+                          temperature: Any = 0.65,
+                          length_penalty: Any = 1.0,
+                          repetition_penalty: Any = 2.0,
+                          top_k: Any = 50,
+                          top_p: Any = 0.8,
+                          speed: Any = 1.0) -> Iterator[TTSStreamChunk]:
+        """
+        流式合成单个文本，XTTS模型使用增量推理，每解码出一段音频就立即产出
+        
+        Args:
+            text: 要合成的文本
+            speaker_wav: 音色参考音频文件路径或路径列表
+            language: 语言代码，默认为"zh-cn"
+            split_sentences: 是否分割句子，默认为True（先合成第一句可以降低首包延迟）
+            stream_chunk_size: 每次产出音频所对应的GPT token数，越小首包延迟越低，默认为20
+            temperature: 自回归模型的softmax温度，默认为0.65
+            length_penalty: 应用于自回归解码器的长度惩罚，默认为1.0
+            repetition_penalty: 防止自回归解码器在解码期间重复的惩罚，默认为2.0
+            top_k: 较低的值会使解码器产生更"可能"（也就是更无聊）的输出，默认为50
+            top_p: 较低的值会使解码器产生更"可能"（也就是更无聊）的输出，默认为0.8
+            speed: 生成音频的速度比率，默认为1.0
+            
+        Returns:
+            音频片段迭代器
+        """
+        start_time = time.time()
+        params = self._resolve_params(
+            temperature=temperature,
+            length_penalty=length_penalty,
+            repetition_penalty=repetition_penalty,
+            top_k=top_k,
+            top_p=top_p,
+            speed=speed
+        )
+        params.pop('emotion')
+        sample_rate = self.get_output_sample_rate()
+        
+        xtts_model = self._get_xtts_model()
+        if xtts_model is None or not hasattr(xtts_model, 'inference_stream'):
+            # 不支持增量推理的模型，整段合成后作为一个片段产出
+            result = self.synthesize_to_array(text=text, speaker_wav=speaker_wav, language=language,
+                                              split_sentences=split_sentences, **params)
+            if not result.success:
+                raise Exception(result.error_message)
+            yield TTSStreamChunk(audio=result.audio, sample_rate=result.sample_rate, index=0,
+                                 elapsed=time.time() - start_time)
+            return
+        
+        processed_text = self._preprocess_chinese_text(text)
+        sentences = self.tts.synthesizer.split_into_sentences(processed_text) if split_sentences else [processed_text]
+        gpt_cond_latent, speaker_embedding = self._get_conditioning_latents(xtts_model, speaker_wav)
+        
+        index = 0
+        for sentence_index, sentence in enumerate(sentences):
+            for chunk in xtts_model.inference_stream(
+                sentence,
+                language,
+                gpt_cond_latent,
+                speaker_embedding,
+                stream_chunk_size=stream_chunk_size,
+                **params
+            ):
+                if hasattr(chunk, 'cpu'):
+                    chunk = chunk.cpu().numpy()
+                elapsed = time.time() - start_time
+                if index == 0:
+                    logger.info(f"Time to first audio chunk: {elapsed:.3f} seconds")
+                yield TTSStreamChunk(
+                    audio=np.asarray(chunk, dtype=np.float32).squeeze(),
+                    sample_rate=sample_rate,
+                    index=index,
+                    sentence_index=sentence_index,
+                    elapsed=elapsed
+                )
+                index += 1
+        
+        logger.info(f"Streamed {index} audio chunks in {time.time() - start_time:.2f} seconds")
+    
+    def synthesize_input(self, tts_input: TTSInput) -> TTSSynthesisResult:
+        """
+        合成单个TTSInput，additional_params中的XTTS参数会传递给synthesize_text
+        
+        Args:
+            tts_input: TTS输入
+            
+        Returns:
+            合成结果
+        """
+        return self.synthesize_text(
+            text=tts_input.text,
+            speaker_wav=tts_input.speaker_wav,
+            output_path=tts_input.output_path,
+            language=tts_input.language,
+            split_sentences=tts_input.split_sentences,
+            processed_text=tts_input.processed_text,
+            **(tts_input.additional_params or {})
+        )
+    
+    def synthesize_batch(self, batch_input: TTSBatchInput,
+                         on_result: Optional[Callable[[int, TTSSynthesisResult], None]] = None,
+                         pool=None) -> TTSBatchResult:
+        """
+        批量合成多个文本，max_concurrency大于1时使用多进程工作池并行合成，
+        否则batch_size大于1时对XTTS模型使用按长度分桶的批量解码
+        
+        Args:
+            batch_input: 批量TTS输入
+            on_result: 每条结果完成时的回调，参数为(输入序号, 合成结果)，按输入顺序调用
+            pool: 复用的SynthesisWorkerPool，默认为None（按max_concurrency临时创建）
+            
+        Returns:
+            批量合成结果，结果顺序与输入顺序一致
+        """
+        start_time = time.time()
+        
+        if batch_input.max_concurrency > 1 and len(batch_input.inputs) > 1:
+            if pool is None:
+                from src.modules.worker_pool import SynthesisWorkerPool
+                num_workers = min(batch_input.max_concurrency, len(batch_input.inputs))
+                pool = SynthesisWorkerPool(self, num_workers=num_workers, cpu_config=self.cpu_config)
+            results = []
+            for result in pool.imap(batch_input.inputs):
+                if on_result:
+                    on_result(len(results), result)
+                results.append(result)
+        elif batch_input.batch_size > 1 and self._get_xtts_model() is not None:
+            results = self._synthesize_batched(batch_input.inputs, batch_input.batch_size, on_result=on_result)
+        else:
+            results = []
+            for tts_input in batch_input.inputs:
+                result = self.synthesize_input(tts_input)
+                if on_result:
+                    on_result(len(results), result)
+                results.append(result)
+        
+        return TTSBatchResult(results=results, total_processing_time=time.time() - start_time)
+    
+    def _synthesize_batched(self, inputs: List[TTSInput], batch_size: int,
+                            on_result: Optional[Callable[[int, TTSSynthesisResult], None]] = None) -> List[TTSSynthesisResult]:
+        """
+        按长度分桶批量合成：将所有输入切分为句子，同一音色、相同token长度和相同参数的句子合并为一个batch解码，
+        解码完成后再按输入拼接并分别写入各自的输出文件
+        
+        Args:
+            inputs: TTS输入列表
+            batch_size: 每个batch的最大句子数
+            on_result: 每条结果完成时的回调，参数为(输入序号, 合成结果)
+            
+        Returns:
+            合成结果列表，顺序与输入顺序一致
+        """
+        from src.modules.batched_inference import XttsBatchDecoder
+        
+        xtts_model = self._get_xtts_model()
+        decoder = XttsBatchDecoder(xtts_model, batch_size=batch_size)
+        synthesizer = self.tts.synthesizer
+        
+        results = []
+        sentence_wavs = []
+        item_times = []
+        item_timers = []
+        cache_keys = []
+        units = []  # (结果索引, 句子索引, token序列)
+        keys = []
+        
+        # 1. 预处理文本并切分句子、转换为token
+        for tts_input in inputs:
+            start_time = time.time()
+            params = self._resolve_params(**(tts_input.additional_params or {}))
+            result = TTSSynthesisResult(
+                input_data=TTSInput(
+                    text=tts_input.text,
+                    speaker_wav=tts_input.speaker_wav,
+                    output_path=tts_input.output_path,
+                    language=tts_input.language,
+                    split_sentences=tts_input.split_sentences,
+                    additional_params=params
+                ),
+                success=False
+            )
+            result_idx = len(results)
+            results.append(result)
+            sentence_wavs.append(None)
+            timer = StageTimer()
+            item_timers.append(timer)
+            cache_keys.append(self._get_audio_cache_key(
+                tts_input.text, tts_input.speaker_wav, tts_input.language, tts_input.split_sentences, params
+            ))
+            
+            # 缓存命中的输入不参与解码
+            if cache_keys[result_idx] and self.audio_cache.get(cache_keys[result_idx], tts_input.output_path):
+                result.success = True
+                result.cached = True
+                result.output_file = tts_input.output_path
+                result.processing_time = time.time() - start_time
+                result.audio_duration = self._get_file_duration(tts_input.output_path)
+                self._set_timing_stats(result, timer)
+                item_times.append(result.processing_time)
+                continue
+            
+            try:
+                with timer.stage('preprocess'):
+                    processed_text = tts_input.processed_text
+                    if processed_text is None:
+                        processed_text = self._preprocess_chinese_text(tts_input.text, timer)
+                    sentences = synthesizer.split_into_sentences(processed_text) if tts_input.split_sentences else [processed_text]
+                speaker_key = (tts_input.speaker_wav,) if isinstance(tts_input.speaker_wav, str) else tuple(tts_input.speaker_wav)
+                
+                item_units = []
+                item_keys = []
+                for sentence_idx, sentence in enumerate(sentences):
+                    with timer.stage('tokenize'):
+                        tokens = decoder.tokenize(sentence, tts_input.language)
+                    item_units.append((result_idx, sentence_idx, tokens))
+                    item_keys.append((
+                        speaker_key, len(tokens),
+                        params['temperature'], params['length_penalty'], params['repetition_penalty'],
+                        params['top_k'], params['top_p'], params['speed']
+                    ))
+                
+                units.extend(item_units)
+                keys.extend(item_keys)
+                sentence_wavs[result_idx] = [None] * len(sentences)
+            except Exception as e:
+                result.error_message = str(e)
+                logger.error(f"Failed to prepare text for batched synthesis: {str(e)}")
+            item_times.append(time.time() - start_time)
+        
+        # 2. 分桶批量解码
+        batches = decoder.make_buckets(keys, batch_size)
+        logger.info(f"Batched synthesis: {len(units)} sentences in {len(batches)} batches (batch size: {batch_size})")
+        
+        for batch in batches:
+            batch_units = [units[i] for i in batch]
+            first_input = results[batch_units[0][0]].input_data
+            params = first_input.additional_params
+            
+            start_time = time.time()
+            batch_timer = StageTimer()
+            try:
+                with batch_timer.stage('conditioning'):
+                    gpt_cond_latent, speaker_embedding = self._get_conditioning_latents(xtts_model, first_input.speaker_wav)
+                wavs = decoder.decode(
+                    [tokens for _, _, tokens in batch_units],
+                    gpt_cond_latent,
+                    speaker_embedding,
+                    timer=batch_timer,
+                    temperature=params['temperature'],
+                    length_penalty=params['length_penalty'],
+                    repetition_penalty=params['repetition_penalty'],
+                    top_k=params['top_k'],
+                    top_p=params['top_p'],
+                    speed=params['speed']
+                )
+                for (result_idx, sentence_idx, _), wav in zip(batch_units, wavs):
+                    if sentence_wavs[result_idx] is not None:
+                        sentence_wavs[result_idx][sentence_idx] = wav
+            except Exception as e:
+                logger.error(f"Failed to decode batch: {str(e)}")
+                for result_idx, _, _ in batch_units:
+                    results[result_idx].error_message = str(e)
+                    sentence_wavs[result_idx] = None
+            
+            # 按batch中的句子数平摊解码时间
+            elapsed = (time.time() - start_time) / len(batch_units)
+            for result_idx, _, _ in batch_units:
+                item_times[result_idx] += elapsed
+                item_timers[result_idx].merge(batch_timer.timings, scale=1.0 / len(batch_units))
+        
+        # 3. 按输入拼接句子并写入各自的输出文件
+        for result_idx, result in enumerate(results):
+            wavs = sentence_wavs[result_idx]
+            if wavs is not None:
+                self._save_batched_result(result, wavs, item_times[result_idx], cache_keys[result_idx],
+                                          item_timers[result_idx])
+            if on_result:
+                on_result(result_idx, result)
+        
+        return results
+    
+    def _save_batched_result(self, result: TTSSynthesisResult, wavs: List[np.ndarray],
+                             decode_time: float, cache_key: Optional[str],
+                             timer: Optional[StageTimer] = None) -> None:
+        """
+        拼接批量解码得到的句子波形并写入输出文件
+        
+        Args:
+            result: 待填充的合成结果
+            wavs: 按句子顺序排列的波形列表
+            decode_time: 该条目分摊的预处理和解码时间（秒）
+            cache_key: 合成结果缓存键
+            timer: 该条目的分阶段计时器
+        """
+        start_time = time.time()
+        timer = timer or StageTimer()
+        output_path = result.input_data.output_path
+        try:
+            audio = []
+            for wav in wavs:
+                audio.append(np.asarray(wav, dtype=np.float32))
+                # 与Synthesizer.tts一致，句子之间插入静音
+                audio.append(np.zeros(10000, dtype=np.float32))
+            audio = np.concatenate(audio)
+            with timer.stage('write'):
+                self.save_audio(audio, output_path)
+            
+            if not os.path.exists(output_path):
+                raise Exception("Output file was not created")
+            result.success = True
+            result.output_file = output_path
+            result.processing_time = decode_time + time.time() - start_time
+            result.audio_duration = len(audio) / self.get_output_sample_rate()
+            self._set_timing_stats(result, timer)
+            logger.info(f"Successfully synthesized text to {output_path} in {result.processing_time:.2f} seconds")
+            if cache_key:
+                self.audio_cache.put(cache_key, output_path, result.input_data.text)
+        except Exception as e:
+            result.error_message = str(e)
+            logger.error(f"Failed to synthesize text: {str(e)}")
+    
+    def _iter_file_corpus(self, input_file: str, normalized: Optional[List[Dict[str, Any]]] = None,
+                          **load_kwargs) -> Iterator[Dict[str, Any]]:
+        """
+        逐条读取一个输入文件的文本字典，启用语料缓存时读取或写入缓存的预处理结果
+        
+        Args:
+            input_file: 输入文件路径
+            normalized: 已在其他进程中读取的文本字典列表，默认为None（读取文件）
+            **load_kwargs: 读取参数，传给TextLoader.iter_text_batches
+            
+        Returns:
+            文本字典的迭代器，启用语料缓存时带processed_text
+        """
+        if self.corpus_cache is not None:
+            return self.corpus_cache.iter_corpus(self.text_loader, input_file, self.preprocessor,
+                                                 normalized=normalized, **load_kwargs)
+        if normalized is not None:
+            return iter(normalized)
+        # CSV和xlsx按列分批读取
+        return itertools.chain.from_iterable(self.text_loader.iter_text_batches(input_file, **load_kwargs))
+    
+    def _iter_parsed_corpora(self, input_files: List[str], output_dir: str,
+                             parse_workers: int = 1) -> Iterator[Tuple[str, Iterator[Dict[str, Any]], str]]:
+        """
+        在进程池中并行读取多个输入文件，按输入顺序产出各文件的文本字典和输出目录
+        
+        每个文件输出到output_dir下以文件名命名的子目录，避免不同文件中相同的ID互相覆盖；
+        已有完整预处理缓存的文件直接在当前进程中读取缓存，不提交到进程池
+        
+        Args:
+            input_files: 输入文件路径列表
+            output_dir: 输出目录
+            parse_workers: 读取文件的进程数，默认为1
+            
+        Returns:
+            (输入文件路径, 文本字典迭代器, 输出目录)元组的迭代器
+        """
+        from src.modules.file_parser import iter_parsed_files, output_subdirs
+        
+        cached = set()
+        cache_dir = None
+        if self.corpus_cache is not None:
+            cached = {path for path in input_files if self.corpus_cache.contains(path, self.preprocessor.name)}
+            cache_dir = self.corpus_cache.cache_dir
+        parsed = iter_parsed_files([path for path in input_files if path not in cached], parse_workers, cache_dir)
+        
+        # 不同目录下的同名文件使用不同的子目录
+        for input_file, subdir in zip(input_files, output_subdirs(input_files)):
+            normalized = None
+            if input_file not in cached:
+                _, normalized = next(parsed)
+            yield input_file, self._iter_file_corpus(input_file, normalized=normalized), os.path.join(output_dir, subdir)
+    
+    def process_text_file(self, input_file: Union[str, List[str]], output_meta_file: str = None, 
                          language: str = "zh-cn", split_sentences: bool = True, 
                          use_same_voice: bool = False,
                          # XTTS模型参数
@@ -259,12 +1202,32 @@ class TTSSynthesizer:
                          top_p: Any = 0.8,
                          speed: Any = 1.0,
                          emotion: str = None,
-                         selected_speaker_wav: str = None) -> List[TTSSynthesisResult]:
+                         selected_speaker_wav: str = None,
+                         max_concurrency: int = 1,
+                         batch_size: int = 1,
+                         resume: bool = False,
+                         manifest_file: str = None,
+                         meta_format: str = None,
+                         output_dir: str = None,
+                         on_result: Optional[Callable[[int, TTSSynthesisResult], None]] = None,
+                         prefetch: int = 256,
+                         return_results: bool = True,
+                         start: int = 0,
+                         stop: Optional[int] = None,
+                         parse_workers: int = 1,
+                         num_shards: int = 1,
+                         shard_index: int = 0) -> List[TTSSynthesisResult]:
         """
         处理文本文件，将其中的文本转换为语音
         
+        文本按流式读取，每次只准备prefetch条输入并合成，内存占用与文件大小无关；
+        指定多个文件时在进程池中并行读取，按文件顺序合并为一个任务，所有文件使用同一个已加载的模型合成，
+        每个文件的音频输出到以文件名命名的子目录，meta文件的source_file列记录每条文本来源的文件；
+        指定num_shards时只合成条目ID哈希到shard_index的条目，多台机器各自处理一个分片，
+        meta文件的input_index列记录条目在输入中的序号，可用`python -m src.modules.sharding`按输入顺序合并
+        
         Args:
-            input_file: 输入文本文件路径
+            input_file: 输入文本文件路径，或多个文件路径的列表
             output_meta_file: 输出meta文件路径，默认为None（自动生成）
             language: 语言代码，默认为"zh-cn"
             split_sentences: 是否分割句子，默认为True
@@ -276,163 +1239,266 @@ class TTSSynthesizer:
             top_p: 较低的值会使解码器产生更"可能"（也就是更无聊）的输出，默认为0.8
             speed: 生成音频的速度比率，默认为1.0
             emotion: 情感类型，如果指定，将使用data_voice/emotion目录下对应的音频作为额外参考
+            selected_speaker_wav: 指定使用的音色参考音频，默认为None（随机选择）
+            max_concurrency: 并行合成的进程数，默认为1（不并行）
+            batch_size: 批量解码时每个batch的最大句子数，默认为1（逐条解码）
+            resume: 是否根据任务清单续跑，跳过已完成的条目，默认为False
+            manifest_file: 任务清单文件路径，默认为None（输出目录下的<输入文件名>.manifest.jsonl）
+            meta_format: meta文件格式，'csv'或'jsonl'，默认为None（根据output_meta_file扩展名判断，否则为csv）
+            output_dir: 本次任务的输出目录，默认为None（使用self.output_dir），并发任务应各自指定
+            on_result: 每条结果完成时的回调，参数为(输入序号, 合成结果)，可用于上报进度
+            prefetch: 每个窗口读取并合成的条目数，默认为256
+            return_results: 是否保留并返回所有合成结果，默认为True；大文件可设为False，
+                            通过on_result和meta文件获取结果，此时返回空列表
+            start: 起始记录序号，只支持JSONL文件，通过字节偏移索引直接定位，默认为0
+            stop: 结束记录序号（不包含），只支持JSONL文件，默认为None（读到文件结尾）
+            parse_workers: 多个输入文件时读取文件的进程数，默认为1（在当前进程中依次读取）
+            num_shards: 分片总数，默认为1（不分片）
+            shard_index: 本次处理的分片序号，从0开始，默认为0
             
         Returns:
-            合成结果列表
+            合成结果列表，按输入顺序
         """
-        logger.info(f"Processing text file: {input_file}")
+        if prefetch < 1:
+            raise ValueError("Prefetch must be at least 1")
+        validate_shard(num_shards, shard_index)
+        input_files = [input_file] if isinstance(input_file, str) else list(input_file)
+        if not input_files:
+            raise ValueError("No input files to process")
+        logger.info(f"Processing text file: {input_file if len(input_files) == 1 else f'{len(input_files)} files'}")
+        output_dir = output_dir or self.output_dir
         
-        # 加载文本
-        texts = self.text_loader.load_text_file(input_file)
-        logger.info(f"Loaded {len(texts)} texts")
+        # 流式加载文本；启用语料缓存时读取缓存的预处理结果，合成时跳过中文预处理
+        load_kwargs = {'start': start, 'stop': stop} if start or stop is not None else {}
+        if len(input_files) == 1:
+            corpora = [(input_files[0], self._iter_file_corpus(input_files[0], **load_kwargs), output_dir)]
+        elif load_kwargs:
+            raise ValueError("Record ranges are only supported for a single input file")
+        else:
+            corpora = self._iter_parsed_corpora(input_files, output_dir, parse_workers)
         
-        # 转换为TTS输入格式
-        tts_inputs = self.text_loader.convert_to_tts_inputs(
-            texts, 
-            output_dir=self.output_dir,
-            language=language
-        )
+        def iter_tts_inputs() -> Iterator[Dict[str, Any]]:
+            """转换为TTS输入格式，记录来源文件、条目ID和输入序号，分片时只保留本分片的条目"""
+            input_index = 0
+            for source_file, texts, file_output_dir in corpora:
+                subdir = os.path.basename(file_output_dir) if len(input_files) > 1 else None
+                for tts_input in self.text_loader.iter_tts_inputs(texts, output_dir=file_output_dir, language=language):
+                    item_id = make_item_id(tts_input['id'], subdir)
+                    if shard_of(item_id, num_shards) == shard_index:
+                        tts_input['source_file'] = source_file
+                        tts_input['item_id'] = item_id
+                        tts_input['input_index'] = input_index
+                        yield tts_input
+                    input_index += 1
+        
+        tts_inputs = iter_tts_inputs()
         
        # 如果需要使用相同的音色，预先选择一个
        # selected_speaker_wav = selected_speaker_wav
         if use_same_voice and not selected_speaker_wav:
-            selected_speaker_wav = voice_library.get_random_prompt()
+            selected_speaker_wav = get_voice_library().get_random_prompt()
             logger.info(f"Selected speaker wav for all texts: {selected_speaker_wav}")
         
         # 检查并获取情感音频文件路径
-        emotion_wav = None
-        if emotion and emotion != 'neutral':
-            emotion_wav_path = os.path.join("data_voice", "emotion", f"{emotion}.wav")
-            if os.path.exists(emotion_wav_path):
-                emotion_wav = emotion_wav_path
-                logger.info(f"Found emotion audio file: {emotion_wav}")
-            else:
-                logger.warning(f"Emotion audio file not found: {emotion_wav_path}")
+        emotion_wav = self.resolve_emotion_wav(emotion)
         
-        # 执行合成
-        results = []
-        for tts_input in tts_inputs:
-            # 为每个文本选择一个音色（除非指定使用相同的音色）
-            if selected_speaker_wav:
-                # 如果指定了音色，使用指定的音色
-                speaker_wav = selected_speaker_wav
-                logger.info(f"Using selected speaker wav: {speaker_wav}")
-            else:
-                # 否则使用随机选择的音色
-                speaker_wav = voice_library.get_random_prompt()
-                logger.info(f"Using random speaker wav: {speaker_wav}")
-            
-            # 如果有情感音频，使用情感音频和随机选择的音频共同作为参考
-            if emotion_wav:
-                # 创建一个特殊的输出路径，包含emotion标记
-                base_output_path = tts_input['output_path']
-                dir_name = os.path.dirname(base_output_path)
-                base_name = os.path.basename(base_output_path)
-                name_without_ext, ext = os.path.splitext(base_name)
-                emotion_output_path = os.path.join(dir_name, f"{name_without_ext}_{emotion}{ext}")
-
-                # 同时使用随机选择的音频和情感音频进行一次合成
-                result = self.synthesize_text(
-                    text=tts_input['text'],
-                    speaker_wav=[speaker_wav, emotion_wav],  # 同时传入随机参考音频和情感参考音频
-                    output_path=emotion_output_path,
-                    language=language,
-                    split_sentences=split_sentences,
+        def iter_batch_inputs() -> Iterator[TTSInput]:
+            """逐条准备合成输入，音色在父进程中选择，保证并行时的选择结果与顺序执行一致"""
+            for tts_input in tts_inputs:
+                # 为每个文本选择一个音色（除非指定使用相同的音色）
+                if selected_speaker_wav:
+                    # 如果指定了音色，使用指定的音色
+                    speaker_wav = selected_speaker_wav
+                    logger.info(f"Using selected speaker wav: {speaker_wav}")
+                else:
+                    # 否则使用随机选择的音色
+                    speaker_wav = get_voice_library().get_random_prompt()
+                    logger.info(f"Using random speaker wav: {speaker_wav}")
+                
+                output_path = tts_input['output_path']
+                additional_params = {
                     # XTTS特定参数
-                    temperature=temperature,
-                    length_penalty=length_penalty,
-                    repetition_penalty=repetition_penalty,
-                    top_k=top_k,
-                    top_p=top_p,
-                    speed=speed,
-                    emotion=emotion
-                )
-                results.append(result)
-
-            else:
-                # 没有情感音频，只使用随机选择的音频
-                result = self.synthesize_text(
+                    'temperature': temperature,
+                    'length_penalty': length_penalty,
+                    'repetition_penalty': repetition_penalty,
+                    'top_k': top_k,
+                    'top_p': top_p,
+                    'speed': speed,
+                    'emotion': emotion or 'neutral'
+                }
+                
+                # 如果有情感音频，使用情感音频和随机选择的音频共同作为参考
+                if emotion_wav:
+                    # 创建一个特殊的输出路径，包含emotion标记
+                    dir_name = os.path.dirname(output_path)
+                    base_name = os.path.basename(output_path)
+                    name_without_ext, ext = os.path.splitext(base_name)
+                    output_path = os.path.join(dir_name, f"{name_without_ext}_{emotion}{ext}")
+                    # 同时传入随机参考音频和情感参考音频
+                    speaker_wav = [speaker_wav, emotion_wav]
+                
+                yield TTSInput(
                     text=tts_input['text'],
                     speaker_wav=speaker_wav,
-                    output_path=tts_input['output_path'],
+                    output_path=output_path,
                     language=language,
                     split_sentences=split_sentences,
-                    # XTTS特定参数
-                    temperature=temperature,
-                    length_penalty=length_penalty,
-                    repetition_penalty=repetition_penalty,
-                    top_k=top_k,
-                    top_p=top_p,
-                    speed=speed,
-                    emotion=emotion or 'neutral'
+                    additional_params=additional_params,
+                    processed_text=tts_input.get('processed_text'),
+                    source_file=tts_input['source_file'],
+                    item_id=tts_input['item_id'],
+                    input_index=tts_input['input_index']
                 )
-                results.append(result)
         
-        # 生成meta文件
-        self._generate_meta_file(results, output_meta_file)
+        # 创建任务清单，续跑时跳过已完成且输出文件校验通过的条目
+        if manifest_file is None:
+            # 多个输入文件时使用固定的清单名称，续跑时输入文件列表应保持不变
+            input_name = os.path.splitext(os.path.basename(input_files[0]))[0] if len(input_files) == 1 else 'inputs'
+            if load_kwargs:
+                # 按记录范围处理时每个范围使用各自的清单，清单中的序号相对于范围起点
+                input_name = f"{input_name}.{start}-{'' if stop is None else stop}"
+            if num_shards > 1:
+                # 每个分片使用各自的清单，清单中的序号是条目在分片内的序号
+                input_name = f"{input_name}.shard{shard_index}of{num_shards}"
+            manifest_file = os.path.join(output_dir, f"{input_name}.manifest.jsonl")
+        
+        # meta文件随合成进度逐行写入
+        output_meta_file = self._resolve_meta_file(output_meta_file, meta_format or 'csv', output_dir)
+        
+        # 并行合成时所有窗口复用同一组工作进程，只在第一个需要并行的窗口启动
+        pool = None
+        if max_concurrency > 1:
+            from src.modules.worker_pool import SynthesisWorkerPool
+            pool = SynthesisWorkerPool(self, num_workers=min(max_concurrency, prefetch), cpu_config=self.cpu_config)
+        
+        results: List[TTSSynthesisResult] = []
+        total_count = success_count = skipped_count = 0
+        # 汇总各阶段耗时，便于定位批量任务的瓶颈
+        stage_totals = StageTimer()
+        
+        try:
+            with JobManifest(manifest_file, resume=resume) as manifest, \
+                    MetaWriter(output_meta_file, meta_format) as meta_writer:
+                
+                def collect(idx: int, result: TTSSynthesisResult) -> None:
+                    nonlocal success_count
+                    meta_writer.write(idx, result)
+                    success_count += bool(result.success)
+                    stage_totals.merge(result.stage_timings)
+                    if return_results:
+                        results.append(result)
+                    if on_result:
+                        on_result(idx, result)
+                
+                batch_inputs = iter_batch_inputs()
+                while True:
+                    window = list(itertools.islice(batch_inputs, prefetch))
+                    if not window:
+                        break
+                    window_start = total_count
+                    total_count += len(window)
+                    
+                    # 窗口内按输入顺序产出结果：已完成的条目直接复用，其余条目合成后按序回填
+                    window_results: List[Optional[TTSSynthesisResult]] = [None] * len(window)
+                    pending_offsets = []
+                    for offset, batch_input in enumerate(window):
+                        completed = manifest.get_completed(window_start + offset, batch_input) if resume else None
+                        if completed:
+                            window_results[offset] = completed
+                        else:
+                            pending_offsets.append(offset)
+                    skipped_count += len(window) - len(pending_offsets)
+                    
+                    next_offset = 0
+                    
+                    def flush() -> None:
+                        """按顺序输出窗口内已就绪的结果"""
+                        nonlocal next_offset
+                        while next_offset < len(window) and window_results[next_offset] is not None:
+                            collect(window_start + next_offset, window_results[next_offset])
+                            next_offset += 1
+                    
+                    def record_result(pending_idx: int, result: TTSSynthesisResult) -> None:
+                        offset = pending_offsets[pending_idx]
+                        window_results[offset] = result
+                        manifest.record(window_start + offset, result)
+                        flush()
+                    
+                    flush()
+                    # 执行合成
+                    if pending_offsets:
+                        if pool is not None and len(pending_offsets) > 1:
+                            pool.start()
+                        self.synthesize_batch(TTSBatchInput(
+                            inputs=[window[offset] for offset in pending_offsets],
+                            max_concurrency=max_concurrency,
+                            batch_size=batch_size
+                        ), on_result=record_result, pool=pool)
+        finally:
+            if pool is not None:
+                pool.close()
+        
+        if resume:
+            logger.info(f"Resumed job: {skipped_count} items already completed, "
+                        f"{total_count - skipped_count} synthesized")
         
         # 统计结果
-        success_count = sum(1 for r in results if r.success)
-        failure_count = len(results) - success_count
+        failure_count = total_count - success_count
         logger.info(f"Text file processing completed: {success_count} succeeded, {failure_count} failed")
         
+        if stage_totals.timings:
+            summary = ', '.join(f"{stage}={seconds:.2f}s" for stage, seconds in stage_totals.timings.items())
+            logger.info(f"Stage timings (total): {summary}")
+        logger.info(f"Speaker latent cache stats: {self.speaker_cache.stats()}")
+        
         return results
     
-    def _generate_meta_file(self, results: List[TTSSynthesisResult], output_meta_file: str = None) -> str:
+    def _resolve_meta_file(self, output_meta_file: str = None, meta_format: str = 'csv',
+                           output_dir: str = None) -> str:
+        """
+        确定meta文件路径，未指定时在输出目录下按时间戳自动生成
+        
+        Args:
+            output_meta_file: 输出meta文件路径，默认为None（自动生成）
+            meta_format: meta文件格式，'csv'或'jsonl'
+            output_dir: 输出目录，默认为None（使用self.output_dir）
+            
+        Returns:
+            meta文件路径
+        """
+        if output_meta_file is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_meta_file = os.path.join(output_dir or self.output_dir, f"meta_{timestamp}.{meta_format}")
+        return output_meta_file
+    
+    def _generate_meta_file(self, results: List[TTSSynthesisResult], output_meta_file: str = None,
+                            meta_format: Optional[str] = None) -> str:
         """
         生成meta文件
         Args:
             results: 合成结果列表
             output_meta_file: 输出meta文件路径，默认为None（自动生成）
+            meta_format: meta文件格式，'csv'或'jsonl'，默认根据扩展名判断
         Returns:
             生成的meta文件路径
         """
-        # 如果未指定输出meta文件路径，自动生成一个
-        if output_meta_file is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_meta_file = os.path.join(self.output_dir, f"meta_{timestamp}.csv")
-        
-        logger.info(f"Generating meta file: {output_meta_file}")
-        
-        # 准备数据
-        meta_data = []
-        for result in results:
-            input_data = result.input_data
-            # 获取XTTS参数值（如果有）
-            additional_params = input_data.additional_params or {}
-            
-            meta_row = {
-                'text': input_data.text,
-                'prompt_wav_path': input_data.speaker_wav,
-                'output_audio_path': result.output_file if result.success else '',
-                'success': 'Yes' if result.success else 'No',
-                'error_message': result.error_message if not result.success else '',
-                'processing_time': result.processing_time if result.processing_time else '',
-                # XTTS参数
-                'temperature': additional_params.get('temperature', ''),
-                'length_penalty': additional_params.get('length_penalty', ''),
-                'repetition_penalty': additional_params.get('repetition_penalty', ''),
-                'top_k': additional_params.get('top_k', ''),
-                'top_p': additional_params.get('top_p', ''),
-                'speed': additional_params.get('speed', ''),
-                'emotion': additional_params.get('emotion', '')
-            }
-            meta_data.append(meta_row)
-        
-        # 创建DataFrame并保存为CSV
-        df = pd.DataFrame(meta_data)
-        df.to_csv(output_meta_file, index=False, encoding='utf-8')
-        
-        logger.info(f"Meta file generated: {output_meta_file}")
+        output_meta_file = self._resolve_meta_file(output_meta_file, meta_format or 'csv')
+        with MetaWriter(output_meta_file, meta_format) as meta_writer:
+            for idx, result in enumerate(results):
+                meta_writer.write(idx, result)
         return output_meta_file
 
 def main():
     """\主函数"""
     # 解析命令行参数
     parser = argparse.ArgumentParser(description='TTS Text Synthesizer')
-    parser.add_argument('--input', type=str, required=True, help='Input text file path (Excel, CSV, TXT, JSON)')
+    parser.add_argument('--input', type=str, nargs='+', required=True,
+                        help='Input text files, directories or glob patterns (Excel, CSV, TXT, JSON, JSONL)')
+    parser.add_argument('--parse-workers', type=int, default=min(4, os.cpu_count() or 1),
+                        help='Processes used to parse multiple input files (default: min(4, CPU count))')
     parser.add_argument('--output-dir', type=str, default='output', help='Output directory path')
     parser.add_argument('--output-meta', type=str, help='Output meta file path')
+    parser.add_argument('--meta-format', type=str, choices=['csv', 'jsonl'], help='Meta file format (default: by extension, else csv)')
     parser.add_argument('--language', type=str, default='zh-cn', help='Language code (default: zh-cn)')
     parser.add_argument('--no-split-sentences', action='store_true', help='Do not split sentences')
     parser.add_argument('--same-voice', action='store_true', help='Use the same voice for all texts')
@@ -445,16 +1511,82 @@ def main():
     parser.add_argument('--top-p', type=float, default=0.8, help='XTTS top-p (default: 0.8)')
     parser.add_argument('--speed', type=float, default=1.0, help='XTTS speed (default: 1.0)')
     parser.add_argument('--random-params', action='store_true', help='Use random parameters for each text')
+    parser.add_argument('--max-concurrency', type=int, default=1, help='Number of synthesis worker processes (default: 1)')
+    parser.add_argument('--batch-size', type=int, default=1, help='Max sentences per batched XTTS decode (default: 1)')
+    parser.add_argument('--start', type=int, default=0, help='First record to process, JSONL input only (default: 0)')
+    parser.add_argument('--stop', type=int, help='Stop before this record, JSONL input only (default: end of file)')
+    parser.add_argument('--num-shards', type=int, default=1, help='Split the input into this many shards by item id hash (default: 1)')
+    parser.add_argument('--shard-index', type=int, default=0, help='Shard to process on this host, 0-based (default: 0)')
+    parser.add_argument('--prefetch', type=int, default=256, help='Number of input items read and synthesized per window (default: 256)')
+    parser.add_argument('--resume', action='store_true', help='Resume an interrupted job, skipping completed items')
+    parser.add_argument('--manifest', type=str, help='Job manifest file path (default: <output-dir>/<input-name>.manifest.jsonl)')
+    parser.add_argument('--cache-dir', type=str, help='Enable the synthesis result cache in this directory')
+    parser.add_argument('--corpus-cache-dir', type=str, help='Cache the preprocessed input corpus in this directory')
+    parser.add_argument('--cache-max-size-mb', type=float, default=10240, help='Max audio cache size in MB (default: 10240)')
+    parser.add_argument('--model', type=str, help='TTS model name (default: XTTS v2)')
+    parser.add_argument('--model-memory-budget-mb', type=float, help='Evict idle models when loaded models exceed this many MB (default: unlimited)')
+    parser.add_argument('--intra-op-threads', type=int, help='Torch intra-op threads, also limits BLAS/OpenMP threads')
+    parser.add_argument('--inter-op-threads', type=int, help='Torch inter-op threads')
+    parser.add_argument('--cpu-cores', type=str, help='Bind to these CPU cores, e.g. "0-7,16-23"')
+    parser.add_argument('--numa-node', type=int, help='Bind to the CPU cores of this NUMA node')
+    parser.add_argument('--pin-workers', action='store_true', help='Split the cores evenly and pin each worker process')
+    parser.add_argument('--autotune-threads', action='store_true', help='Measure RTF at a few thread counts and use the best one')
+    parser.add_argument('--preprocessor', type=str, choices=list(PREPROCESSORS), default='bert',
+                        help='Chinese text preprocessing: bert (bert-base-chinese tokenizer) or regex (no tokenizer) (default: bert)')
+    parser.add_argument('--precision', type=str, choices=['fp32', 'int8', 'bf16'], default='fp32',
+                        help='Inference precision: fp32, int8 (dynamic quantized GPT) or bf16 (GPT autocast) (default: fp32)')
     
     args = parser.parse_args()
     
     try:
+        # 展开目录和通配符，在加载模型前检查输入
+        from src.modules.file_parser import expand_input_paths
+        input_files = expand_input_paths(args.input)
+        if not input_files:
+            raise ValueError(f"No input files found: {' '.join(args.input)}")
+        validate_shard(args.num_shards, args.shard_index)
+        
+        # 创建合成结果缓存
+        audio_cache = None
+        if args.cache_dir:
+            from src.modules.audio_cache import AudioCache
+            audio_cache = AudioCache(cache_dir=args.cache_dir, max_size_bytes=int(args.cache_max_size_mb * 1024 ** 2))
+        
+        # 预处理后语料的缓存
+        corpus_cache = None
+        if args.corpus_cache_dir:
+            from src.modules.corpus_cache import CorpusCache
+            corpus_cache = CorpusCache(cache_dir=args.corpus_cache_dir)
+        
+        # CPU线程和绑核配置
+        cpu_config = CPUConfig(
+            intra_op_threads=args.intra_op_threads,
+            inter_op_threads=args.inter_op_threads,
+            cpu_cores=parse_cpu_list(args.cpu_cores) if args.cpu_cores else None,
+            numa_node=args.numa_node,
+            pin_workers=args.pin_workers
+        )
+        
+        # 模型管理器，设置内存预算时超出预算淘汰空闲模型
+        from src.modules.model_manager import ModelManager
+        model_manager = ModelManager(memory_budget_mb=args.model_memory_budget_mb)
+        
         # 创建TTS合成器
-        synthesizer = TTSSynthesizer(output_dir=args.output_dir)
+        synthesizer = TTSSynthesizer(output_dir=args.output_dir, model_manager=model_manager, audio_cache=audio_cache,
+                                     precision=args.precision, model_name=args.model, cpu_config=cpu_config,
+                                     preprocessor=args.preprocessor, corpus_cache=corpus_cache)
+        if args.autotune_threads:
+            synthesizer.autotune_threads(get_voice_library().get_random_prompt(), language=args.language)
+        
+        # 处理文本文件，结果逐条计数而不保留，大文件的内存占用与条目数无关
+        counts = {'total': 0, 'success': 0}
+        
+        def count_result(idx: int, result) -> None:
+            counts['total'] += 1
+            counts['success'] += bool(result.success)
         
-        # 处理文本文件
-        results = synthesizer.process_text_file(
-            input_file=args.input,
+        synthesizer.process_text_file(
+            input_file=input_files[0] if len(input_files) == 1 else input_files,
             output_meta_file=args.output_meta,
             language=args.language,
             split_sentences=not args.no_split_sentences,
@@ -465,16 +1597,29 @@ def main():
             repetition_penalty='random' if args.random_params else args.repetition_penalty,
             top_k='random' if args.random_params else args.top_k,
             top_p='random' if args.random_params else args.top_p,
-            speed='random' if args.random_params else args.speed
+            speed='random' if args.random_params else args.speed,
+            max_concurrency=args.max_concurrency,
+            batch_size=args.batch_size,
+            resume=args.resume,
+            manifest_file=args.manifest,
+            meta_format=args.meta_format,
+            on_result=count_result,
+            prefetch=args.prefetch,
+            start=args.start,
+            stop=args.stop,
+            parse_workers=args.parse_workers,
+            num_shards=args.num_shards,
+            shard_index=args.shard_index,
+            return_results=False
         )
         
         # 统计结果
-        success_count = sum(1 for r in results if r.success)
-        failure_count = len(results) - success_count
+        success_count = counts['success']
+        failure_count = counts['total'] - success_count
         
         
         print(f"\nProcessing completed:")
-        print(f"  Total texts: {len(results)}")
+        print(f"  Total texts: {counts['total']}")
         print(f"  Successful: {success_count}")
         print(f"  Failed: {failure_count}")
     except Exception as e:
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+测试预处理后语料的缓存（CorpusCache）
+
+检查命中缓存时的结果与直接读取并预处理的结果一致、只含规范化结果的条目可补做预处理、
+读取中断不会留下条目、输入文件内容变化时缓存失效，以及条目被其他进程淘汰时按未命中处理
+用法：python test_corpus_cache.py 或 pytest test_corpus_cache.py
+"""
+
+import os
+import sys
+import logging
+import pathlib
+import tempfile
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+logging.basicConfig(level=logging.WARNING)
+
+from src.modules.corpus_cache import CorpusCache
+from src.modules.text_loader import TextLoader
+from src.modules.text_preprocessor import RegexPreprocessor
+
+TEXTS = [
+    "今天天气很好，我们一起去公园散步吧。",
+    "温度范围为15-20℃，湿度约为60％。",
+    "Hello, World! 我在2023年买了手机。",
+    "会议定于3月15日下午2点召开，出席率达到95%。"
+]
+
+class CountingPreprocessor(RegexPreprocessor):
+    """记录预处理调用次数"""
+    calls = 0
+
+    def preprocess(self, text, timer=None):
+        CountingPreprocessor.calls += 1
+        return super().preprocess(text, timer)
+
+def entries(cache):
+    return sorted(name for name in os.listdir(cache.cache_dir) if name.endswith('.jsonl.gz'))
+
+def make_input(tmp_path):
+    input_file = os.path.join(tmp_path, 'input.txt')
+    with open(input_file, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(TEXTS * 50) + '\n')
+    return input_file
+
+def test_corpus_cache(tmp_path):
+    input_file = make_input(tmp_path)
+    loader = TextLoader()
+    preprocessor = CountingPreprocessor()
+    cache = CorpusCache(cache_dir=os.path.join(tmp_path, 'cache'))
+    expected = loader.load_text_file(input_file)
+    for text_dict in expected:
+        text_dict['processed_text'] = RegexPreprocessor().preprocess(text_dict['text'])
+
+    # 只读取一部分就停止，不应留下条目
+    corpus = cache.iter_corpus(loader, input_file, preprocessor)
+    next(corpus)
+    corpus.close()
+    assert entries(cache) == []
+
+    # 解析文件时只写入规范化结果，合成时在此基础上补做预处理
+    normalized = list(cache.iter_corpus(loader, input_file))
+    assert normalized == [{k: v for k, v in d.items() if k != 'processed_text'} for d in expected]
+    CountingPreprocessor.calls = 0
+    first = list(cache.iter_corpus(loader, input_file, preprocessor))
+    assert first == expected
+    assert CountingPreprocessor.calls == len(expected)
+    assert len(entries(cache)) == 2
+
+    # 命中缓存时跳过预处理
+    CountingPreprocessor.calls = 0
+    second = list(cache.iter_corpus(loader, input_file, preprocessor))
+    assert second == expected
+    assert CountingPreprocessor.calls == 0
+
+    # 文件内容变化后重新处理
+    with open(input_file, 'a', encoding='utf-8') as f:
+        f.write("新增的一行。\n")
+    third = list(cache.iter_corpus(loader, input_file, preprocessor))
+    assert len(third) == len(expected) + 1
+    assert len(entries(cache)) == 4
+
+    # 超过上限时淘汰旧条目
+    small = CorpusCache(cache_dir=cache.cache_dir, max_entries=2)
+    list(small.iter_corpus(loader, input_file, preprocessor, text_column='text'))
+    assert len(entries(cache)) == 2
+
+def test_vanished_entry(tmp_path):
+    input_file = make_input(tmp_path)
+    loader = TextLoader()
+    cache = CorpusCache(cache_dir=os.path.join(tmp_path, 'cache'))
+    expected = list(cache.iter_corpus(loader, input_file))
+    path = cache._entry_path(cache.make_key(input_file))
+
+    # 打开条目后被删除（如其他进程淘汰）仍可以读完
+    corpus = cache.iter_corpus(loader, input_file)
+    first = next(corpus)
+    os.remove(path)
+    assert [first] + list(corpus) == expected
+
+    # 条目已被删除时按未命中处理，重新写入条目
+    assert list(cache.iter_corpus(loader, input_file)) == expected
+    assert os.path.exists(path)
+
+    # 淘汰时跳过已消失的条目（这里用指向不存在文件的符号链接模拟），其余条目照常淘汰
+    os.symlink(os.path.join(tmp_path, 'missing'), os.path.join(cache.cache_dir, 'vanished.jsonl.gz'))
+    small = CorpusCache(cache_dir=cache.cache_dir, max_entries=1)
+    list(small.iter_corpus(loader, input_file, text_column='text'))
+    assert [name for name in entries(cache) if name != 'vanished.jsonl.gz'] == \
+        [os.path.basename(small._entry_path(small.make_key(input_file, text_column='text')))]
+
+if __name__ == "__main__":
+    for test in (test_corpus_cache, test_vanished_entry):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            test(pathlib.Path(tmp_dir))
+    print("=== 测试完成 ===")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+测试多文件输入：目录和通配符的展开，以及进程池并行读取的结果与依次读取一致且保持输入顺序
+用法：python test_file_parser.py 或 pytest test_file_parser.py
+"""
+
+import os
+import sys
+import json
+import logging
+import tempfile
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+logging.basicConfig(level=logging.WARNING)
+
+from src.modules.file_parser import expand_input_paths, iter_parsed_files
+
+def make_inputs(tmp_dir):
+    """创建不同格式的输入文件，返回输入目录"""
+    input_dir = os.path.join(tmp_dir, 'inputs')
+    os.makedirs(os.path.join(input_dir, 'nested'))
+    for i in range(6):
+        with open(os.path.join(input_dir, f"part_{i}.txt"), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(f"第{i}个文件的第{j}行，温度为{j}℃。" for j in range(i + 1)))
+    with open(os.path.join(input_dir, 'part_6.csv'), 'w', encoding='utf-8') as f:
+        f.write('text,speaker\n增长了5%,s1\n范围10-20,s2\n')
+    with open(os.path.join(input_dir, 'part_7.jsonl'), 'w', encoding='utf-8') as f:
+        f.write('\n'.join(json.dumps({'text': f"记录{i}"}, ensure_ascii=False) for i in range(3)) + '\n')
+    with open(os.path.join(input_dir, 'notes.md'), 'w', encoding='utf-8') as f:
+        f.write('不支持的格式\n')
+    with open(os.path.join(input_dir, 'nested', 'deep.txt'), 'w', encoding='utf-8') as f:
+        f.write('子目录中的文件\n')
+    return input_dir
+
+@pytest.fixture
+def input_dir(tmp_path):
+    return make_inputs(str(tmp_path))
+
+def test_expand(input_dir):
+    # 目录展开为支持格式的文件并排序
+    paths = expand_input_paths([input_dir])
+    names = [os.path.basename(path) for path in paths]
+    assert names == [f"part_{i}.txt" for i in range(6)] + ['part_6.csv', 'part_7.jsonl']
+
+    # 通配符递归匹配
+    paths = expand_input_paths([os.path.join(input_dir, '**', '*.txt')])
+    assert 'deep.txt' in [os.path.basename(path) for path in paths]
+    assert len(paths) == 7
+
+    # 重复匹配的文件只保留一次
+    paths = expand_input_paths([os.path.join(input_dir, 'part_1.txt'), input_dir])
+    assert len(paths) == 8
+    assert os.path.basename(paths[0]) == 'part_1.txt'
+
+    with pytest.raises(FileNotFoundError):
+        expand_input_paths([os.path.join(input_dir, 'missing.txt')])
+
+def test_parallel_parse(input_dir):
+    paths = expand_input_paths([input_dir])
+    sequential = list(iter_parsed_files(paths, num_workers=1))
+    parallel = list(iter_parsed_files(paths, num_workers=3))
+    # 并行读取的结果和顺序与依次读取一致
+    assert parallel == sequential
+    assert [len(texts) for _, texts in parallel] == [1, 2, 3, 4, 5, 6, 2, 3]
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        inputs = make_inputs(tmp_dir)
+        test_expand(inputs)
+        test_parallel_parse(inputs)
+    print("=== 测试完成 ===")
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+测试模块导入耗时，确保导入时不会加载torch、transformers、pandas、librosa等重型依赖
+
+每个检查在独立的子进程中运行（python -X importtime），不受当前进程已导入模块的影响
+"""
+
+import os
+import sys
+import json
+import time
+import subprocess
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+# 导入时间预算（秒）
+IMPORT_BUDGET = 1.0
+
+# 导入项目模块时不应加载的重型依赖
+HEAVY_MODULES = ['torch', 'transformers', 'TTS', 'pandas', 'librosa']
+
+# 需要快速导入的模块
+FAST_MODULES = [
+    'src.tts_synthesizer',
+    'src.modules.model_manager',
+    'src.modules.text_loader',
+    'src.modules.noise_mixer',
+    'src.modules.voice_library'
+]
+
+def run_python(args):
+    """在子进程中运行python，返回(耗时, 标准输出, 标准错误)"""
+    start_time = time.perf_counter()
+    proc = subprocess.run([sys.executable] + args, cwd=project_root, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start_time
+    if proc.returncode != 0:
+        errors = '\n'.join(line for line in proc.stderr.splitlines() if not line.startswith('import time:'))
+        raise RuntimeError(f"python {' '.join(args)} failed:\n{errors}")
+    return elapsed, proc.stdout, proc.stderr
+
+def slowest_imports(importtime_output, top=5):
+    """解析-X importtime的输出，返回累计耗时最长的模块"""
+    imports = []
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imports.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+@pytest.mark.parametrize('module', FAST_MODULES)
+def test_module_import(module):
+    """测试单个模块的导入耗时和加载的依赖"""
+    code = (f"import sys, json; import {module}; "
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))")
+    elapsed, stdout, stderr = run_python(['-X', 'importtime', '-c', code])
+    loaded = json.loads(stdout.strip().splitlines()[-1])
+    slowest = slowest_imports(stderr)
+    import_time = slowest[0][0] if slowest else elapsed
+
+    print(f"{module}: {import_time:.3f}s (process {elapsed:.3f}s)")
+    for seconds, name in slowest:
+        print(f"    {seconds:.3f}s  {name}")
+
+    assert not loaded, f"{module} imports heavy modules: {loaded}"
+    assert import_time < IMPORT_BUDGET, f"{module} import took {import_time:.3f}s, budget is {IMPORT_BUDGET}s"
+
+def test_cli_help():
+    """测试命令行--help不加载模型和重型依赖"""
+    elapsed, _, _ = run_python(['-m', 'src.tts_synthesizer', '--help'])
+    print(f"src.tts_synthesizer --help: {elapsed:.3f}s")
+    assert elapsed < IMPORT_BUDGET * 2, f"--help took {elapsed:.3f}s"
+
+def run_all():
+    """依次运行所有检查，输出每个失败的检查，全部通过时返回True"""
+    print("=== 测试模块导入耗时 ===")
+    failures = []
+    for check in [lambda module=module: test_module_import(module) for module in FAST_MODULES] + [test_cli_help]:
+        try:
+            check()
+        except (AssertionError, RuntimeError) as e:
+            print(f"失败: {str(e)}")
+            failures.append(str(e))
+
+    print("\n=== 测试完成 ===")
+    return not failures
+
+if __name__ == "__main__":
+    sys.exit(0 if run_all() else 1)
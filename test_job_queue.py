@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+测试任务队列中流式任务的优先级
+
+检查流式任务排在等待中的普通任务之前，以及正在执行的普通任务在条目之间让出工作线程，
+流式任务在普通任务剩余的条目之前执行
+用法：python test_job_queue.py 或 pytest test_job_queue.py
+"""
+
+import os
+import sys
+import logging
+import threading
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+logging.basicConfig(level=logging.WARNING)
+
+from src.modules.job_queue import TTSJobQueue
+
+def make_stream(events, name):
+    """创建记录执行顺序的流式任务函数"""
+    def synthesize_chunks(job):
+        events.append(name)
+        yield name.encode()
+    return synthesize_chunks
+
+def test_stream_runs_between_batch_items():
+    job_queue = TTSJobQueue(max_workers=1)
+    events = []
+    first_item_started = threading.Event()
+    stream_submitted = threading.Event()
+
+    def run_batch(job):
+        for index in range(3):
+            if index == 0:
+                first_item_started.set()
+                assert stream_submitted.wait(5)
+            events.append(f"item_{index}")
+            job_queue.run_pending_streams()
+        return {'items': 3}
+
+    batch_job = job_queue.submit(run_batch, output_dir='', total=3)
+    assert first_item_started.wait(5)
+    stream_job = job_queue.submit_stream(make_stream(events, 'stream'))
+    stream_submitted.set()
+
+    assert list(stream_job.iter_stream()) == [b'stream']
+    assert batch_job.wait(5) and batch_job.status == 'completed'
+    assert stream_job.status == 'completed'
+    # 流式任务在第一个条目完成后执行，排在剩余条目之前
+    assert events == ['item_0', 'stream', 'item_1', 'item_2']
+
+def test_stream_runs_before_queued_batch():
+    job_queue = TTSJobQueue(max_workers=1)
+    events = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking(job):
+        started.set()
+        assert release.wait(5)
+        events.append('blocking')
+        return {}
+
+    def batch(job):
+        events.append('batch')
+        return {}
+
+    job_queue.submit(blocking, output_dir='')
+    assert started.wait(5)
+    batch_job = job_queue.submit(batch, output_dir='')
+    stream_job = job_queue.submit_stream(make_stream(events, 'stream'))
+    release.set()
+
+    assert list(stream_job.iter_stream()) == [b'stream']
+    assert batch_job.wait(5)
+    assert events == ['blocking', 'stream', 'batch']
+
+if __name__ == "__main__":
+    test_stream_runs_between_batch_items()
+    test_stream_runs_before_queued_batch()
+    print("=== 测试完成 ===")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+测试JSONL输入和字节偏移索引
+
+检查按范围读取的结果与从头读取的对应部分一致、索引能定位到任意记录、源文件修改后索引自动重建，
+以及空行和无法解析的行的处理
+用法：python test_jsonl_index.py 或 pytest test_jsonl_index.py
+"""
+
+import os
+import sys
+import json
+import logging
+import pathlib
+import tempfile
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+logging.basicConfig(level=logging.WARNING)
+
+from src.modules.jsonl_index import JsonlIndex
+from src.modules.text_loader import TextLoader
+
+RECORDS = [{'text': f"第{i}条：温度为{i}℃，范围{i}-{i + 10}", 'speaker': f"s{i % 3}"} for i in range(50)]
+
+def write_jsonl(path, records, extra_lines=()):
+    """写入JSONL文件，extra_lines为(位置, 原始行)，插入空行或无效行"""
+    lines = [json.dumps(r, ensure_ascii=False) for r in records]
+    for pos, line in sorted(extra_lines, reverse=True):
+        lines.insert(pos, line)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+
+def test_index(tmp_path):
+    path = os.path.join(tmp_path, 'records.jsonl')
+    # 第10条记录之前插入空行，第20条记录之后插入无效行（占记录序号20）
+    write_jsonl(path, RECORDS, extra_lines=[(10, ''), (20, '{"text": "truncated')])
+
+    index = JsonlIndex(path)
+    # 记录数为非空行数，生成索引文件
+    assert len(index) == len(RECORDS) + 1
+    assert os.path.exists(path + '.idx')
+    assert index.read(5) == RECORDS[5]
+    assert index.read(25) == RECORDS[24]
+
+    # 范围读取跳过无效行
+    records = dict(index.iter_records(15, 30))
+    assert sorted(records) == [i for i in range(15, 30) if i != 20]
+
+    # 加载已有索引
+    reloaded = JsonlIndex(path)
+    assert list(reloaded.offsets) == list(index.offsets)
+
+    # 源文件修改后重建索引
+    write_jsonl(path, RECORDS[:10])
+    assert len(JsonlIndex(path)) == 10
+
+def test_text_loader(tmp_path):
+    path = os.path.join(tmp_path, 'texts.jsonl')
+    write_jsonl(path, RECORDS, extra_lines=[(3, '   ')])
+    loader = TextLoader()
+
+    full = loader.load_text_file(path)
+    assert len(full) == len(RECORDS)
+    # 转换特殊符号并保留其他键
+    assert full[7]['text'] == loader.convert_special_symbols(RECORDS[7]['text'])
+    assert full[7]['speaker'] == 's1'
+
+    # 分成几段读取，拼接后应与从头读取的结果完全相同（包括生成的ID）
+    shards = []
+    for start in range(0, len(RECORDS), 16):
+        shards.extend(loader.iter_texts(path, start=start, stop=start + 16))
+    assert shards == full
+
+    # 非JSONL文件拒绝记录范围
+    with pytest.raises(ValueError):
+        loader.load_text_file(os.path.join(tmp_path, 'texts.txt'), start=5)
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        test_index(pathlib.Path(tmp_dir))
+        test_text_loader(pathlib.Path(tmp_dir))
+    print("=== 测试完成 ===")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+测试bf16 autocast前向的输出转换：ModelOutput、字典、元组和列表中嵌套的bfloat16张量都转换回float32，
+KV缓存（past_key_values）保持bfloat16
+需要torch，未安装时跳过；安装了transformers时同时检查ModelOutput
+用法：python test_precision.py 或 pytest test_precision.py
+"""
+
+import os
+import sys
+import logging
+from collections import namedtuple
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+logging.basicConfig(level=logging.WARNING)
+
+from src.modules.precision import _autocast_forward
+
+Output = namedtuple('Output', ['logits', 'hidden_states'])
+
+def test_autocast_outputs():
+    torch = pytest.importorskip('torch')
+
+    class Head(torch.nn.Module):
+        """模拟GPT前向，返回各种嵌套结构中的bfloat16张量"""
+        def __init__(self, wrap):
+            super().__init__()
+            self.linear = torch.nn.Linear(8, 8)
+            self.wrap = wrap
+
+        def forward(self, x):
+            logits = self.linear(x)
+            past = ((logits.to(torch.bfloat16), logits.to(torch.bfloat16)),)
+            return self.wrap(logits.to(torch.bfloat16), past)
+
+    wraps = {
+        '元组': lambda logits, past: (logits, past),
+        'namedtuple': lambda logits, past: Output(logits, [logits]),
+        '字典': lambda logits, past: {'logits': logits, 'past_key_values': past, 'hidden_states': [logits]}
+    }
+    try:
+        from transformers.modeling_outputs import CausalLMOutputWithPast
+        wraps['ModelOutput'] = lambda logits, past: CausalLMOutputWithPast(logits=logits, past_key_values=past)
+    except ImportError:
+        # 未安装transformers时只检查其他结构
+        pass
+
+    x = torch.randn(2, 8)
+    for name, wrap in wraps.items():
+        head = Head(wrap)
+        _autocast_forward(head)
+        output = head(x)
+        if name == '元组':
+            assert output[0].dtype == torch.float32, name
+            assert output[1][0][0].dtype == torch.float32, name
+        elif name == 'namedtuple':
+            assert isinstance(output, Output), name
+            assert output.logits.dtype == torch.float32, name
+            assert output.hidden_states[0].dtype == torch.float32, name
+        else:
+            assert output['logits'].dtype == torch.float32, name
+            # KV缓存保持bfloat16
+            assert output['past_key_values'][0][0].dtype == torch.bfloat16, name
+            if name == 'ModelOutput':
+                assert output.logits.dtype == torch.float32, name
+            else:
+                assert output['hidden_states'][0].dtype == torch.float32, name
+
+if __name__ == "__main__":
+    try:
+        import torch  # noqa: F401
+    except ImportError as e:
+        print(f"跳过: 需要torch ({str(e)})")
+        sys.exit(0)
+
+    test_autocast_outputs()
+    print("=== 测试完成 ===")
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+测试按条目ID哈希分片和分片meta文件的合并
+
+检查分片结果在不同进程（不同的字符串哈希种子）中一致、每个条目恰好属于一个分片，
+以及合并后的meta文件按输入顺序排列并正确报告缺失、失败和重复的条目
+用法：python test_sharding.py 或 pytest test_sharding.py
+"""
+
+import os
+import sys
+import logging
+import pathlib
+import tempfile
+import subprocess
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+logging.basicConfig(level=logging.WARNING)
+
+from src.modules.meta_writer import MetaWriter, META_COLUMNS, read_meta_rows
+from src.modules.sharding import shard_of, iter_input_items, merge_shard_metas
+
+NUM_SHARDS = 3
+
+def test_shard_assignment():
+    item_ids = [f"part_{i % 4}/text_{i}" for i in range(3000)]
+    shards = [shard_of(item_id, NUM_SHARDS) for item_id in item_ids]
+    assert all(0 <= shard < NUM_SHARDS for shard in shards)
+    # 各分片条目数大致均衡
+    counts = [shards.count(shard) for shard in range(NUM_SHARDS)]
+    assert min(counts) > len(item_ids) / NUM_SHARDS * 0.8, counts
+    # 不分片时都属于分片0
+    assert all(shard_of(item_id, 1) == 0 for item_id in item_ids[:100])
+
+    # 在使用不同字符串哈希种子的子进程中计算，结果应相同
+    code = ("import sys; from src.modules.sharding import shard_of; "
+            f"print(','.join(str(shard_of(f'part_{{i % 4}}/text_{{i}}', {NUM_SHARDS})) for i in range(3000)))")
+    env = dict(os.environ, PYTHONHASHSEED='12345')
+    output = subprocess.run([sys.executable, '-c', code], cwd=project_root, env=env,
+                            capture_output=True, text=True, check=True).stdout.strip()
+    assert output == ','.join(map(str, shards))
+
+def write_shard_meta(path, items):
+    """按合成时的格式写入一个分片的meta文件，items为(输入序号, 条目ID, 是否成功)"""
+    with MetaWriter(path) as meta_writer:
+        for position, (input_index, item_id, success) in enumerate(items):
+            row = {column: '' for column in META_COLUMNS}
+            row.update({
+                'text': f"文本{input_index}",
+                'output_audio_path': f"{item_id}.wav" if success else '',
+                'success': 'Yes' if success else 'No',
+                'error_message': '' if success else 'synthesis failed',
+                'item_id': item_id,
+                'input_index': input_index
+            })
+            meta_writer.write_row(position, row)
+
+def test_merge(tmp_path):
+    tmp_dir = str(tmp_path)
+    input_dir = os.path.join(tmp_dir, 'inputs')
+    os.makedirs(input_dir)
+    for i in range(3):
+        with open(os.path.join(input_dir, f"part_{i}.txt"), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(f"第{i}个文件的第{j}行。" for j in range(10)) + '\n')
+    input_files = sorted(os.path.join(input_dir, name) for name in os.listdir(input_dir))
+    items = list(iter_input_items(input_files))
+    # 条目ID带文件子目录前缀
+    assert items[0] == (0, 'part_0/part_0_0')
+    assert len(items) == 30
+
+    # 分片1漏掉中间一条，最后一个条目所在的分片漏掉最后一条；一条失败后在重跑的文件中成功
+    dropped = {items[7][0], items[-1][0]}
+    failed_index = items[12][0]
+    retried_index = items[3][0]
+    meta_files = []
+    for shard in range(NUM_SHARDS):
+        shard_items = [(index, item_id, index not in (failed_index, retried_index))
+                       for index, item_id in items
+                       if shard_of(item_id, NUM_SHARDS) == shard and index not in dropped]
+        meta_files.append(os.path.join(tmp_dir, f"meta_shard{shard}.csv"))
+        write_shard_meta(meta_files[-1], shard_items)
+    meta_files.append(os.path.join(tmp_dir, 'meta_retry.jsonl'))
+    write_shard_meta(meta_files[-1], [(retried_index, items[3][1], True)])
+
+    merged_file = os.path.join(tmp_dir, 'merged.csv')
+    report = merge_shard_metas(meta_files, merged_file, expected_items=iter(items), num_shards=NUM_SHARDS)
+    rows = list(read_meta_rows(merged_file))
+    # 合并后按输入顺序排列
+    assert [int(row['input_index']) for row in rows] == [index for index, _ in items if index not in dropped]
+    # 缺失的条目及其分片
+    assert [(item['input_index'], item['shard']) for item in report['missing']] == \
+        [(index, shard_of(items[index][1], NUM_SHARDS)) for index in sorted(dropped)]
+    assert [item['input_index'] for item in report['failed']] == [failed_index]
+    # 重复条目优先取成功的结果
+    assert report['duplicates'] == 1
+    assert rows[retried_index]['success'] == 'Yes'
+
+    # 不指定输入时只能发现中间的空缺
+    report = merge_shard_metas(meta_files, merged_file)
+    assert [item['input_index'] for item in report['missing']] == [items[7][0]]
+
+if __name__ == "__main__":
+    test_shard_assignment()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        test_merge(pathlib.Path(tmp_dir))
+    print("=== 测试完成 ===")
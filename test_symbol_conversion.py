@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+测试TextLoader.convert_special_symbols的输出与原实现（逐个符号str.replace，再依次处理范围和百分比）一致
+
+固定用例检查范围、百分比和特殊符号的转换结果；随机用例由数字、连字符、百分号、小数点和特殊符号组合而成，
+逐条与原实现比较
+用法：python test_symbol_conversion.py [随机用例数] 或 pytest test_symbol_conversion.py
+"""
+
+import os
+import re
+import sys
+import random
+import logging
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+logging.basicConfig(level=logging.WARNING)
+
+from src.modules.text_loader import TextLoader
+
+def reference_convert(text: str) -> str:
+    """原实现，作为对照"""
+    symbol_map = {
+        '<': '小于', '＜': '小于', '>': '大于', '＞': '大于', '≤': '小于等于', '≥': '大于等于',
+        '=': '等于', '≠': '不等于', '≈': '约等于', '±': '正负', '×': '乘以', '÷': '除以',
+        '∞': '无穷大', '∑': '求和', '∏': '求积', '∫': '积分', '∂': '偏微分', '∇': '梯度',
+        '√': '平方根', '∛': '立方根', '℃': '摄氏度', '℉': '华氏度', '°': '度', '′': '分',
+        '″': '秒', '％': '百分之', '‰': '千分之', '‱': '万分之'
+    }
+    text = re.sub(r'(\d+)-(\d+)', r'\1到\2', text)
+    for symbol, replacement in symbol_map.items():
+        text = text.replace(symbol, replacement)
+
+    def replace_percent(match):
+        num = match.group(1)
+        try:
+            if '.' not in num:
+                num_int = int(num)
+                chinese_nums = {
+                    0: '零', 1: '一', 2: '二', 3: '三', 4: '四', 5: '五',
+                    6: '六', 7: '七', 8: '八', 9: '九', 10: '十'
+                }
+                if num_int in chinese_nums:
+                    return f"百分之{chinese_nums[num_int]}"
+                return f"百分之{num}"
+            else:
+                return f"百分之{num}"
+        except ValueError:
+            return f"百分之{num}"
+
+    return re.sub(r'(\d+(?:\.\d+)?)%', replace_percent, text)
+
+# 固定用例：(原始文本, 期望结果)
+GOLDEN_CASES = [
+    ("温度范围200-500℃", "温度范围200到500摄氏度"),
+    ("增长了50%", "增长了百分之50"),
+    ("增长了5%", "增长了百分之五"),
+    ("占比10-20%", "占比10到百分之20"),
+    ("占比1-2.5%", "占比1到百分之2.5"),
+    ("利率1.5-2%", "利率1.5到百分之二"),
+    ("1-2-3%", "1到2-百分之三"),
+    ("x≤y且a≥b，x≠0", "x小于等于y且a大于等于b，x不等于0"),
+    ("50％的人", "50百分之的人"),
+    ("a<b>c=d", "a小于b大于c等于d"),
+    ("√2×3÷4≈2.1", "平方根2乘以3除以4约等于2.1"),
+    ("没有特殊符号的文本", "没有特殊符号的文本"),
+    ("", "")
+]
+
+_ALPHABET = list('0123456789') * 3 + list('-%.') * 4 + list('<>=≤≥×÷℃％‰ 中文a')
+
+def random_text(rng: random.Random) -> str:
+    return ''.join(rng.choice(_ALPHABET) for _ in range(rng.randint(0, 20)))
+
+# 默认的随机用例数
+NUM_RANDOM_CASES = 100000
+
+def test_golden_cases():
+    loader = TextLoader()
+    for text, expected in GOLDEN_CASES:
+        assert reference_convert(text) == expected, f"原实现: {text!r} -> {reference_convert(text)!r}"
+        assert loader.convert_special_symbols(text) == expected, \
+            f"{text!r} -> {loader.convert_special_symbols(text)!r}, 期望: {expected!r}"
+
+def test_random_equivalence(num_cases: int = NUM_RANDOM_CASES):
+    loader = TextLoader()
+    rng = random.Random(0)
+    failures = []
+    for _ in range(num_cases):
+        text = random_text(rng)
+        if loader.convert_special_symbols(text) != reference_convert(text):
+            failures.append(text)
+    assert not failures, '\n'.join(
+        f"{text!r}: 新实现 {loader.convert_special_symbols(text)!r}, 原实现 {reference_convert(text)!r}"
+        for text in failures[:20])
+
+if __name__ == "__main__":
+    test_golden_cases()
+    test_random_equivalence(int(sys.argv[1]) if len(sys.argv) > 1 else NUM_RANDOM_CASES)
+    print("=== 测试完成 ===")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+测试TextLoader按列分批读取（iter_text_batches）与逐行读取（iter_texts）的结果一致
+
+随机生成包含空文本、特殊符号、范围和百分比的CSV和xlsx文件，以不同的批大小读取后逐条比较；
+需要pandas和openpyxl，未安装时跳过
+用法：python test_text_loader_batches.py 或 pytest test_text_loader_batches.py
+"""
+
+import os
+import sys
+import csv
+import random
+import logging
+import pathlib
+import tempfile
+
+import pytest
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+logging.basicConfig(level=logging.WARNING)
+
+from src.modules.text_loader import TextLoader
+
+_ALPHABET = list('abc 中文12-%.℃≥<') + [''] * 3
+
+def random_rows(num_rows: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [{
+        'id': f"item_{i}",
+        'text': ''.join(rng.choice(_ALPHABET) for _ in range(rng.randint(0, 8))),
+        'speaker': rng.choice(['s1', 's2', '']),
+        'score': rng.randint(0, 9)
+    } for i in range(num_rows)]
+
+def compare(loader: TextLoader, path: str, batch_sizes, **kwargs) -> None:
+    expected = list(loader.iter_texts(path, **kwargs))
+    for batch_size in batch_sizes:
+        batches = list(loader.iter_text_batches(path, batch_size=batch_size, **kwargs))
+        actual = [text for batch in batches for text in batch]
+        label = f"{os.path.basename(path)} batch_size={batch_size} {kwargs or ''}"
+        assert actual == expected, f"{label}: {len(actual)}/{len(expected)}条"
+        assert all(len(batch) <= batch_size for batch in batches), label
+
+def test_csv(tmp_path):
+    pytest.importorskip('pandas')
+    loader = TextLoader()
+    path = os.path.join(tmp_path, 'texts.csv')
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['id', 'text', 'speaker', 'score'])
+        writer.writeheader()
+        writer.writerows(random_rows(2000))
+    compare(loader, path, [1, 7, 500, 10000])
+    compare(loader, path, [300], id_column='id')
+
+def test_xlsx(tmp_path):
+    pd = pytest.importorskip('pandas')
+    pytest.importorskip('openpyxl')
+    loader = TextLoader()
+    path = os.path.join(tmp_path, 'texts.xlsx')
+    # 空字符串写成空单元格，检查空值的处理与pandas.read_excel一致
+    rows = [{key: (value if value != '' else None) for key, value in row.items()} for row in random_rows(1000, seed=1)]
+    pd.DataFrame(rows).to_excel(path, index=False)
+    compare(loader, path, [1, 64, 10000])
+    compare(loader, path, [100], id_column='id')
+
+if __name__ == "__main__":
+    try:
+        import pandas  # noqa: F401
+        import openpyxl  # noqa: F401
+    except ImportError as e:
+        print(f"跳过: 需要pandas和openpyxl ({str(e)})")
+        sys.exit(0)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        test_csv(pathlib.Path(tmp_dir))
+        test_xlsx(pathlib.Path(tmp_dir))
+    print("=== 测试完成 ===")
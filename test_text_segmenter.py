@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+测试长文本分段器（TextSegmenter）
+
+检查小数、英文缩写和数字中的逗号、冒号不会被切开，边界在原始文本上查找后再逐句预处理，
+以及片段不超过预算且保持原文顺序
+用法：python test_text_segmenter.py 或 pytest test_text_segmenter.py
+"""
+
+import os
+import sys
+import logging
+
+# 添加项目根目录到Python路径
+project_root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, project_root)
+
+logging.basicConfig(level=logging.WARNING)
+
+from src.modules.text_segmenter import TextSegmenter
+from src.modules.text_preprocessor import RegexPreprocessor
+
+def test_split_sentences():
+    segmenter = TextSegmenter()
+    cases = [
+        ("圆周率约等于3.14，这是一个常数。下一句。", ['圆周率约等于3.14，这是一个常数。', '下一句。']),
+        ("Mr. Smith went to Washington. He said hi.", ['Mr. Smith went to Washington.', 'He said hi.']),
+        ("Dr. Wang met Prof. Li at 3.5 p.m. today. OK.", ['Dr. Wang met Prof. Li at 3.5 p.m. today.', 'OK.']),
+        ("The U.S. economy grew 2.5% vs. last year. 增长了。", ['The U.S. economy grew 2.5% vs. last year.', '增长了。']),
+        ("e.g. 这个例子。Wait... then go!", ['e.g. 这个例子。', 'Wait...', 'then go!']),
+        ("他说：“好的。”然后离开了。\n第二行", ['他说：“好的。”', '然后离开了。', '第二行'])
+    ]
+    for text, expected in cases:
+        actual = segmenter.split_sentences(text)
+        assert actual == expected, f"{text!r} -> {actual}"
+
+def test_split_with_preprocess():
+    preprocess = RegexPreprocessor().preprocess
+
+    text = "圆周率约等于3.14，这是一个常数。"
+    segments = TextSegmenter(max_tokens=82).split(text, preprocess=preprocess)
+    # 小数不被切开
+    assert segments == [preprocess(text)], segments
+
+    text = "Mr. Smith paid 3.5 dollars. Then he left."
+    segments = TextSegmenter(max_tokens=40).split(text, preprocess=preprocess)
+    # 缩写和小数不被切开
+    assert segments == [preprocess("Mr. Smith paid 3.5 dollars."), preprocess("Then he left.")], segments
+
+    # 超出预算的句子按分句切分，数字中的逗号和冒号不切分
+    text = "价格为3,000元，会议在10:30开始，请大家准时参加，不要迟到。"
+    segments = TextSegmenter(max_tokens=20).split(text, preprocess=preprocess)
+    assert any('3 , 000' in segment for segment in segments), segments
+    assert any('10 : 30' in segment for segment in segments), segments
+    assert all(len(segment) <= 20 for segment in segments), segments
+
+    text = "今天天气很好。我们去公园散步吧！温度为3.5度，湿度适中。" * 20
+    segmenter = TextSegmenter(max_tokens=40)
+    segments = segmenter.split(text, preprocess=preprocess)
+    assert all(len(segment) <= 40 for segment in segments)
+    # 长文本保持原文顺序且内容完整
+    assert ''.join(segments).replace(' ', '') == ''.join(
+        preprocess(sentence) for sentence in segmenter.split_sentences(text)).replace(' ', '')
+
+if __name__ == "__main__":
+    test_split_sentences()
+    test_split_with_preprocess()
+    print("=== 测试完成 ===")
@@ -440,11 +440,12 @@ function handleSynthesize() {
     formData.append('length_penalty', document.getElementById('length-penalty').value);
     formData.append('repetition_penalty', document.getElementById('repetition-penalty').value);
     
-    // 发送请求
-    fetch('/api/tts', {
+    // 提交后台任务，然后轮询任务进度
+    const signal = currentAbortController.signal;
+    fetch('/api/jobs', {
         method: 'POST',
         body: formData,
-        signal: currentAbortController.signal
+        signal: signal
     })
     .then(response => {
         if (!response.ok) {
@@ -452,6 +453,12 @@ function handleSynthesize() {
         }
         return response.json();
     })
+    .then(job => {
+        if (!job.success) {
+            return job;
+        }
+        return pollJob(job.job_id, signal);
+    })
     .then(data => {
         // 重置状态
         isSynthesizing = false;
@@ -511,6 +518,33 @@ function handleSynthesize() {
     });
 }
 
+// 轮询后台合成任务，任务结束后返回与/api/tts相同格式的结果
+function pollJob(jobId, signal) {
+    return new Promise((resolve, reject) => {
+        const poll = () => {
+            fetch(`/api/jobs/${jobId}`, { signal: signal })
+            .then(response => response.json())
+            .then(job => {
+                if (!job.success) {
+                    resolve(job);
+                    return;
+                }
+                if (job.status === 'completed') {
+                    resolve(job.result);
+                } else if (job.status === 'failed') {
+                    resolve({ success: false, error: job.error || '语音合成失败' });
+                } else {
+                    const progress = job.progress;
+                    showStatus(`正在合成语音，请稍候... (${progress.completed}/${progress.total})`, 'processing');
+                    setTimeout(poll, 1000);
+                }
+            })
+            .catch(reject);
+        };
+        poll();
+    });
+}
+
 // 自动噪音混合函数
 function autoMixNoise(audioFiles, noiseType, snr) {
     if (!audioFiles || audioFiles.length === 0) {